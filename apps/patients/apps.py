@@ -6,4 +6,4 @@ class PatientsConfig(AppConfig):
     name = "apps.patients"
 
     def ready(self):
-        import apps.patients.signals  # noqa: F401
+        import apps.patients.signals
@@ -1,4 +1,4 @@
-from django.core.cache import cache
+from core.cache import CacheNamespace
 
 
 class CachedPatientSearchMixin:
@@ -8,14 +8,17 @@ class CachedPatientSearchMixin:
 
     CACHE_PREFIX = "patient_search"
     CACHE_TIMEOUT = 3600  # 1 hour
+    search_cache = CacheNamespace("patient_search", timeout=CACHE_TIMEOUT)
 
     def get_cache_key(self, query):
         return f"{self.CACHE_PREFIX}:{query}"
 
     def get_cached_results(self, query):
-        cache_key = self.get_cache_key(query)
-        return cache.get(cache_key)
+        return self.search_cache.get(self.get_cache_key(query))
 
     def set_cached_results(self, query, results):
-        cache_key = self.get_cache_key(query)
-        cache.set(cache_key, results, self.CACHE_TIMEOUT)
+        self.search_cache.set(self.get_cache_key(query), results)
+
+    def get_or_search(self, query, search):
+        """Return cached results for ``query``, running ``search()`` once across workers on a miss."""
+        return self.search_cache.get_or_compute(self.get_cache_key(query), search)
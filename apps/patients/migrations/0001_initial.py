@@ -1,9 +1,10 @@
 # Generated by Django 5.1.4 on 2025-02-14 10:28
 
+import uuid
+
 import django.core.validators
 import django.db.models.deletion
 import simple_history.models
-import uuid
 from django.conf import settings
 from django.db import migrations, models
 
@@ -0,0 +1,118 @@
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.conf import settings
+from django.contrib.postgres.fields import RangeOperators
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+# Existing double bookings would make the constraint impossible to create.
+# They are not resolved here: the migration stops and lists them so they can
+# be cancelled or rebooked before re-running it.
+LEGACY_OVERLAPS_SQL = """
+    WITH ranged AS (
+        SELECT id, physician_id, status, created_at, appointment_date, appointment_time,
+               tstzrange(
+                   TIMEZONE(%s, appointment_date + appointment_time),
+                   TIMEZONE(%s, appointment_date + appointment_time
+                                + INTERVAL '1 minute' * duration_minutes),
+                   '[)'
+               ) AS time_range
+        FROM patient_appointments
+        WHERE status IN ('pending', 'approved')
+    )
+    SELECT earlier.id, later.id, later.physician_id, later.appointment_date, later.appointment_time
+    FROM ranged AS later
+    JOIN ranged AS earlier
+      ON earlier.physician_id = later.physician_id
+     AND (earlier.created_at, earlier.id) < (later.created_at, later.id)
+     AND earlier.time_range && later.time_range
+    ORDER BY later.physician_id, later.appointment_date, later.appointment_time
+"""
+
+
+def check_legacy_overlaps(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(LEGACY_OVERLAPS_SQL, [settings.TIME_ZONE, settings.TIME_ZONE])
+        conflicts = cursor.fetchall()
+    if conflicts:
+        rows = "\n".join(
+            f"  appointment {later_id} (physician {physician_id}, {day} {time}) overlaps appointment {earlier_id}"
+            for earlier_id, later_id, physician_id, day, time in conflicts
+        )
+        raise RuntimeError(
+            f"Cannot add exclude_overlapping_physician_appointments in schema "
+            f"{schema_editor.connection.schema_name}: {len(conflicts)} double-booked active "
+            f"appointments. Cancel or rebook them and run the migration again:\n{rows}"
+        )
+
+
+def time_range_field():
+    # Same zone as the model's expression, so the column matches the model
+    # state; see PatientAppointment.time_range.
+    return models.GeneratedField(
+        db_persist=True,
+        expression=models.Func(
+            models.Func(
+                models.Value(settings.TIME_ZONE),
+                models.Func(
+                    models.F("appointment_date"),
+                    models.F("appointment_time"),
+                    arg_joiner=" + ",
+                    template="(%(expressions)s)",
+                ),
+                function="TIMEZONE",
+            ),
+            models.Func(
+                models.Value(settings.TIME_ZONE),
+                models.Func(
+                    models.Func(
+                        models.F("appointment_date"),
+                        models.F("appointment_time"),
+                        arg_joiner=" + ",
+                        template="(%(expressions)s)",
+                    ),
+                    models.F("duration_minutes"),
+                    arg_joiner=" + INTERVAL '1 minute' * ",
+                    template="(%(expressions)s)",
+                ),
+                function="TIMEZONE",
+            ),
+            models.Value("[)"),
+            function="TSTZRANGE",
+            output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+        ),
+        output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0001_initial"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(check_legacy_overlaps, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="patientappointment",
+            name="time_range",
+            field=time_range_field(),
+        ),
+        migrations.AddField(
+            model_name="historicalpatientappointment",
+            name="time_range",
+            field=time_range_field(),
+        ),
+        migrations.AddConstraint(
+            model_name="patientappointment",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(status__in=("pending", "approved")),
+                expressions=[
+                    ("physician", RangeOperators.EQUAL),
+                    ("time_range", RangeOperators.OVERLAPS),
+                ],
+                name="exclude_overlapping_physician_appointments",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes concurrently keeps large appointment tables writable meanwhile.
+    atomic = False
+
+    dependencies = [
+        ("patients", "0002_patientappointment_time_range"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="patientappointment",
+            index=models.Index(
+                condition=models.Q(status__in=("pending", "approved")),
+                fields=["physician", "appointment_date", "appointment_time"],
+                include=["duration_minutes", "id"],
+                name="appt_physician_active_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="patientappointment",
+            index=models.Index(
+                fields=["physician", "appointment_date", "status"],
+                name="appt_physician_date_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="patientappointment",
+            index=models.Index(
+                condition=models.Q(status__in=("pending", "approved")),
+                fields=["patient", "appointment_date", "appointment_time"],
+                name="appt_patient_active_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="patientappointment",
+            index=models.Index(
+                fields=["patient", "-appointment_date", "-appointment_time"],
+                name="appt_patient_history_idx",
+            ),
+        ),
+    ]
@@ -195,17 +195,28 @@ class AppointmentValidator:
                 )
 
     @staticmethod
-    def validate_time_slot(appointment_date, appointment_time, physician, instance=None):
+    def validate_time_slot(  # noqa: PLR0913
+        appointment_date, appointment_time, physician, instance=None, duration_minutes=30, physician_role=None
+    ):
         """
         Check for appointment time slot conflicts.
+
+        Uses the same range overlap as the database exclusion constraint (and
+        its GiST index); the constraint remains the final guard against races.
+        ``physician_role`` is the role name when the caller already loaded the
+        physician's membership.
         """
         conflicts = PatientAppointment.objects.filter(
             physician=physician,
-            appointment_date=appointment_date,
-            appointment_time=appointment_time
+            status__in=PatientAppointment.ACTIVE_STATUSES,
+            time_range__overlap=PatientAppointment.build_time_range(
+                appointment_date, appointment_time, duration_minutes
+            ),
         )
 
-        if physician.hospital_memberships_user.first().role.name != "Doctor":
+        if physician_role is None:
+            physician_role = physician.hospital_memberships_user.values_list("role__name", flat=True).first()
+        if physician_role != "Doctor":
             raise serializers.ValidationError("Selected staff member is not a doctor.")
 
         if instance:
@@ -1,13 +1,20 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
 from django.db import models
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from django.utils import timezone
 
 from .core import PatientBasemodel
 
 
 class PatientAppointment(PatientBasemodel):
+    # Statuses that hold the physician's time; only these may not overlap
+    ACTIVE_STATUSES = ("pending", "approved")
+    OVERLAP_CONSTRAINT_NAME = "exclude_overlapping_physician_appointments"
+
     STATUS_CHOICES = [
         ("pending", "Pending"),
         ("approved", "Approved"),
@@ -58,6 +65,46 @@ class PatientAppointment(PatientBasemodel):
     )
     start_time = models.DateTimeField(null=True)
     end_time = models.DateTimeField(null=True)
+    # [start, end) maintained by the database, so update(), bulk_update() and
+    # bulk_create() can never leave it stale. Local wall-clock times are
+    # converted with timezone(); it is immutable for a constant zone, unlike
+    # timestamptz + interval. The zone is settings.TIME_ZONE, read by both this
+    # expression and migration 0002, so changing TIME_ZONE needs a migration
+    # that drops and re-adds the column (and the exclusion constraint on it).
+    time_range = models.GeneratedField(
+        expression=models.Func(
+            models.Func(
+                models.Value(settings.TIME_ZONE),
+                models.Func(
+                    models.F("appointment_date"),
+                    models.F("appointment_time"),
+                    template="(%(expressions)s)",
+                    arg_joiner=" + ",
+                ),
+                function="TIMEZONE",
+            ),
+            models.Func(
+                models.Value(settings.TIME_ZONE),
+                models.Func(
+                    models.Func(
+                        models.F("appointment_date"),
+                        models.F("appointment_time"),
+                        template="(%(expressions)s)",
+                        arg_joiner=" + ",
+                    ),
+                    models.F("duration_minutes"),
+                    template="(%(expressions)s)",
+                    arg_joiner=" + INTERVAL '1 minute' * ",
+                ),
+                function="TIMEZONE",
+            ),
+            models.Value("[)"),
+            function="TSTZRANGE",
+            output_field=DateTimeRangeField(),
+        ),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
 
 
     class Meta:
@@ -65,15 +112,45 @@ class PatientAppointment(PatientBasemodel):
         indexes = [
             models.Index(fields=["appointment_date", "appointment_time"]),
             models.Index(fields=["status", "appointment_date"]),
+            # Busy intervals, availability and slot search: index-only over active bookings
+            models.Index(
+                fields=["physician", "appointment_date", "appointment_time"],
+                include=["duration_minutes", "id"],
+                condition=models.Q(status__in=("pending", "approved")),
+                name="appt_physician_active_idx",
+            ),
+            # Physician schedule and department board (wider status sets)
+            models.Index(fields=["physician", "appointment_date", "status"], name="appt_physician_date_idx"),
+            # Patient's upcoming active appointments (can_create_appointment)
+            models.Index(
+                fields=["patient", "appointment_date", "appointment_time"],
+                condition=models.Q(status__in=("pending", "approved")),
+                name="appt_patient_active_idx",
+            ),
+            # Patient history, newest first
+            models.Index(fields=["patient", "-appointment_date", "-appointment_time"], name="appt_patient_history_idx"),
         ]
         constraints = [
-            models.CheckConstraint(check=models.Q(end_time__gt=models.F("start_time")), name="valid_time_range")
+            models.CheckConstraint(check=models.Q(end_time__gt=models.F("start_time")), name="valid_time_range"),
+            ExclusionConstraint(
+                name="exclude_overlapping_physician_appointments",
+                expressions=[
+                    ("physician", RangeOperators.EQUAL),
+                    ("time_range", RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=("pending", "approved")),
+            ),
         ]
 
 
     def __str__(self):
         return f"Appointment on {self.appointment_date} at {self.appointment_time} for {self.patient}"
 
+    @staticmethod
+    def build_time_range(appointment_date, appointment_time, duration_minutes):
+        """Half-open, timezone-aware range covered by an appointment."""
+        start = timezone.make_aware(datetime.combine(appointment_date, appointment_time))
+        return DateTimeTZRange(start, start + timedelta(minutes=duration_minutes or 0), "[)")
 
     @classmethod
     def can_create_appointment(cls, patient_id, appointment_date, appointment_time):
@@ -110,36 +187,31 @@ class PatientAppointment(PatientBasemodel):
                     "message": "Cannot create appointments in the past"
                 }
 
-            # Check for existing active appointments
-            existing_appointments = cls.objects.filter(
+            # Active appointments still ahead; compares (date, time) against the local
+            # clock so the lookup stays on the partial (patient, date, time) index
+            now = timezone.localtime()
+            upcoming_appointments = cls.objects.filter(
+                models.Q(appointment_date__gt=now.date())
+                | models.Q(appointment_date=now.date(), appointment_time__gte=now.time()),
                 patient_id=patient_id,
-                status__in=["pending", "approved"],
-                appointment_date__gte=timezone.now().date()
+                status__in=cls.ACTIVE_STATUSES,
             )
 
-            if existing_appointments.exists():
-                # Get details of existing appointments for error message
-                active_appointments = []
-                for apt in existing_appointments:
-                    apt_datetime = timezone.datetime.combine(
-                        apt.appointment_date,
-                        apt.appointment_time,
-                        tzinfo=timezone.get_current_timezone()
+            if upcoming_appointments.exists():
+                active_appointments = [
+                    f"{apt_date} at {apt_time}"
+                    for apt_date, apt_time in upcoming_appointments.order_by(
+                        "appointment_date", "appointment_time"
+                    ).values_list("appointment_date", "appointment_time")
+                ]
+                return {
+                    "allowed": False,
+                    "message": (
+                        "Patient has existing active appointments on: "
+                        f"{', '.join(active_appointments)}. "
+                        "Please cancel existing appointments before creating a new one."
                     )
-                    if apt_datetime >= timezone.now():
-                        active_appointments.append(
-                            f"{apt.appointment_date} at {apt.appointment_time}"
-                        )
-
-                if active_appointments:
-                    return {
-                        "allowed": False,
-                        "message": (
-                            "Patient has existing active appointments on: "
-                            f"{', '.join(active_appointments)}. "
-                            "Please cancel existing appointments before creating a new one."
-                        )
-                    }
+                }
 
             return {"allowed": True, "message": "Appointment can be created"}
 
@@ -58,7 +58,7 @@ class PatientAppointmentCreateSerializer(BasePatientSerializer, CalculationMixin
         # Validate and get user
         try:
             # Find user through their hospital membership
-            membership = HospitalMembership.objects.get(
+            membership = HospitalMembership.objects.select_related("user", "role").get(
                 user__id=user_uuid,
                 hospital_profile=current_hospital,
                 is_active=True,
@@ -100,7 +100,9 @@ class PatientAppointmentCreateSerializer(BasePatientSerializer, CalculationMixin
             appointment_date,
             appointment_time,
             physician,
-            self.instance
+            self.instance,
+            data.get("duration_minutes", getattr(self.instance, "duration_minutes", 30)),
+            physician_role=membership.role.name if membership.role else None,
         )
         return data
 
@@ -200,7 +202,7 @@ class TimeSlotSerializer(serializers.Serializer):
     start_time = serializers.DateTimeField()
     end_time = serializers.DateTimeField()
     is_available = serializers.BooleanField()
-    conflicting_appointment = serializers.UUIDField(allow_null=True)
+    conflicting_appointment = serializers.UUIDField(source="conflict_id", allow_null=True)
 
 
 class RecurringAppointmentSerializer(serializers.ModelSerializer):
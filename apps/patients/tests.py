@@ -0,0 +1,101 @@
+import threading
+from datetime import time, timedelta
+
+import pytest
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.utils import timezone
+from django_tenants.utils import tenant_context
+
+from apps.patients.models import Patient, PatientAppointment
+from apps.scheduling.services.schedule_service import (
+    AppointmentTimeConflictError,
+    appointment_overlap_guard,
+)
+from core.models import MyUser
+from tenants.models import Client
+
+
+class AppointmentOverlapConstraintTests(TransactionTestCase):
+    """
+    Concurrent bookings of the same physician slot.
+
+    Runs outside a wrapping transaction so that each thread commits on its
+    own connection and the exclusion constraint, not an application check,
+    decides which booking wins.
+    """
+
+    def setUp(self):
+        self.tenant = Client(
+            schema_name="test_appointment_overlap",
+            name="Overlap Test Hospital",
+            paid_until=timezone.localdate() + timedelta(days=30),
+        )
+        self.tenant.save(verbosity=0)
+        connection.set_tenant(self.tenant)
+
+        self.physician = MyUser.objects.create_user("physician@example.com", "password")
+        self.patients = [
+            Patient.objects.create(pin=f"TST-0001-{index:04d}") for index in range(2)
+        ]
+        self.day = timezone.localdate() + timedelta(days=7)
+
+    def tearDown(self):
+        connection.set_schema_to_public()
+        self.tenant.delete(force_drop=True)
+
+    def book(self, patient, appointment_time, duration_minutes=30):
+        return PatientAppointment.objects.create(
+            patient=patient,
+            physician=self.physician,
+            appointment_date=self.day,
+            appointment_time=appointment_time,
+            duration_minutes=duration_minutes,
+            reason="Check-up",
+            category="General",
+        )
+
+    def test_concurrent_overlapping_bookings_raise_conflict(self):
+        barrier = threading.Barrier(2)
+        outcomes = []
+
+        def worker(patient, appointment_time):
+            try:
+                with tenant_context(self.tenant):
+                    barrier.wait()
+                    with appointment_overlap_guard():
+                        self.book(patient, appointment_time)
+                outcomes.append("booked")
+            except AppointmentTimeConflictError:
+                outcomes.append("conflict")
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(self.patients[0], time(9, 0))),
+            threading.Thread(target=worker, args=(self.patients[1], time(9, 15))),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(outcomes) == ["booked", "conflict"]
+        assert PatientAppointment.objects.filter(
+            physician=self.physician, status__in=PatientAppointment.ACTIVE_STATUSES
+        ).count() == 1
+
+    def test_time_range_follows_queryset_update(self):
+        appointment = self.book(self.patients[0], time(9, 0))
+        PatientAppointment.objects.filter(pk=appointment.pk).update(appointment_time=time(11, 0))
+
+        appointment.refresh_from_db()
+        assert appointment.time_range == PatientAppointment.build_time_range(self.day, time(11, 0), 30)
+
+    def test_adjacent_bookings_do_not_conflict(self):
+        self.book(self.patients[0], time(9, 0))
+        with appointment_overlap_guard():
+            self.book(self.patients[1], time(9, 30))
+
+        with pytest.raises(AppointmentTimeConflictError), appointment_overlap_guard():
+            self.book(self.patients[1], time(9, 29), duration_minutes=1)
@@ -105,6 +105,12 @@ class PatientAppointmentViewSet(BaseViewSet):
                 data=PatientAppointmentSerializer(appointment).data,
                 message="Appointment created successfully"
             )
+        except AppointmentTimeConflictError as e:
+            return self.error_response(
+                message=e.message,
+                code=409,
+                status_code=status.HTTP_409_CONFLICT
+            )
         except ValidationError as e:
             return self.error_response(message=e.detail, code=400)
 
@@ -156,9 +162,9 @@ class PatientAppointmentViewSet(BaseViewSet):
             date = datetime.strptime(date_str, "%Y-%m-%d%z").date()
             slots = AppointmentTimeService.get_available_slots(
                 physician_id=physician_id,
-                date=date,
+                target_date=date,
                 department_id=department_id,
-                slot_duration=slot_duration
+                duration=slot_duration
             )
             return self.success_response(
                 data=TimeSlotSerializer(slots, many=True).data
@@ -0,0 +1,157 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django_tenants.utils import schema_context
+
+from apps.patients.models import PatientAppointment
+from apps.scheduling.services.department_board import BOARD_APPOINTMENT_STATUSES
+from apps.scheduling.services.schedule_service import AppointmentService
+
+# name -> builder(sample) returning the queryset a hot code path runs
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    def register(builder):
+        HOT_QUERIES[name] = builder
+        return builder
+    return register
+
+
+@hot_query("busy_intervals")
+def busy_intervals_query(sample):
+    # BusyIntervalCache.compute (check_availability, slot search)
+    return PatientAppointment.objects.filter(
+        physician_id__in=[sample["physician_id"]],
+        status__in=PatientAppointment.ACTIVE_STATUSES,
+        appointment_date__range=(sample["date"] - timedelta(days=1), sample["date"] + timedelta(days=6)),
+    ).values_list("id", "physician_id", "appointment_date", "appointment_time", "duration_minutes")
+
+
+@hot_query("physician_schedule")
+def physician_schedule_query(sample):
+    # AppointmentService.get_physician_schedule
+    return PatientAppointment.objects.filter(
+        physician_id=sample["physician_id"],
+        appointment_date__range=[sample["date"], sample["date"] + timedelta(days=6)],
+        status__in=["pending", "approved", "rescheduled"],
+    ).order_by("appointment_date", "appointment_time")
+
+
+@hot_query("department_board")
+def department_board_query(sample):
+    # DepartmentBoardService.build
+    return PatientAppointment.objects.filter(
+        physician_id__in=[sample["physician_id"]],
+        appointment_date__range=(sample["date"], sample["date"] + timedelta(days=6)),
+        status__in=BOARD_APPOINTMENT_STATUSES,
+    ).order_by("appointment_date", "appointment_time")
+
+
+@hot_query("time_slot_conflicts")
+def time_slot_conflicts_query(sample):
+    # AppointmentValidator.validate_time_slot
+    return PatientAppointment.objects.filter(
+        physician_id=sample["physician_id"],
+        status__in=PatientAppointment.ACTIVE_STATUSES,
+        time_range__overlap=PatientAppointment.build_time_range(sample["date"], sample["time"], 30),
+    ).values("pk")[:1]
+
+
+@hot_query("patient_active_appointments")
+def patient_active_appointments_query(sample):
+    # PatientAppointment.can_create_appointment
+    return PatientAppointment.objects.filter(
+        Q(appointment_date__gt=sample["date"])
+        | Q(appointment_date=sample["date"], appointment_time__gte=sample["time"]),
+        patient_id=sample["patient_id"],
+        status__in=PatientAppointment.ACTIVE_STATUSES,
+    ).values("pk")[:1]
+
+
+@hot_query("appointment_history")
+def appointment_history_query(sample):
+    return AppointmentService.get_appointment_history(sample["patient_id"])
+
+
+def sequential_scans(plan, table):
+    """Yield every Seq Scan node on ``table`` in an EXPLAIN (FORMAT JSON) plan tree."""
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == table:
+        yield plan
+    for child in plan.get("Plans", ()):
+        yield from sequential_scans(child, table)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN ANALYZE for the registered appointment hot queries against a seeded "
+        "tenant and fails if any of them falls back to a sequential scan"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schema", type=str, required=True, help="Seeded tenant schema name")
+        parser.add_argument(
+            "--query", action="append", choices=sorted(HOT_QUERIES),
+            help="Only explain the given query (repeatable)",
+        )
+        parser.add_argument(
+            "--planner-default", action="store_true",
+            help=(
+                "Keep sequential scans enabled. By default they are discouraged so that small "
+                "seed data still shows whether a usable index exists"
+            ),
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full JSON plans")
+
+    def handle(self, *args, **options):
+        names = options["query"] or sorted(HOT_QUERIES)
+        table = PatientAppointment._meta.db_table
+        failures = []
+
+        with schema_context(options["schema"]):
+            sample = self.sample_parameters()
+
+            for name in names:
+                with transaction.atomic():
+                    if not options["planner_default"]:
+                        with connection.cursor() as cursor:
+                            cursor.execute("SET LOCAL enable_seqscan = off")
+                    output = HOT_QUERIES[name](sample).explain(format="json", analyze=True, buffers=True)
+
+                plan = json.loads(output)
+                if isinstance(plan, list):
+                    plan = plan[0]
+                root = plan["Plan"]
+                scans = list(sequential_scans(root, table))
+
+                summary = (
+                    f"{name}: {root['Node Type']}, cost {root['Total Cost']}, "
+                    f"{plan.get('Execution Time', 0):.3f} ms"
+                )
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f"{summary} (sequential scan on {table})"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(summary))
+                if options["verbose_plans"]:
+                    self.stdout.write(json.dumps(plan, indent=2))
+
+        if failures:
+            raise CommandError(f"Sequential scan on {table} in: {', '.join(failures)}")
+
+    def sample_parameters(self):
+        """Parameters taken from the tenant's most recent appointment."""
+        latest = PatientAppointment.objects.order_by("-appointment_date", "-appointment_time").values(
+            "physician_id", "patient_id", "appointment_date", "appointment_time"
+        ).first()
+        if latest is None:
+            raise CommandError("No appointments in this schema; seed the tenant before explaining queries")
+        return {
+            "physician_id": latest["physician_id"],
+            "patient_id": latest["patient_id"],
+            "date": latest["appointment_date"],
+            "time": latest["appointment_time"],
+        }
@@ -2,12 +2,16 @@ import datetime
 from datetime import timedelta
 
 from django.db import models
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from django.db.models import Case, F, IntegerField, Q, Sum, When
 from django.db.models.functions import TruncWeek
 from django.utils import timezone
 
 
 class ShiftQuerySet(models.QuerySet):
+    # Statuses that occupy the user's time; the exclusion constraint applies to these
+    ACTIVE_STATUSES = ("SCHEDULED", "EMERGENCY")
+
     def for_user(self, user):
         return self.filter(user=user)
 
@@ -17,11 +21,17 @@ class ShiftQuerySet(models.QuerySet):
     def upcoming(self):
         return self.filter(start_datetime__gte=timezone.now())
 
+    def in_effect(self):
+        return self.filter(status__in=self.ACTIVE_STATUSES)
+
     def overlapping(self, start, end):
-        return self.filter(
-            models.Q(start_datetime__lt=end) &
-            models.Q(end_datetime__gt=start)
-        )
+        """Shifts overlapping ``[start, end)``, answered by the (user, time_range) GiST index."""
+        return self.filter(time_range__overlap=DateTimeTZRange(start, end, "[)"))
+
+    def starting_on(self, date):
+        """Shifts starting on a local calendar day, as an index-friendly range on start_datetime."""
+        day_start = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+        return self.filter(start_datetime__gte=day_start, start_datetime__lt=day_start + timedelta(days=1))
 
 class ShiftManager(models.Manager):
     def get_queryset(self):
@@ -1,8 +1,9 @@
 # Generated by Django 5.1.4 on 2025-02-14 11:00
 
 import datetime
-import django.db.models.deletion
 import uuid
+
+import django.db.models.deletion
 from django.conf import settings
 from django.db import migrations, models
 
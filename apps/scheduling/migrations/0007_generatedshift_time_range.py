@@ -0,0 +1,75 @@
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.fields import RangeOperators
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+# Existing overlapping active shifts would make the constraint impossible
+# to create. They are not resolved here: the migration stops and lists them
+# so they can be reviewed and cancelled or rescheduled before re-running it.
+LEGACY_OVERLAPS_SQL = """
+    SELECT earlier.id, later.id, later.user_id, later.start_datetime, later.end_datetime
+    FROM generated_shifts AS later
+    JOIN generated_shifts AS earlier
+      ON earlier.user_id = later.user_id
+     AND (earlier.start_datetime, earlier.id) < (later.start_datetime, later.id)
+     AND tstzrange(earlier.start_datetime, earlier.end_datetime, '[)')
+         && tstzrange(later.start_datetime, later.end_datetime, '[)')
+    WHERE later.status IN ('SCHEDULED', 'EMERGENCY')
+      AND earlier.status IN ('SCHEDULED', 'EMERGENCY')
+    ORDER BY later.user_id, later.start_datetime
+"""
+
+
+def check_legacy_overlaps(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(LEGACY_OVERLAPS_SQL)
+        conflicts = cursor.fetchall()
+    if conflicts:
+        rows = "\n".join(
+            f"  shift {later_id} (user {user_id}, {start} - {end}) overlaps shift {earlier_id}"
+            for earlier_id, later_id, user_id, start, end in conflicts
+        )
+        raise RuntimeError(
+            f"Cannot add exclude_overlapping_user_shifts in schema "
+            f"{schema_editor.connection.schema_name}: {len(conflicts)} overlapping active "
+            f"shifts. Cancel or reschedule them and run the migration again:\n{rows}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduling", "0006_usershiftstate_weekend_shift_count"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(check_legacy_overlaps, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="generatedshift",
+            name="time_range",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Func(
+                    models.F("start_datetime"),
+                    models.F("end_datetime"),
+                    models.Value("[)"),
+                    function="TSTZRANGE",
+                    output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="generatedshift",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(status__in=("SCHEDULED", "EMERGENCY")),
+                expressions=[
+                    ("user", RangeOperators.EQUAL),
+                    ("time_range", RangeOperators.OVERLAPS),
+                ],
+                name="exclude_overlapping_user_shifts",
+            ),
+        ),
+    ]
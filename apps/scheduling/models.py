@@ -2,6 +2,8 @@ import uuid
 from datetime import date, timedelta
 
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -164,8 +166,20 @@ class GeneratedShift(models.Model):
         default=Status.SCHEDULED
     )
     penalty_score = models.FloatField(default=0.0)
+    # [start_datetime, end_datetime) maintained by the database
+    time_range = models.GeneratedField(
+        expression=models.Func(
+            models.F("start_datetime"),
+            models.F("end_datetime"),
+            models.Value("[)"),
+            function="TSTZRANGE",
+            output_field=DateTimeRangeField(),
+        ),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
 
-    objects = models.Manager()
+    objects = models.Manager.from_queryset(ShiftQuerySet)()
     active = models.Manager.from_queryset(ShiftQuerySet)()
 
 
@@ -175,6 +189,17 @@ class GeneratedShift(models.Model):
         indexes = [
             models.Index(fields=["start_datetime", "end_datetime"])
         ]
+        constraints = [
+            # Also serves as the GiST index for per-user overlap lookups
+            ExclusionConstraint(
+                name="exclude_overlapping_user_shifts",
+                expressions=[
+                    ("user", RangeOperators.EQUAL),
+                    ("time_range", RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=("SCHEDULED", "EMERGENCY")),
+            ),
+        ]
     def clean(self):
         super().clean()
         if self.start_datetime >= self.end_datetime:
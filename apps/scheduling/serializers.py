@@ -20,6 +20,8 @@ TIME_WINDOW_LENGTH = 2
 MAX_HOUR = 23
 MAX_MINUTE = 59
 TIME_STRING_LENGTH = 5
+MAX_SEARCH_DAYS = 31
+MAX_SEARCH_RESULTS = 100
 
 User = get_user_model()
 
@@ -258,3 +260,28 @@ class ShiftGenerationSerializer(serializers.Serializer):
 
         return validated_data
 
+
+class AvailabilitySearchSerializer(serializers.Serializer):
+    department_id = serializers.UUIDField(required=True)
+    start_date = serializers.DateField(required=False)
+    days = serializers.IntegerField(required=False, default=14, min_value=1, max_value=MAX_SEARCH_DAYS)
+    duration = serializers.IntegerField(required=False, default=30, min_value=5, max_value=480)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=MAX_SEARCH_RESULTS)
+
+    def validate_start_date(self, value):
+        if value < timezone.localdate():
+            raise serializers.ValidationError("start_date cannot be in the past")
+        return value
+
+
+class AvailableSlotSerializer(serializers.Serializer):
+    physician_id = serializers.UUIDField()
+    physician_name = serializers.CharField()
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+
+class DepartmentBoardSerializer(serializers.Serializer):
+    department_id = serializers.UUIDField(required=True)
+    date = serializers.DateField(required=False)
+    view = serializers.ChoiceField(choices=["day", "week"], required=False, default="day")
@@ -0,0 +1,190 @@
+# Materialized per-physician busy intervals
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from apps.scheduling.managers import ShiftQuerySet
+from apps.scheduling.models import GeneratedShift
+from core.cache import CacheNamespace
+
+logger = logging.getLogger(__name__)
+
+
+class BusyDay(NamedTuple):
+    """
+    Busy intervals of one physician on one local calendar day.
+
+    ``shifts`` holds ``(start, end, shift_id, department_id)`` and
+    ``appointments`` holds ``(start, end, appointment_id)``, both sorted by
+    start. Intervals crossing midnight are listed on every day they touch.
+    """
+
+    shifts: tuple = ()
+    appointments: tuple = ()
+
+    def conflicting_appointment(self, start: datetime, end: datetime, exclude_id: str | None = None):
+        """Return the first appointment overlapping ``[start, end)``, if any."""
+        for appointment_start, appointment_end, appointment_id in self.appointments:
+            if appointment_start >= end:
+                break
+            if appointment_end > start and appointment_id != exclude_id:
+                return appointment_start, appointment_end, appointment_id
+        return None
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _touched_days(start: datetime, end: datetime) -> list[date]:
+    """Local calendar days touched by ``[start, end)``."""
+    first = timezone.localtime(start).date()
+    last = timezone.localtime(end - timedelta(microseconds=1)).date() if end > start else first
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def appointment_bounds(appointment_date: date, appointment_time: time, duration_minutes: int):
+    start = timezone.make_aware(datetime.combine(appointment_date, appointment_time))
+    return start, start + timedelta(minutes=duration_minutes or 0)
+
+
+class BusyIntervalCache:
+    """
+    Per-physician, per-day busy intervals kept in the shared cache.
+
+    Entries are read in bulk with ``get_many``; missing days are rebuilt
+    from two queries (shifts and active appointments) for the whole
+    requested range and written back with ``set_many``. Saving or deleting
+    a ``PatientAppointment`` or ``GeneratedShift`` drops only the affected
+    (physician, day) entries once the transaction commits, see
+    ``apps.scheduling.signals``. Keys are tenant-scoped by the cache's
+    ``KEY_FUNCTION``.
+    """
+
+    CACHE_PREFIX = "busy_v1"
+    CACHE_TIMEOUT = 60 * 60 * 24  # 1 day
+    busy_cache = CacheNamespace("busy_intervals", timeout=CACHE_TIMEOUT)
+
+    @classmethod
+    def _key(cls, physician_id, day: date) -> str:
+        return f"{cls.CACHE_PREFIX}:{physician_id}:{day.isoformat()}"
+
+    @classmethod
+    def get_day(cls, physician_id, day: date) -> BusyDay:
+        return cls.get_days([physician_id], day, day)[(str(physician_id), day)]
+
+    @classmethod
+    def get_days(cls, physician_ids, start_date: date, end_date: date) -> dict[tuple[str, date], BusyDay]:
+        """
+        Return busy intervals for every (physician, day) in ``[start_date, end_date]``.
+
+        :return: ``{(str(physician_id), day): BusyDay}``
+        """
+        physician_ids = [str(physician_id) for physician_id in physician_ids]
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        keys = {cls._key(physician_id, day): (physician_id, day) for physician_id in physician_ids for day in days}
+
+        def compute_missing(missing_keys):
+            missing_physicians = {keys[key][0] for key in missing_keys}
+            rebuilt = cls.compute(missing_physicians, start_date, end_date)
+            return {key: tuple(rebuilt[keys[key]]) for key in missing_keys}
+
+        cached = cls.busy_cache.get_many_or_compute(list(keys), compute_missing)
+        return {keys[key]: BusyDay(*value) for key, value in cached.items()}
+
+    @classmethod
+    def compute(cls, physician_ids, start_date: date, end_date: date) -> dict[tuple[str, date], BusyDay]:
+        """Build busy intervals from the database, bypassing the cache."""
+        physician_ids = [str(physician_id) for physician_id in physician_ids]
+        range_start = _day_bounds(start_date)[0]
+        range_end = _day_bounds(end_date)[1]
+
+        shifts = defaultdict(list)
+        for shift_id, user_id, department_id, shift_start, shift_end in GeneratedShift.objects.filter(
+            user_id__in=physician_ids,
+            status__in=ShiftQuerySet.ACTIVE_STATUSES,
+            start_datetime__lt=range_end,
+            end_datetime__gt=range_start,
+        ).values_list("id", "user_id", "department_id", "start_datetime", "end_datetime"):
+            for day in _touched_days(shift_start, shift_end):
+                shifts[(str(user_id), day)].append((shift_start, shift_end, str(shift_id), str(department_id)))
+
+        PatientAppointment = apps.get_model("patients", "PatientAppointment")
+        appointments = defaultdict(list)
+        for appointment_id, physician_id, appointment_date, appointment_time, duration in (
+            PatientAppointment.objects.filter(
+                physician_id__in=physician_ids,
+                status__in=PatientAppointment.ACTIVE_STATUSES,
+                # Include the previous day for appointments running past midnight
+                appointment_date__range=(start_date - timedelta(days=1), end_date),
+            ).values_list("id", "physician_id", "appointment_date", "appointment_time", "duration_minutes")
+        ):
+            appointment_start, appointment_end = appointment_bounds(appointment_date, appointment_time, duration)
+            for day in _touched_days(appointment_start, appointment_end):
+                appointments[(str(physician_id), day)].append(
+                    (appointment_start, appointment_end, str(appointment_id))
+                )
+
+        result = {}
+        day = start_date
+        while day <= end_date:
+            for physician_id in physician_ids:
+                result[(physician_id, day)] = BusyDay(
+                    tuple(sorted(shifts.get((physician_id, day), ()))),
+                    tuple(sorted(appointments.get((physician_id, day), ()))),
+                )
+            day += timedelta(days=1)
+        return result
+
+    @classmethod
+    def invalidate(cls, entries) -> None:
+        """
+        Drop cached days after the current transaction commits.
+
+        :param entries: Iterable of ``(physician_id, start, end)`` intervals
+        """
+        keys = {
+            cls._key(physician_id, day)
+            for physician_id, start, end in entries
+            for day in _touched_days(start, end)
+        }
+        if keys:
+            transaction.on_commit(lambda: cls.busy_cache.delete_many(keys))
+
+    @classmethod
+    def verify_day(cls, physician_id, day: date, *, repair: bool = True) -> dict:
+        """
+        Consistency check: rebuild one day from the database and diff it against the cache.
+
+        :param repair: Overwrite the cached entry with the rebuilt one when they differ
+        :return: ``{"consistent", "cached", "missing", "stale"}`` where ``missing`` are
+                 intervals absent from the cache and ``stale`` cached ones no longer in the database
+        """
+        key = cls._key(physician_id, day)
+        cached_value = cls.busy_cache.get(key)
+        fresh = cls.compute([physician_id], day, day)[(str(physician_id), day)]
+
+        cached_items = set() if cached_value is None else set(BusyDay(*cached_value).shifts) | set(
+            BusyDay(*cached_value).appointments
+        )
+        fresh_items = set(fresh.shifts) | set(fresh.appointments)
+        report = {
+            "consistent": cached_value is None or cached_items == fresh_items,
+            "cached": cached_value is not None,
+            "missing": sorted(fresh_items - cached_items) if cached_value is not None else [],
+            "stale": sorted(cached_items - fresh_items),
+        }
+        if not report["consistent"]:
+            logger.warning(f"Busy interval cache drift for {physician_id} on {day}: {report}")
+            if repair:
+                cls.busy_cache.set(key, tuple(fresh))
+        return report
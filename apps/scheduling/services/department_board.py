@@ -0,0 +1,131 @@
+# Department day/week board
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+from apps.scheduling.models import GeneratedShift
+from apps.staff.models import DepartmentMember
+
+from .busy_intervals import appointment_bounds
+
+BOARD_APPOINTMENT_STATUSES = ("pending", "approved", "rescheduled")
+
+
+class DepartmentBoardService:
+    """
+    Builds the board of all doctors of a department over a day or a week.
+
+    The board costs three queries regardless of the number of doctors or
+    days (doctors, shifts and appointments, each as flat ``values_list``
+    rows) and is grouped in memory into::
+
+        {
+            "department_id": ..., "start_date": ..., "end_date": ...,
+            "physicians": [
+                {"id": ..., "name": ..., "days": {
+                    "2025-03-03": {"shifts": [...], "appointments": [...]},
+                }},
+            ],
+        }
+
+    Only days with shifts or appointments are listed per physician.
+    """
+
+    @classmethod
+    def build(cls, department_id: str, start_date: date, days: int = 1) -> dict:
+        end_date = start_date + timedelta(days=days - 1)
+        range_start = timezone.make_aware(datetime.combine(start_date, time.min))
+        range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+
+        physicians = {
+            str(user_id): {"id": str(user_id), "name": f"{first_name} {last_name}", "days": {}}
+            for user_id, first_name, last_name in DepartmentMember.objects.filter(
+                department_id=department_id,
+                role="DOCTOR",
+                is_active=True
+            ).order_by("user__last_name", "user__first_name").values_list(
+                "user_id", "user__first_name", "user__last_name"
+            )
+        }
+        board = {
+            "department_id": str(department_id),
+            "start_date": start_date,
+            "end_date": end_date,
+            "physicians": list(physicians.values()),
+        }
+        if not physicians:
+            return board
+
+        def day_entry(physician_id, day):
+            return physicians[physician_id]["days"].setdefault(
+                day.isoformat(), {"shifts": [], "appointments": []}
+            )
+
+        shifts = GeneratedShift.objects.filter(
+            department_id=department_id,
+            user_id__in=list(physicians),
+            status=GeneratedShift.Status.SCHEDULED,
+            start_datetime__lt=range_end,
+            end_datetime__gt=range_start,
+        ).order_by("start_datetime").values_list(
+            "id", "user_id", "start_datetime", "end_datetime", "source_template__name"
+        )
+        for shift_id, user_id, shift_start, shift_end, template_name in shifts:
+            local_start = timezone.localtime(shift_start)
+            day_entry(str(user_id), max(local_start.date(), start_date))["shifts"].append({
+                "id": str(shift_id),
+                "start": local_start,
+                "end": timezone.localtime(shift_end),
+                "type": template_name or "Custom",
+            })
+
+        PatientAppointment = apps.get_model("patients", "PatientAppointment")
+        appointments = PatientAppointment.objects.filter(
+            physician_id__in=list(physicians),
+            appointment_date__range=(start_date, end_date),
+            status__in=BOARD_APPOINTMENT_STATUSES,
+        ).order_by("appointment_date", "appointment_time").values_list(
+            "id", "physician_id", "patient_id", "appointment_date", "appointment_time",
+            "duration_minutes", "status", "reason",
+        )
+        for (appointment_id, physician_id, patient_id, appointment_date,
+             appointment_time, duration, status, reason) in appointments:
+            appointment_start, appointment_end = appointment_bounds(appointment_date, appointment_time, duration)
+            day_entry(str(physician_id), appointment_date)["appointments"].append({
+                "id": str(appointment_id),
+                "patient_id": str(patient_id),
+                "start": appointment_start,
+                "end": appointment_end,
+                "status": status,
+                "reason": reason,
+            })
+
+        return board
+
+    @staticmethod
+    def etag(board: dict) -> str:
+        """Strong ETag derived from the board's content."""
+        payload = json.dumps(board, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+        return f'"{hashlib.sha1(payload.encode(), usedforsecurity=False).hexdigest()}"'
+
+    @staticmethod
+    def etag_matches(etag: str, if_none_match: str) -> bool:
+        """
+        Whether an If-None-Match header matches ``etag``.
+
+        The header is a comma-separated list of entity tags or ``*``; tags are
+        compared exactly, ignoring the weak ``W/`` prefix as RFC 9110 requires
+        for If-None-Match.
+        """
+        tags = parse_etags(if_none_match)
+        if tags == ["*"]:
+            return True
+        return any(tag.removeprefix("W/") == etag for tag in tags)
@@ -2,22 +2,34 @@
 
 from __future__ import annotations
 
+import heapq
 from collections import defaultdict
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from enum import Enum
+from itertools import islice
 from typing import Any, TypeAlias
 
 from dateutil.relativedelta import relativedelta
 from django.apps import apps
-from django.core.cache import cache
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
+from simple_history.utils import bulk_create_with_history
 
 from apps.scheduling.models import GeneratedShift
+from apps.scheduling.services.busy_intervals import (
+    BusyIntervalCache,
+    appointment_bounds,
+)
+from apps.scheduling.utils.availability import AvailabilityIndex
+from apps.staff.models import DepartmentMember
 from apps.staff.models.staff_profile import DoctorProfile
+from core.cache import CacheNamespace
+
+BULK_BATCH_SIZE = 500
 
 # Type Aliases for better type hinting
 DateTimeRange: TypeAlias = tuple[datetime, datetime]
@@ -54,59 +66,135 @@ class AppointmentTimeConflictError(Exception):
         self.conflicting_appointment = conflicting_appointment
         super().__init__(self.message)
 
+@contextmanager
+def appointment_overlap_guard():
+    """
+    Translate the database overlap constraint into AppointmentTimeConflictError.
+
+    ``PatientAppointment`` excludes overlapping active appointments per
+    physician at the database level, which stays correct under concurrent
+    bookings where application-side checks race. The write runs in a
+    savepoint so the caller's transaction survives the error.
+    """
+    PatientAppointment = apps.get_model("patients", "PatientAppointment")
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as e:
+        if PatientAppointment.OVERLAP_CONSTRAINT_NAME in str(e):
+            raise AppointmentTimeConflictError("Time conflicts with existing appointment") from e
+        raise
+
 class SchedulePatternService:
     """Service for managing physician schedule patterns."""
 
+    CACHE_TIMEOUT = 3600  # 1 hour - balances freshness and performance
+    pattern_cache = CacheNamespace("schedule_patterns", timeout=CACHE_TIMEOUT)
+
+    @staticmethod
+    def week_start_for(day: date) -> date:
+        return day - timezone.timedelta(days=day.weekday())
+
     @classmethod
     def get_schedule_pattern(cls, physician_id: str, week_start: date, department_id: str | None = None) -> dict:
         """Get schedule pattern for a physician."""
         # Get current week boundaries
-        week_start = week_start - timezone.timedelta(days=week_start.weekday())
-        print(week_start)
+        week_start = cls.week_start_for(week_start)
         cache_key = cls._build_cache_key(physician_id, department_id, week_start)
 
-        # Try cache first
-        if (cached := cache.get(cache_key)) is not None:
-            print(f"cached {cached}")
-            return cached
-
-        # Cache miss - generate fresh data
-        schedule = cls._generate_schedule(physician_id, department_id, week_start)
-        print(f"frh {schedule}")
-        legacy_format = cls._convert_to_legacy_format(schedule)
-
-        # Cache with timeout and versioning
-        cache.set(
+        # Computed once across workers on a miss, refreshed early when hot
+        return cls.pattern_cache.get_or_compute(
             cache_key,
-            legacy_format,
-            timeout=3600  # 1 hour - balances freshness and performance
+            lambda: cls._convert_to_legacy_format(
+                cls._generate_schedule(physician_id, department_id, week_start)
+            ),
         )
-        return legacy_format
 
+    @classmethod
+    def get_schedule_patterns(
+        cls,
+        physician_ids,
+        start_date: date,
+        end_date: date,
+        department_id: str | None = None
+    ) -> dict[tuple[str, date], dict]:
+        """
+        Get the patterns of many physicians for every week touching ``[start_date, end_date]``.
+
+        All keys are read with one ``get_many``; the misses are computed from
+        a single shift query and written back with one ``set_many``.
+
+        :return: ``{(str(physician_id), week_start): legacy pattern}``
+        """
+        physician_ids = [str(physician_id) for physician_id in physician_ids]
+        week_starts = []
+        week_start = cls.week_start_for(start_date)
+        while week_start <= end_date:
+            week_starts.append(week_start)
+            week_start += timedelta(weeks=1)
+
+        keys = {
+            cls._build_cache_key(physician_id, department_id, week_start): (physician_id, week_start)
+            for physician_id in physician_ids
+            for week_start in week_starts
+        }
+
+        def compute_missing(missing_keys):
+            missing = [keys[key] for key in missing_keys]
+            missing_physicians = {physician_id for physician_id, _ in missing}
+            missing_weeks = [week_start for _, week_start in missing]
+            shifts = cls._shift_queryset(
+                department_id,
+                user_id__in=list(missing_physicians),
+                start_datetime__date__gte=min(missing_weeks),
+                start_datetime__date__lte=max(missing_weeks) + timezone.timedelta(days=6),
+            )
+
+            grouped = defaultdict(list)
+            for shift in shifts:
+                week_start = cls.week_start_for(timezone.localtime(shift.start_datetime).date())
+                # Same rule as the single-week query: the shift must end inside its week
+                if timezone.localtime(shift.end_datetime).date() <= week_start + timezone.timedelta(days=6):
+                    grouped[(str(shift.user_id), week_start)].append(shift)
+
+            return {
+                key: cls._convert_to_legacy_format(cls._aggregate(grouped.get(keys[key], [])))
+                for key in missing_keys
+            }
+
+        cached = cls.pattern_cache.get_many_or_compute(list(keys), compute_missing)
+        patterns = {keys[key]: pattern for key, pattern in cached.items()}
+        return patterns
 
     @staticmethod
     def _build_cache_key(physician_id: str, department_id: str | None, week_start: date) -> str:
         base_key = f"schedule_v2:{physician_id}:{week_start.isoformat()}"
         return f"{base_key}:{department_id}" if department_id else f"{base_key}:all"
 
+    @staticmethod
+    def _shift_queryset(department_id: str | None, **filters):
+        shifts = GeneratedShift.objects.filter(
+            status="SCHEDULED", **filters
+        ).select_related("department", "source_template").order_by("start_datetime")
+        if department_id:
+            shifts = shifts.filter(department_id=department_id)
+        return shifts
+
     @classmethod
     def _generate_schedule(cls, physician_id: str, department_id: str | None, week_start: date) -> dict:
         week_end = week_start + timezone.timedelta(days=6)
-        print(week_end)
-        print(physician_id, department_id)
-         # Get relevant shifts for this week
-        shifts = GeneratedShift.objects.filter(
+        # Get relevant shifts for this week
+        shifts = cls._shift_queryset(
+            department_id,
             user_id=physician_id,
             start_datetime__date__gte=week_start,
             end_datetime__date__lte=week_end,
-            status="SCHEDULED"
-        ).select_related("department").order_by("start_datetime")
-
-        if department_id:
-            shifts = shifts.filter(department_id=department_id)
-        print(shifts)
+        )
+        return cls._aggregate(shifts)
 
-        # Aggregate shifts by weekday
+    @staticmethod
+    def _aggregate(shifts) -> dict:
+        """Aggregate shifts by weekday."""
         schedule = defaultdict(list)
         for shift in shifts:
             day = shift.start_datetime.strftime("%A").lower()
@@ -123,7 +211,26 @@ class SchedulePatternService:
         """Call this when shifts change for a physician."""
         week_start = week_start - timezone.timedelta(days=week_start.weekday())
         cache_key = cls._build_cache_key(physician_id, department_id, week_start)
-        cache.delete(cache_key)
+        cls.pattern_cache.delete(cache_key)
+
+    @classmethod
+    def invalidate_weeks(cls, entries, department_id: str | None = None):
+        """
+        Invalidate many (physician_id, date) pairs with a single cache call.
+
+        Dates are normalised to their week start, so each affected week is
+        deleted once no matter how many of its shifts changed.
+        """
+        cache_keys = {
+            cls._build_cache_key(
+                physician_id,
+                department_id,
+                day - timezone.timedelta(days=day.weekday())
+            )
+            for physician_id, day in entries
+        }
+        if cache_keys:
+            cls.pattern_cache.delete_many(cache_keys)
 
     @staticmethod
     def _convert_to_legacy_format(shifts: dict) -> dict:
@@ -263,64 +370,282 @@ class RecurringAppointmentService:
         return cls._create_appointments(dates, serializer, staff_member, patient_id)
 
     @staticmethod
+    def _physician_id(validated_data: dict):
+        """Physician UUID from validated data holding either an instance or a UUID."""
+        physician = validated_data.get("physician") or validated_data.get("user")
+        return getattr(physician, "id", physician)
+
+    @classmethod
     def _validate_recurring_dates(
+        cls,
         dates: list[str | datetime],  # Accept either strings or datetime objects
         serializer: Any,
-        staff_member: Any  # noqa: ARG004
+        staff_member: Any
     ) -> None:
-        """Validate availability for all recurring dates."""
-        for appointment_date in dates:
-            # Handle string dates
-            if isinstance(appointment_date, str):
-                try:
-                    appointment_datetime = datetime.fromisoformat(appointment_date)
-                except ValueError as e:
-                    raise ValidationError(f"Invalid date format: {appointment_date}") from e
-            else:
-                appointment_datetime = appointment_date
+        """
+        Validate availability for all recurring dates at once.
 
-            result = AppointmentService.check_availability(
-                physician_id=serializer.validated_data["user"].id,
-                start_datetime=appointment_datetime,
-                end_datetime=appointment_datetime + timedelta(
-                    minutes=serializer.validated_data.get("duration_minutes", 30)
-                )
-            )
+        The physician, the schedule patterns of every week in the series,
+        leave and busy intervals are fetched once and every occurrence is
+        checked in memory against its own week, so the query count does not
+        grow with the series length.
+        """
+        if not dates:
+            return
+
+        appointment_datetimes = [cls._aware_datetime(appointment_date) for appointment_date in dates]
+        physician_id = cls._physician_id(serializer.validated_data)
+        department = serializer.validated_data.get("department")
+        department_id = getattr(department, "id", department)
+        duration = timedelta(minutes=serializer.validated_data.get("duration_minutes", 30))
+        cls._validate_physician(physician_id, department_id)
+
+        first_day = timezone.localtime(min(appointment_datetimes)).date()
+        last_day = timezone.localtime(max(appointment_datetimes) + duration).date()
+        # Each occurrence is checked against the shifts of its own week
+        patterns = SchedulePatternService.get_schedule_patterns(
+            [physician_id], first_day, last_day, department_id
+        )
+        availability = AvailabilityIndex.for_users([physician_id], first_day, last_day)
+        busy_days = BusyIntervalCache.get_days([physician_id], first_day, last_day)
 
+        for start in appointment_datetimes:
+            end = start + duration
+            start_day = timezone.localtime(start).date()
+            end_day = timezone.localtime(end).date()
+
+            # Raises AppointmentTimeConflictError outside working hours
+            AppointmentTimeService.is_within_schedule(
+                patterns[(str(physician_id), SchedulePatternService.week_start_for(start_day))], start
+            )
 
-            if not result["available"]:
+            if not availability.is_available_range(physician_id, start_day, end_day):
                 raise AppointmentTimeConflictError(
-                    f"Physician not available at {appointment_datetime}: {result['message']}"
+                    f"Physician not available at {start}: Physician is unavailable on this date"
+                )
+            if any(
+                busy_days[(str(physician_id), day)].conflicting_appointment(start, end)
+                for day in {start_day, end_day}
+            ):
+                raise AppointmentTimeConflictError(
+                    f"Physician not available at {start}: Time conflicts with existing appointment"
                 )
 
     @staticmethod
+    def _aware_datetime(appointment_date: str | datetime) -> datetime:
+        # Handle string dates
+        if isinstance(appointment_date, str):
+            try:
+                appointment_date = datetime.fromisoformat(appointment_date)
+            except ValueError as e:
+                raise ValidationError(f"Invalid date format: {appointment_date}") from e
+        if timezone.is_naive(appointment_date):
+            return timezone.make_aware(appointment_date)
+        return appointment_date
+
+    @staticmethod
+    def _validate_physician(physician_id, department_id) -> None:
+        """
+        Check the physician exists and may book in the department.
+
+        Uses the rule of ``AppointmentService.check_availability``: members
+        with the Doctor role may book in any department, others only in a
+        clinical department they are assigned to.
+        """
+        physician = DoctorProfile.objects.select_related("user").filter(user_id=physician_id).first()
+        if physician is None:
+            raise AppointmentTimeConflictError("Physician not found or inactive")
+        if not department_id:
+            return
+
+        membership = physician.user.hospital_memberships_user.select_related("role").first()
+        if membership is not None and membership.role.name == "Doctor":
+            return
+        if not physician.user.department_members.filter(
+            department_id=department_id,
+            department__department_type="CLINICAL",
+        ).exists():
+            raise AppointmentTimeConflictError("Physician not assigned to specified department")
+
+    @classmethod
     def _create_appointments(
+        cls,
         dates: list[datetime],
         serializer: Any,
         staff_member: Any,
         patient_id: str
     ) -> list[Any]:
-        """Create all appointments in the series."""
+        """Create all appointments in the series and their history rows in bulk."""
         PatientAppointment = apps.get_model("patients", "PatientAppointment")
-        created_appointments = []
+        validated_data = dict(serializer.validated_data)
+        physician_id = cls._physician_id(validated_data)
+        department = validated_data.pop("department", None)
+        validated_data.pop("physician", None)
+        validated_data.pop("user", None)
+
+        appointments = [
+            PatientAppointment(
+                **validated_data,
+                physician_id=physician_id,
+                department_id=getattr(department, "id", department),
+                appointment_date=appointment_datetime.date(),
+                appointment_time=appointment_datetime.time(),
+                is_recurring=True,
+                patient_id=patient_id,
+                created_by=staff_member,
+                modified_by=staff_member,
+                status=AppointmentStatus.PENDING.value,
+            )
+            for appointment_datetime in dates
+        ]
+
+        with appointment_overlap_guard():
+            created_appointments = bulk_create_with_history(
+                appointments,
+                PatientAppointment,
+                batch_size=BULK_BATCH_SIZE,
+                default_user=staff_member,
+            )
+            # bulk_create sends no post_save, so clear the busy intervals here
+            BusyIntervalCache.invalidate(
+                (
+                    physician_id,
+                    *appointment_bounds(
+                        appointment.appointment_date,
+                        appointment.appointment_time,
+                        appointment.duration_minutes,
+                    ),
+                )
+                for appointment in created_appointments
+            )
 
-        with transaction.atomic():
-            for appointment_datetime in dates:
-                appointment_data = {
-                    **serializer.validated_data,
-                    "appointment_date": appointment_datetime.date(),
-                    "appointment_time": appointment_datetime.time(),
-                    "is_recurring": True,
-                    "patient_id": patient_id,
-                    "created_by": staff_member,
-                    "modified_by": staff_member,
-                    "status": AppointmentStatus.PENDING.value
-                }
+        return created_appointments[0]
 
-                appointment = PatientAppointment.objects.create(**appointment_data)
-                created_appointments.append(appointment)
 
-        return created_appointments[0]
+class SlotGrid:
+    """
+    Working windows and busy intervals of one physician for one calendar day.
+
+    Windows come from the physician's scheduled shifts (clipped to the day)
+    and busy intervals from active appointments. Both are sorted and merged
+    on construction, so :meth:`slots` is a single sweep with no queries.
+    Build grids with :meth:`load`, which reads the busy-interval cache and
+    costs a constant number of queries for any number of physicians, days
+    and slot durations.
+    """
+
+    def __init__(
+        self,
+        target_date: date,
+        windows: list[DateTimeRange],
+        busy: list[tuple[datetime, datetime, str | None]],
+        *,
+        unavailable: bool = False
+    ):
+        self.date = target_date
+        self.day_start = timezone.make_aware(datetime.combine(target_date, time.min))
+        self.day_end = self.day_start + timedelta(days=1)
+        self.unavailable = unavailable
+        self.windows = self._merge(
+            (max(start, self.day_start), min(end, self.day_end))
+            for start, end in windows
+            if start < self.day_end and end > self.day_start
+        )
+        self.busy = sorted(busy)
+
+    @staticmethod
+    def _merge(intervals) -> list[DateTimeRange]:
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @classmethod
+    def load(
+        cls,
+        physician_ids,
+        start_date: date,
+        end_date: date,
+        department_id: str | None = None
+    ) -> dict[tuple[str, date], SlotGrid]:
+        """
+        Build a grid for every (physician, day) in ``[start_date, end_date]``.
+
+        Busy intervals come from :class:`BusyIntervalCache` (one ``get_many``,
+        plus two queries for any days not cached) and leave from one query.
+
+        :return: ``{(str(physician_id), day): SlotGrid}``
+        """
+        physician_ids = [str(physician_id) for physician_id in physician_ids]
+        busy_days = BusyIntervalCache.get_days(physician_ids, start_date, end_date)
+        availability = AvailabilityIndex.for_users(physician_ids, start_date, end_date)
+
+        grids = {}
+        for (physician_id, day), busy_day in busy_days.items():
+            grids[(physician_id, day)] = cls(
+                day,
+                [
+                    (shift_start, shift_end)
+                    for shift_start, shift_end, _, shift_department_id in busy_day.shifts
+                    if not department_id or shift_department_id == str(department_id)
+                ],
+                list(busy_day.appointments),
+                unavailable=not availability.is_available(physician_id, day),
+            )
+        return grids
+
+    @classmethod
+    def for_day(cls, physician_id: str, target_date: date, department_id: str | None = None) -> SlotGrid:
+        """Build the grid of a single physician and day."""
+        return cls.load([physician_id], target_date, target_date, department_id)[
+            (str(physician_id), target_date)
+        ]
+
+    def slots(self, duration: int = 30, *, available_only: bool = False) -> list[TimeSlot]:
+        """Return the day's ``duration``-minute slots as a list."""
+        return list(self.iter_slots(duration, available_only=available_only))
+
+    def iter_slots(self, duration: int = 30, *, available_only: bool = False):
+        """
+        Split the working windows into ``duration``-minute slots, in order.
+
+        Slots are marked unavailable when they overlap an appointment; the
+        appointment pointer only moves forward, so the sweep is linear in
+        the number of slots plus appointments.
+        """
+        if self.unavailable:
+            return
+
+        step = timedelta(minutes=duration)
+        position = 0
+        for window_start, window_end in self.windows:
+            slot_start = window_start
+            while slot_start + step <= window_end:
+                slot_end = slot_start + step
+                # Skip appointments that end before this slot starts
+                while position < len(self.busy) and self.busy[position][1] <= slot_start:
+                    position += 1
+
+                conflict = None
+                for interval in self.busy[position:]:
+                    if interval[0] >= slot_end:
+                        break
+                    if interval[1] > slot_start:
+                        conflict = interval
+                        break
+
+                if conflict is None or not available_only:
+                    yield TimeSlot(
+                        start_time=slot_start,
+                        end_time=slot_end,
+                        is_available=conflict is None,
+                        conflict_type="appointment" if conflict else None,
+                        conflict_id=conflict[2] if conflict else None,
+                    )
+                slot_start = slot_end
 
 
 class AppointmentTimeService:
@@ -357,42 +682,65 @@ class AppointmentTimeService:
         department_id: str | None = None,
         duration: int = 30
     ) -> list[TimeSlot]:
-        """Get available appointment slots for a specific date."""
-        schedule = SchedulePatternService.get_schedule_pattern(physician_id, department_id)
-        day_schedule = schedule.get(target_date.strftime("%A").lower())
-
-        if not day_schedule:
-            return []
-
-        # Generate time slots
-        slots = []
-        start_time = datetime.combine(
-            target_date,
-            datetime.strptime(day_schedule["start"], "%H:%M%z").time()
-        )
-        end_time = datetime.combine(
-            target_date,
-            datetime.strptime(day_schedule["end"], "%H:%M%z").time()
-        )
+        """
+        Get appointment slots for a specific date.
 
-        while start_time < end_time:
-            slot_end = start_time + timedelta(minutes=duration)
-            if slot_end > end_time:
-                break
+        Shifts, appointments and leave are loaded up front, so the whole
+        day costs a constant number of queries regardless of ``duration``.
+        """
+        return SlotGrid.for_day(physician_id, target_date, department_id).slots(duration)
 
-            is_available = AppointmentService.check_availability(
-                physician_id, start_time, slot_end
-            )["available"]
+    @staticmethod
+    def search_department_slots(
+        department_id: str,
+        start_date: date,
+        days: int = 14,
+        duration: int = 30,
+        limit: int = 10
+    ) -> list[dict]:
+        """
+        Find the earliest free slots with any doctor of a department.
 
-            slots.append(TimeSlot(
-                start_time=start_time,
-                end_time=slot_end,
-                is_available=is_available
-            ))
+        All grids for the department and range are built in bulk (one query
+        for the doctors plus the constant cost of ``SlotGrid.load``); each
+        doctor's free slots are then produced lazily in time order and
+        merged, so the search stops after ``limit`` matches.
 
-            start_time = slot_end
+        :return: ``[{"physician_id", "physician_name", "start_time", "end_time"}]``
+        """
+        doctors = {
+            str(user_id): f"{first_name} {last_name}"
+            for user_id, first_name, last_name in DepartmentMember.objects.filter(
+                department_id=department_id,
+                role="DOCTOR",
+                is_active=True
+            ).values_list("user_id", "user__first_name", "user__last_name")
+        }
+        if not doctors:
+            return []
 
-        return slots
+        end_date = start_date + timedelta(days=days - 1)
+        grids = SlotGrid.load(doctors, start_date, end_date, department_id)
+        now = timezone.now()
+
+        def free_slots(physician_id):
+            day = start_date
+            while day <= end_date:
+                for slot in grids[(physician_id, day)].iter_slots(duration, available_only=True):
+                    if slot.start_time >= now:
+                        yield slot.start_time, slot.end_time, physician_id
+                day += timedelta(days=1)
+
+        merged = heapq.merge(*(free_slots(physician_id) for physician_id in doctors))
+        return [
+            {
+                "physician_id": physician_id,
+                "physician_name": doctors[physician_id],
+                "start_time": slot_start,
+                "end_time": slot_end,
+            }
+            for slot_start, slot_end, physician_id in islice(merged, limit)
+        ]
 
 class AppointmentService:
     """Main service for appointment management."""
@@ -418,14 +766,15 @@ class AppointmentService:
             serializer.validated_data["appointment_time"]
         )
 
-        return serializer.save(
-            patient_id=patient_id,
-            physician=physician,
-            department=department,
-            created_by=staff_member,
-            modified_by=staff_member,
-            status=AppointmentStatus.PENDING.value
-        )
+        with appointment_overlap_guard():
+            return serializer.save(
+                patient_id=patient_id,
+                physician=physician,
+                department=department,
+                created_by=staff_member,
+                modified_by=staff_member,
+                status=AppointmentStatus.PENDING.value
+            )
 
     @staticmethod
     @transaction.atomic
@@ -459,7 +808,8 @@ class AppointmentService:
             if not availability["available"]:
                 raise AppointmentTimeConflictError(availability["message"])
 
-        return serializer.save(modified_by=staff_member)
+        with appointment_overlap_guard():
+            return serializer.save(modified_by=staff_member)
 
     @staticmethod
     def check_availability(
@@ -488,7 +838,7 @@ class AppointmentService:
 
             # Check schedule pattern
             schedule = SchedulePatternService.get_schedule_pattern(
-                physician_id, department_id
+                physician_id, start_datetime.date(), department_id
             )
 
             if not AppointmentTimeService.is_within_schedule(schedule, start_datetime):
@@ -497,23 +847,33 @@ class AppointmentService:
                     "message": "Time outside physician's working hours"
                 }
 
-            # Check existing appointments
-            overlap_query = Q(
-                physician_id=physician_id,
-                status__in=[
-                    AppointmentStatus.PENDING.value,
-                    AppointmentStatus.CONFIRMED.value
-                ],
-                appointment_date=start_datetime,
-                appointment_time__lt=end_datetime,
-                end_time__gt=start_datetime
+            # Check leave / blackout periods
+            availability = AvailabilityIndex.for_users(
+                [physician_id], start_datetime.date(), end_datetime.date()
             )
+            if not availability.is_available_range(
+                physician.user_id, start_datetime.date(), end_datetime.date()
+            ):
+                return {
+                    "available": False,
+                    "message": "Physician is unavailable on this date"
+                }
 
-            if exclude_appointment_id:
-                overlap_query &= ~Q(id=exclude_appointment_id)
-
-            PatientAppointment = apps.get_model("patients", "PatientAppointment")
-            if PatientAppointment.objects.filter(overlap_query).exists():
+            # Check existing appointments against the cached busy intervals
+            start_datetime, end_datetime = (
+                value if timezone.is_aware(value) else timezone.make_aware(value)
+                for value in (start_datetime, end_datetime)
+            )
+            busy_days = BusyIntervalCache.get_days(
+                [physician_id],
+                timezone.localtime(start_datetime).date(),
+                timezone.localtime(end_datetime).date(),
+            )
+            exclude_id = str(exclude_appointment_id) if exclude_appointment_id else None
+            if any(
+                busy_day.conflicting_appointment(start_datetime, end_datetime, exclude_id)
+                for busy_day in busy_days.values()
+            ):
                 return {
                     "available": False,
                     "message": "Time conflicts with existing appointment"
@@ -610,7 +970,8 @@ class AppointmentService:
         appointment.rescheduled_by = staff_member
         appointment.rescheduled_at = timezone.now()
         appointment.modified_by = staff_member
-        appointment.save()
+        with appointment_overlap_guard():
+            appointment.save()
 
         return appointment
 
@@ -703,19 +1064,25 @@ class AppointmentService:
         ).order_by("appointment_date", "appointment_time")
 
         schedule = {}
+        appointments_by_date = defaultdict(list)
+        for appointment in appointments:
+            appointments_by_date[appointment.appointment_date].append(appointment)
+
+        # All weeks of the range in one cache round trip
+        patterns = SchedulePatternService.get_schedule_patterns(
+            [physician_id], start_date, end_date, department_id
+        )
         current_date = start_date
         while current_date <= end_date:
-            day_schedule = SchedulePatternService.get_schedule_pattern(
-                physician_id, department_id
-            ).get(current_date.strftime("%A").lower())
+            week_start = SchedulePatternService.week_start_for(current_date)
+            day_schedule = patterns[(str(physician_id), week_start)].get(
+                current_date.strftime("%A").lower()
+            )
 
             if day_schedule:
                 schedule[current_date] = {
                     "working_hours": day_schedule,
-                    "appointments": [
-                        apt for apt in appointments
-                        if apt.appointment_date == current_date
-                    ]
+                    "appointments": appointments_by_date.get(current_date, [])
                 }
             current_date += timedelta(days=1)
 
@@ -725,36 +1092,50 @@ class AppointmentService:
     def get_department_schedule(
         department_id: str,
         target_date: date
-    ) -> dict[str, list[Any]]:
-        """Get schedule for all physicians in a department for a specific date."""
-        schedule = {}
-        physicians = DoctorProfile.objects.filter(
-            departments__id=department_id,
-            role__name="Doctor",
-            is_active=True
+    ) -> dict[str, dict]:
+        """
+        Get schedule for all physicians in a department for a specific date.
+
+        ``working_hours`` is the physician's schedule pattern entry for the
+        day. The doctors, their patterns and their appointments are each read
+        once, so the cost does not grow with the department; the compact
+        shift-based view is served by ``DepartmentBoardService``.
+        """
+        physicians = {
+            str(user_id): f"{first_name} {last_name}"
+            for user_id, first_name, last_name in DepartmentMember.objects.filter(
+                department_id=department_id,
+                role="DOCTOR",
+                is_active=True
+            ).values_list("user_id", "user__first_name", "user__last_name")
+        }
+        patterns = SchedulePatternService.get_schedule_patterns(
+            list(physicians), target_date, target_date, department_id
         )
+        week_start = SchedulePatternService.week_start_for(target_date)
+        weekday = target_date.strftime("%A").lower()
 
-        for physician in physicians:
-            day_schedule = SchedulePatternService.get_schedule_pattern(
-                physician.id, department_id
-            ).get(target_date.strftime("%A").lower())
+        PatientAppointment = apps.get_model("patients", "PatientAppointment")
+        appointments_by_physician = defaultdict(list)
+        for appointment in PatientAppointment.objects.filter(
+            physician_id__in=list(physicians),
+            appointment_date=target_date,
+            status__in=[
+                AppointmentStatus.PENDING.value,
+                AppointmentStatus.CONFIRMED.value,
+                AppointmentStatus.RESCHEDULED.value
+            ]
+        ).order_by("appointment_time"):
+            appointments_by_physician[str(appointment.physician_id)].append(appointment)
 
+        schedule = {}
+        for physician_id, physician_name in physicians.items():
+            day_schedule = patterns[(physician_id, week_start)].get(weekday)
             if day_schedule:
-                PatientAppointment = apps.get_model("patients", "PatientAppointment")
-                appointments = PatientAppointment.objects.filter(
-                    physician_id=physician.id,
-                    appointment_date=target_date,
-                    status__in=[
-                        AppointmentStatus.PENDING.value,
-                        AppointmentStatus.CONFIRMED.value,
-                        AppointmentStatus.RESCHEDULED.value
-                    ]
-                ).order_by("appointment_time")
-
-                schedule[str(physician.id)] = {
-                    "physician_name": f"{physician.first_name} {physician.last_name}",
+                schedule[physician_id] = {
+                    "physician_name": physician_name,
                     "working_hours": day_schedule,
-                    "appointments": appointments
+                    "appointments": appointments_by_physician[physician_id]
                 }
 
         return schedule
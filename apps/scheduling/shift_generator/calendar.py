@@ -1,25 +1,129 @@
 # shift_generator/calendar.py
 
+from __future__ import annotations
+
 import calendar
 import datetime
+from functools import lru_cache
+
+WEEKEND_START = 5  # First weekend day (0=Monday, 4=Friday, 5=Saturday, 6=Sunday)
+ROTATION_WEEK_LENGTH = 7
+
+
+def is_weekend(date: datetime.date) -> bool:
+    """Single weekend definition shared by the scheduler: Saturday and Sunday."""
+    return date.weekday() >= WEEKEND_START
+
+
+class MonthCalendar:
+    """
+    Pre-computed calendar for one (year, month, department).
+
+    Per-day attributes are stored as tuples indexed by ``day - 1`` and day
+    types as bitmasks, so the scheduler's inner loop only does indexing:
+
+      - ``rotation_week``: 1-indexed week counted from the 1st of the month
+      - ``weekend_mask`` / ``holiday_mask``: bit ``day - 1`` set for weekend/holiday days
+      - ``required_staff[template_id]``: staff needed per day (weekend staffing
+        applies to weekends and holidays)
+
+    Build instances with :func:`get_month_calendar`, which memoizes them.
+    """
+
+    def __init__(self, year: int, month: int, staffing: tuple = (), holidays: frozenset = frozenset()):
+        self.year = year
+        self.month = month
+        self.days = calendar.monthrange(year, month)[1]
+        self.dates = tuple(datetime.date(year, month, day) for day in range(1, self.days + 1))
+        self.rotation_week = tuple(
+            (day - 1) // ROTATION_WEEK_LENGTH + 1 for day in range(1, self.days + 1)
+        )
+
+        self.weekend_mask = 0
+        self.holiday_mask = 0
+        for offset, date in enumerate(self.dates):
+            if is_weekend(date):
+                self.weekend_mask |= 1 << offset
+            if date in holidays:
+                self.holiday_mask |= 1 << offset
+
+        off_days = self.weekend_mask | self.holiday_mask
+        self.required_staff = {
+            template_id: tuple(
+                weekend_staff if off_days >> offset & 1 else weekday_staff
+                for offset in range(self.days)
+            )
+            for template_id, weekday_staff, weekend_staff in staffing
+        }
+        self._weeks = {}
+
+    def is_weekend(self, date: datetime.date) -> bool:
+        return bool(self.weekend_mask >> (date.day - 1) & 1)
+
+    def is_holiday(self, date: datetime.date) -> bool:
+        return bool(self.holiday_mask >> (date.day - 1) & 1)
+
+    def day_type(self, date: datetime.date) -> str:
+        return "weekend" if self.is_weekend(date) else "weekday"
+
+    def week_number(self, date: datetime.date) -> int:
+        return self.rotation_week[date.day - 1]
+
+    def required_staff_for(self, template, date: datetime.date) -> int:
+        return self.required_staff[template.id][date.day - 1]
+
+    def weeks(self, start_weekday: int = 0) -> list[list[datetime.date]]:
+        """
+        Partition the month into weeks that begin on ``start_weekday``.
+
+        The first and last weeks may be partial.
+        """
+        if start_weekday not in self._weeks:
+            weeks = []
+            for date in self.dates:
+                if date.weekday() == start_weekday and weeks:
+                    weeks.append([date])
+                elif weeks:
+                    weeks[-1].append(date)
+                else:
+                    weeks.append([date])
+            self._weeks[start_weekday] = weeks
+        return [list(week) for week in self._weeks[start_weekday]]
+
+
+@lru_cache(maxsize=256)
+def _build_month_calendar(year, month, department_id, staffing, holidays) -> MonthCalendar:
+    return MonthCalendar(year, month, staffing, holidays)
+
+
+def get_month_calendar(year, month, department_id=None, templates=(), holidays=()) -> MonthCalendar:
+    """
+    Return the memoized MonthCalendar for a department.
+
+    Staffing figures are part of the cache key, so editing a template's
+    ``max_staff_weekday``/``max_staff_weekend`` yields a fresh calendar.
+    """
+    staffing = tuple(
+        sorted(
+            (template.id, template.max_staff_weekday, template.max_staff_weekend)
+            for template in templates
+        )
+    )
+    return _build_month_calendar(
+        year, month, str(department_id) if department_id else None, staffing, frozenset(holidays)
+    )
+
 
-WORK_WEEK_LAST_DAY = 5  # Friday (0=Monday, 4=Friday, 5=Saturday, 6=Sunday)
 def build_month_calendar(year, month):
     """
-    AReturns a list of dictionaries for each day in the given month.
+    Return a list of dictionaries for each day in the given month.
 
     Each dictionary has:
       - date: a datetime.date object
       - day_type: "weekday" or "weekend"
     """
-    days = []
-    total_days = calendar.monthrange(year, month)[1]
-    for day in range(1, total_days + 1):
-        current_date = datetime.date(year, month, day)
-        # Weekday numbers: Monday=0, Sunday=6
-        day_type = "weekend" if current_date.weekday() >= WORK_WEEK_LAST_DAY else "weekday"
-        days.append({
-            "date": current_date,
-            "day_type": day_type,
-        })
-    return days
+    month_calendar = get_month_calendar(year, month)
+    return [
+        {"date": date, "day_type": month_calendar.day_type(date)}
+        for date in month_calendar.dates
+    ]
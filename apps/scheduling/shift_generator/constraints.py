@@ -7,56 +7,68 @@ from apps.scheduling.models import GeneratedShift, UserShiftState
 from apps.staff.models.department_member import DepartmentMember
 
 
-def ensure_user_state(nurse: DepartmentMember, department, shift_states: dict) -> UserShiftState:
+def ensure_user_state(nurse: DepartmentMember, department, shift_states: dict, tracker=None) -> UserShiftState:
     """
     Ensure that a UserShiftState exists for the nurse.
 
-    If it doesn't, create a new one with default values.
+    If it doesn't, create a new one with default values. When a
+    ShiftStateTracker is given the new state is only saved on its flush.
     """
     user_id = nurse.user.id
     state = shift_states.get(user_id)
     if not state:
-        state = UserShiftState.objects.create(
-            user=nurse.user,
-            department=department,
-            current_template=None,
-            last_shift_end=None,
-            rotation_index=0,
-            consecutive_weeks=0,
-            cooldowns={},
-            weekend_shift_count=0  # Add tracking for weekend shifts
-        )
+        state_fields = {
+            "user": nurse.user,
+            "department": department,
+            "current_template": None,
+            "last_shift_end": None,
+            "rotation_index": 0,
+            "consecutive_weeks": 0,
+            "cooldowns": {},
+            "weekend_shift_count": 0  # Add tracking for weekend shifts
+        }
+        if tracker is not None:
+            state = tracker.create(**state_fields)
+        else:
+            state = UserShiftState.objects.create(**state_fields)
         shift_states[user_id] = state
     return state
 
-def is_nurse_already_assigned(nurse, date, template=None):
+def is_nurse_already_assigned(nurse, date, template=None, workspace=None):
     """
     Check if a nurse is already assigned to a shift on the given date.
 
     :param nurse: DepartmentMember instance
     :param date: Date to check
     :param template: Optional specific template to check against
+    :param workspace: Optional SchedulingWorkspace answering from memory
     :return: Boolean indicating if nurse is already assigned
     """
-    query = GeneratedShift.objects.filter(
-        user=nurse.user,
-        start_datetime__date=date
-    )
+    if workspace is not None:
+        return workspace.has_shift_on(
+            nurse.user.id, date, template.id if template else None
+        )
+
+    query = GeneratedShift.objects.filter(user=nurse.user).starting_on(date)
 
     if template:
         query = query.filter(source_template=template)
 
     return query.exists()
 
-def is_nurse_available(nurse, date, nurse_avail):
+def is_nurse_available(nurse, date, nurse_avail, index=None):
     """
     Check if a nurse is available on the given date.
 
     :param nurse: DepartmentMember instance
     :param date: Date to check
     :param nurse_avail: List of nurse availability records
+    :param index: Optional AvailabilityIndex answering with a binary search
     :return: Boolean indicating availability
     """
+    if index is not None:
+        return index.is_available(nurse.user.id, date)
+
     # Implement availability check logic
     for availability in nurse_avail:
         if availability.start_date <= date <= availability.end_date:
@@ -72,17 +84,16 @@ def check_consecutive_shifts(nurse_state, date, max_consecutive_weeks):
     :param max_consecutive_weeks: Maximum consecutive weeks allowed
     :return: Boolean indicating if shift is allowed
     """
-    if nurse_state.consecutive_weeks >= max_consecutive_weeks:
-        return False
-    return True
+    return nurse_state.consecutive_weeks < max_consecutive_weeks
 
-def update_user_state(nurse_state, date, template):
+def update_user_state(nurse_state, date, template, tracker=None):
     """
     Update the user's shift state after assigning a shift.
-    
+
     :param nurse_state: UserShiftState instance
     :param date: Date of the shift
     :param template: ShiftTemplate instance
+    :param tracker: Optional ShiftStateTracker deferring the write to the end of the run
     """
     # Reset consecutive weeks if template changes
     if nurse_state.current_template != template:
@@ -92,4 +103,7 @@ def update_user_state(nurse_state, date, template):
         nurse_state.consecutive_weeks += 1
 
     nurse_state.last_shift_end = date
-    nurse_state.save()
+    if tracker is not None:
+        tracker.mark_dirty(nurse_state)
+    else:
+        nurse_state.save()
@@ -1,6 +1,8 @@
+import calendar
 import datetime
+import logging
 
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 
 from apps.scheduling.models import (
     NurseAvailability,
@@ -9,30 +11,49 @@ from apps.scheduling.models import (
     UserShiftState,
     WeekendShiftPolicy,
 )
+from apps.scheduling.utils.availability import AvailabilityIndex
 from apps.staff.models import Department, DepartmentMember
 
+logger = logging.getLogger(__name__)
+
+
+def get_month_bounds(target_date):
+    """
+    Return the first and last day of the month containing ``target_date``.
+
+    :param target_date: Any date within the month
+    :return: Tuple of (month_start, month_end)
+    """
+    year, month = target_date.year, target_date.month
+    last_day = calendar.monthrange(year, month)[1]
+    return datetime.date(year, month, 1), datetime.date(year, month, last_day)
+
 
 def load_department_data(department_id, target_date):
     """
     Load all required data for scheduling including user preferences and weekend policy.
 
+    Every collection is fetched with a single query for the whole department
+    (members, templates, availabilities, states, preferences + their preferred
+    templates, weekend policy), so the number of queries does not grow with the
+    number of active members.
+
     :param department_id: ID of the department
     :param target_date: Target date for scheduling
     :return: Dictionary of loaded scheduling data
     """
-    # Implementation remains the same as in the previous code
-    # (The load_department_data function you provided earlier)
     department = Department.objects.get(id=department_id)
 
-    active_members = DepartmentMember.objects.filter(
-        department=department,
-        is_active=True,
-        end_date__isnull=False
+    active_members = list(
+        DepartmentMember.objects.filter(
+            department=department,
+            is_active=True,
+            end_date__isnull=False
+        ).select_related("user", "department")
     )
-    print(f"active members: {active_members}")
-    year, month = target_date.year, target_date.month
-    month_start = datetime.date(year, month, 1)
-    month_end = datetime.date(year, month, 28)  # Simplified end-of-month
+    logger.debug(f"Loaded {len(active_members)} active members")
+    month_start, month_end = get_month_bounds(target_date)
+    user_ids = [member.user_id for member in active_members]
 
     shift_templates = ShiftTemplate.objects.filter(
         department=department,
@@ -42,43 +63,47 @@ def load_department_data(department_id, target_date):
         Q(valid_until__gte=month_start) | Q(valid_until__isnull=True)
     )
 
-    availabilities = {}
-    for member in active_members:
-        nurse_avail = list(NurseAvailability.objects.filter(
-            user=member.user,
-            start_date__lte=month_end,
-            end_date__gte=month_start
-        ))
-        availabilities[member.user.id] = nurse_avail
-
-    print(f"Loaded {len(availabilities)} nurse availabilities")
-    shift_states = {}
-    for member in active_members:
-        try:
-            state = UserShiftState.objects.get(user=member.user, department=department)
-        except UserShiftState.DoesNotExist:
-            state = None
-        shift_states[member.user.id] = state
-
-    user_preferences = {}
-    for member in active_members:
-        try:
-            pref = UserShiftPreference.objects.get(user=member.user, department=department)
-        except UserShiftPreference.DoesNotExist:
-            pref = None
-        user_preferences[member.user.id] = pref
-
-    try:
-        weekend_policy = WeekendShiftPolicy.objects.get(department=department)
-    except WeekendShiftPolicy.DoesNotExist:
-        weekend_policy = None
+    availability_records = list(NurseAvailability.objects.filter(
+        user_id__in=user_ids,
+        start_date__lte=month_end,
+        end_date__gte=month_start
+    ))
+    availabilities = {user_id: [] for user_id in user_ids}
+    for availability in availability_records:
+        availabilities[availability.user_id].append(availability)
+
+    logger.debug(f"Loaded {len(availability_records)} nurse availabilities")
+    shift_states = dict.fromkeys(user_ids)
+    shift_states.update({
+        state.user_id: state
+        for state in UserShiftState.objects.filter(
+            user_id__in=user_ids,
+            department=department
+        ).select_related("current_template")
+    })
+
+    user_preferences = dict.fromkeys(user_ids)
+    user_preferences.update({
+        pref.user_id: pref
+        for pref in UserShiftPreference.objects.filter(
+            user_id__in=user_ids,
+            department=department
+        ).prefetch_related(
+            Prefetch("preferred_shift_types", queryset=ShiftTemplate.objects.only("id"))
+        )
+    })
+
+    weekend_policy = WeekendShiftPolicy.objects.filter(department=department).first()
 
     return {
         "department": department,
-        "active_members": list(active_members),
+        "active_members": active_members,
         "shift_templates": list(shift_templates),
         "availabilities": availabilities,
+        "availability_index": AvailabilityIndex(availability_records),
         "shift_states": shift_states,
         "user_preferences": user_preferences,
         "weekend_policy": weekend_policy,
+        "month_start": month_start,
+        "month_end": month_end,
     }
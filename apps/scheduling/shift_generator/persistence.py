@@ -0,0 +1,215 @@
+# shift_generator/persistence.py
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.scheduling.managers import ShiftQuerySet
+from apps.scheduling.models import GeneratedShift, UserShiftState
+from apps.scheduling.services.busy_intervals import BusyIntervalCache
+from apps.scheduling.services.schedule_service import SchedulePatternService
+from apps.staff.models import WorkloadAssignment
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+
+class ShiftWriteBuffer:
+    """
+    Accumulates the shifts generated during a run and writes them in bulk.
+
+    ``bulk_create`` does not send ``post_save``, so the work normally done by
+    the per-shift signals is done here once for the whole batch: the matching
+    ``WorkloadAssignment`` rows are bulk-created and the schedule and
+    busy-interval caches are invalidated once per affected (user, week) and
+    (user, day) after the transaction commits.
+
+    Active shifts that overlap another queued shift or an active shift
+    already in the database are rejected before the write, so one conflict
+    cannot fail the ``bulk_create`` (and with it the exclusion constraint
+    ``exclude_overlapping_user_shifts``) for the whole run. A batch that
+    still fails is split in halves, each written in its own savepoint, down
+    to the offending rows. Every shift that was not written is logged with
+    its error and kept in :attr:`rejected`.
+    """
+
+    def __init__(self, batch_size: int = BULK_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._shifts: list[GeneratedShift] = []
+        self.rejected: list[GeneratedShift] = []
+
+    def __len__(self):
+        return len(self._shifts)
+
+    def add(self, shift: GeneratedShift) -> GeneratedShift:
+        """Queue an unsaved shift for the next flush."""
+        self._shifts.append(shift)
+        return shift
+
+    def flush(self) -> list[GeneratedShift]:
+        """
+        Write all queued shifts and their workload records.
+
+        :return: The shifts that were written
+        """
+        if not self._shifts:
+            return []
+
+        shifts, self._shifts = self._shifts, []
+        shifts = self._reject_conflicts(shifts)
+        if not shifts:
+            return []
+
+        shifts = self._write(shifts)
+        if not shifts:
+            return []
+
+        affected_weeks = {
+            (shift.user_id, timezone.localtime(shift.start_datetime).date())
+            for shift in shifts
+        }
+        department_ids = {shift.department_id for shift in shifts}
+
+        def invalidate_caches():
+            SchedulePatternService.invalidate_weeks(affected_weeks)
+            for department_id in department_ids:
+                SchedulePatternService.invalidate_weeks(affected_weeks, department_id)
+
+        transaction.on_commit(invalidate_caches)
+        BusyIntervalCache.invalidate(
+            (shift.user_id, shift.start_datetime, shift.end_datetime) for shift in shifts
+        )
+        logger.info(f"Bulk-created {len(shifts)} shifts")
+        return shifts
+
+    def _write(self, shifts: list[GeneratedShift]) -> list[GeneratedShift]:
+        """
+        Bulk-create ``shifts`` in a savepoint, bisecting on failure to isolate bad rows.
+
+        :return: The shifts that were written
+        """
+        try:
+            with transaction.atomic():
+                GeneratedShift.objects.bulk_create(shifts, batch_size=self.batch_size)
+                WorkloadAssignment.objects.bulk_create(
+                    [WorkloadAssignment(generated_shift=shift) for shift in shifts],
+                    batch_size=self.batch_size,
+                )
+        except DatabaseError as e:
+            if len(shifts) == 1:
+                shift = shifts[0]
+                logger.exception(
+                    f"Failed to create shift for user {shift.user_id} "
+                    f"{shift.start_datetime}-{shift.end_datetime}: {e}"
+                )
+                self.rejected.append(shift)
+                return []
+            middle = len(shifts) // 2
+            return self._write(shifts[:middle]) + self._write(shifts[middle:])
+        return shifts
+
+    def _reject_conflicts(self, shifts: list[GeneratedShift]) -> list[GeneratedShift]:
+        """
+        Drop active shifts overlapping an earlier queued shift or an existing active shift.
+
+        Existing shifts are read with one query over the queued users and the
+        queued time span.
+
+        :return: The shifts that can be written
+        """
+        active = [shift for shift in shifts if shift.status in ShiftQuerySet.ACTIVE_STATUSES]
+        if not active:
+            return shifts
+
+        booked = defaultdict(list)
+        for user_id, start_dt, end_dt in GeneratedShift.objects.in_effect().filter(
+            user_id__in={shift.user_id for shift in active},
+        ).overlapping(
+            min(shift.start_datetime for shift in active),
+            max(shift.end_datetime for shift in active),
+        ).values_list("user_id", "start_datetime", "end_datetime"):
+            booked[user_id].append((start_dt, end_dt))
+
+        accepted = []
+        for shift in shifts:
+            if shift.status in ShiftQuerySet.ACTIVE_STATUSES:
+                intervals = booked[shift.user_id]
+                if any(
+                    start_dt < shift.end_datetime and shift.start_datetime < end_dt
+                    for start_dt, end_dt in intervals
+                ):
+                    logger.error(
+                        f"Skipping shift for user {shift.user_id} "
+                        f"{shift.start_datetime}-{shift.end_datetime}: overlaps an active shift"
+                    )
+                    self.rejected.append(shift)
+                    continue
+                intervals.append((shift.start_datetime, shift.end_datetime))
+            accepted.append(shift)
+        return accepted
+
+
+class ShiftStateTracker:
+    """
+    Keeps ``UserShiftState`` rotation changes in memory for the length of a run.
+
+    New states are created unsaved and modified states are only marked dirty;
+    :meth:`flush` then writes everything with one ``bulk_create`` and one
+    ``bulk_update``, so a run issues no per-assignment UPDATEs and holds the
+    state row locks only for the final statement.
+    """
+
+    TRACKED_FIELDS = [
+        "current_template",
+        "last_shift_end",
+        "rotation_index",
+        "consecutive_weeks",
+        "weekend_shift_count",
+        "cooldowns",
+    ]
+
+    def __init__(self, shift_states: dict, batch_size: int = BULK_BATCH_SIZE):
+        self.shift_states = shift_states
+        self.batch_size = batch_size
+        self._new: dict = {}
+        self._dirty: dict = {}
+
+    def create(self, **fields) -> UserShiftState:
+        """Create an unsaved state and register it in the run's state map."""
+        state = UserShiftState(**fields)
+        self._new[state.user_id] = state
+        self.shift_states[state.user_id] = state
+        return state
+
+    def mark_dirty(self, state: UserShiftState) -> None:
+        """Record that an existing state changed and must be written on flush."""
+        if state.user_id not in self._new:
+            self._dirty[state.pk] = state
+
+    def flush(self) -> int:
+        """
+        Persist all pending state changes.
+
+        :return: Number of states written
+        """
+        new_states = list(self._new.values())
+        dirty_states = list(self._dirty.values())
+        self._new, self._dirty = {}, {}
+
+        with transaction.atomic():
+            if new_states:
+                UserShiftState.objects.bulk_create(new_states, batch_size=self.batch_size)
+            if dirty_states:
+                UserShiftState.objects.bulk_update(
+                    dirty_states, self.TRACKED_FIELDS, batch_size=self.batch_size
+                )
+
+        logger.info(
+            f"Persisted shift states: {len(new_states)} created, {len(dirty_states)} updated"
+        )
+        return len(new_states) + len(dirty_states)
@@ -4,7 +4,8 @@ import datetime
 import logging
 from typing import TYPE_CHECKING, Any, List, NamedTuple, Optional
 
-from django.db import DatabaseError
+from django.conf import settings
+from django.db import DatabaseError, transaction
 from django.db.models import Q
 from django.utils import timezone
 
@@ -15,9 +16,14 @@ from apps.scheduling.models import (
     WeekendShiftPolicy,
 )
 
+from .calendar import MonthCalendar, get_month_calendar, is_weekend
 from .data_loader import load_department_data
+from .persistence import ShiftStateTracker, ShiftWriteBuffer
+from .solver import MonthlyRosterSolver, SolverTimeoutError, shift_bounds
+from .workspace import SchedulingWorkspace
 
 if TYPE_CHECKING:
+    from apps.scheduling.utils.availability import AvailabilityIndex
     from apps.staff.models import Department, DepartmentMember
 
 logger = logging.getLogger(__name__)
@@ -29,6 +35,11 @@ class SchedulerContext(NamedTuple):
     shift_states: dict
     user_preferences: dict
     weekend_policy: WeekendShiftPolicy | None
+    workspace: SchedulingWorkspace | None = None
+    write_buffer: ShiftWriteBuffer | None = None
+    state_tracker: ShiftStateTracker | None = None
+    availability_index: AvailabilityIndex | None = None
+    month_calendar: MonthCalendar | None = None
 
 class NurseEligibilityChecker:
     """
@@ -69,6 +80,24 @@ class NurseEligibilityChecker:
         logger.warning(f"Unexpected type for availabilities: {type(availabilities)}")
         return True
 
+    @staticmethod
+    def is_available_in_context(
+        nurse: DepartmentMember,
+        date: datetime.date,
+        context: SchedulerContext
+    ) -> bool:
+        """
+        Check availability through the run's AvailabilityIndex when present.
+
+        The index honours ``is_blackout`` and ``availability_status``; without
+        it the legacy per-record window check is used.
+        """
+        if context.availability_index is not None:
+            return context.availability_index.is_available(nurse.user.id, date)
+
+        nurse_avail = context.availabilities.get(nurse.user.id, [])
+        return NurseEligibilityChecker.is_nurse_available(nurse, date, nurse_avail)
+
     @staticmethod
     def get_schedule_week(date: datetime.date) -> int:
         """
@@ -122,7 +151,7 @@ class NurseEligibilityChecker:
         if not templates:
             return None
 
-        if len(templates) < 2:
+        if len(templates) < MIN_REQUIRED_TEMPLATES:
             return templates[0]
 
         # Sort templates to ensure consistent assignment
@@ -131,8 +160,7 @@ class NurseEligibilityChecker:
         second_template = sorted_templates[1]  # e.g., Night
 
         # Get week number (1-indexed) from start of month
-        days_since_month_start = date.day - 1
-        week_number = (days_since_month_start // 7) + 1
+        week_number = NurseEligibilityChecker.get_schedule_week(date)
 
         # Get nurse group
         nurse_group = NurseEligibilityChecker.get_nurse_group(nurse)
@@ -144,6 +172,56 @@ class NurseEligibilityChecker:
         # Even week
         return second_template if nurse_group == 1 else first_template
 
+    @staticmethod
+    def get_week_template_id(
+        nurse: DepartmentMember,
+        date: datetime.date,
+        context: SchedulerContext
+    ):
+        """
+        Return the template of the nurse's first shift in the Monday-Sunday week of ``date``.
+
+        Uses the run's workspace when available, otherwise queries the database.
+        """
+        if context.workspace is not None:
+            return context.workspace.week_template_id(nurse.user.id, date)
+
+        # Get the first day of this week (Monday)
+        current_weekday = date.weekday()  # 0=Monday, 6=Sunday
+        first_day_of_week = date - datetime.timedelta(days=current_weekday)
+
+        week_query = Q(
+            user=nurse.user,
+            start_datetime__date__gte=first_day_of_week,
+            start_datetime__date__lt=first_day_of_week + datetime.timedelta(days=7)
+        )
+        first_shift = GeneratedShift.objects.filter(week_query).first()
+        return first_shift.source_template_id if first_shift else None
+
+    @staticmethod
+    def get_primary_templates(department: Department | None, context: SchedulerContext) -> list[ShiftTemplate]:
+        """
+        Return the department's two primary templates, ordered by id.
+
+        Uses the run's workspace when available, otherwise queries the database.
+        """
+        if context.workspace is not None:
+            return context.workspace.primary_templates
+        return list(ShiftTemplate.objects.filter(department=department).order_by("id")[:2])
+
+    @staticmethod
+    def get_target_group(week_number: int, template_index: int) -> int:
+        """
+        Return the rotation group working the template at ``template_index`` in a week.
+
+        Group 1: template[0] on odd weeks, template[1] on even weeks
+        Group 2: template[1] on odd weeks, template[0] on even weeks
+        """
+        if week_number % 2 == 1:  # Odd week
+            return 1 if template_index == 0 else 2
+        # Even week
+        return 2 if template_index == 0 else 1
+
     @staticmethod
     def check_shift_constraints(
         nurse: DepartmentMember,
@@ -157,22 +235,17 @@ class NurseEligibilityChecker:
         Ensures nurses stay on the same template for an entire week.
         """
         user_id = nurse.user.id
-        nurse_avail = context.availabilities.get(user_id, [])
         nurse_state = context.shift_states.get(user_id)
 
         # Availability check
-        if not NurseEligibilityChecker.is_nurse_available(nurse, date, nurse_avail):
+        if not NurseEligibilityChecker.is_available_in_context(nurse, date, context):
             return False
 
         # Basic checks for overlapping shifts and role matching
         # ... existing checks ...
 
         # WEEKLY ROTATION: Get all templates for this date
-        all_templates = list(
-            ShiftTemplate.objects.filter(
-                department=nurse.department
-            ).order_by("id")[:2]  # Get the two primary templates
-        )
+        all_templates = NurseEligibilityChecker.get_primary_templates(nurse.department, context)
 
         if not all_templates:
             return True
@@ -189,34 +262,22 @@ class NurseEligibilityChecker:
             )
             return False
 
-        # Get the first day of this week (Monday)
-        current_weekday = date.weekday()  # 0=Monday, 6=Sunday
-        first_day_of_week = date - datetime.timedelta(days=current_weekday)
-
         # Check for weekly consistency - nurse should be on same template all week
-        week_query = Q(
-            user=nurse.user,
-            start_datetime__date__gte=first_day_of_week,
-            start_datetime__date__lt=first_day_of_week + datetime.timedelta(days=7)
+        existing_template_id = NurseEligibilityChecker.get_week_template_id(
+            nurse, date, context
         )
 
-        weekly_shifts = GeneratedShift.objects.filter(week_query)
-
-        if weekly_shifts.exists():
-            # Nurse already has shifts this week, check template consistency
-            existing_template_id = weekly_shifts.first().source_template.id
-            if existing_template_id != template.id:
-                # Nurse is already working a different template this week
-                logger.info(
-                    f"Nurse {nurse.user.first_name} already assigned to template #{existing_template_id} "
-                    f"this week, cannot assign to template #{template.id}"
-                )
-                return False
+        # Nurse already has shifts this week, check template consistency
+        if existing_template_id is not None and existing_template_id != template.id:
+            # Nurse is already working a different template this week
+            logger.info(
+                f"Nurse {nurse.user.first_name} already assigned to template #{existing_template_id} "
+                f"this week, cannot assign to template #{template.id}"
+            )
+            return False
 
         # Weekend policy check
-        weekday_str = date.strftime("%a")
-        is_weekend = weekday_str in ["Sat", "Sun"]
-        if is_weekend and context.weekend_policy:
+        if is_weekend(date) and context.weekend_policy:
             weekend_count = getattr(nurse_state, "weekend_shift_count", 0)
             if weekend_count >= context.weekend_policy.max_weekend_shifts:
                 return False
@@ -240,46 +301,27 @@ class ShiftAssignmentManager:
         Select eligible nurses for a shift template, respecting weekly rotation groups.
         """
         # Get all nurses who already have shifts on this date to avoid conflicts
-        date_query = Q(start_datetime__date=date) | Q(
-            start_datetime__date=date,
-            end_datetime__date=date + datetime.timedelta(days=1)
-        )
-
-        nurses_with_shifts = set(
-            GeneratedShift.objects.filter(date_query)
-            .values_list("user_id", flat=True)
-        )
-
-        # Group all nurses by their rotation group
-        # group1_nurses = []
-        # group2_nurses = []
+        nurses_with_shifts = cls._users_with_shifts_on(context, date)
 
         # Get current week number (1-indexed) from start of month
-        days_since_month_start = date.day - 1
-        week_number = (days_since_month_start // 7) + 1
+        if context.month_calendar is not None:
+            week_number = context.month_calendar.week_number(date)
+        else:
+            week_number = NurseEligibilityChecker.get_schedule_week(date)
 
         # Get all templates in consistent order
-        all_templates = list(
-            ShiftTemplate.objects.filter(
-                department=nurses[0].department if nurses else None
-            ).order_by("id")[:2]  # Get the two primary templates
+        all_templates = NurseEligibilityChecker.get_primary_templates(
+            nurses[0].department if nurses else None, context
         )
 
         # If we don't have enough templates, return an empty list
-        if len(all_templates) < 2 or template not in all_templates:
+        if len(all_templates) < MIN_REQUIRED_TEMPLATES or template not in all_templates:
             return [], False
 
-        # Determine which template index this is (0 or 1)
-        template_index = all_templates.index(template)
-
         # Determine which group should be assigned to this template this week
-        # Group 1: template[0] on odd weeks, template[1] on even weeks
-        # Group 2: template[1] on odd weeks, template[0] on even weeks
-        target_group = None
-        if week_number % 2 == 1:  # Odd week
-            target_group = 1 if template_index == 0 else 2
-        else:  # Even week
-            target_group = 2 if template_index == 0 else 1
+        target_group = NurseEligibilityChecker.get_target_group(
+            week_number, all_templates.index(template)
+        )
 
         # Filter nurses by eligibility
         eligible_nurses = []
@@ -306,28 +348,14 @@ class ShiftAssignmentManager:
 
         # Sort eligible nurses by preference if needed
         if context.user_preferences:
-            # Sort nurses who prefer this template first
-            preferred_nurses = []
-            non_preferred_nurses = []
-
-            for nurse in eligible_nurses:
-                user_id = nurse.user.id
-                preference = context.user_preferences.get(user_id)
-
-                if (preference and preference.preferred_shift_types.exists() and
-                    template in preference.preferred_shift_types.all()):
-                    preferred_nurses.append(nurse)
-                else:
-                    non_preferred_nurses.append(nurse)
-
-            eligible_nurses = preferred_nurses + non_preferred_nurses
+            eligible_nurses = cls._order_by_preference(eligible_nurses, context, template)
 
         # Limit to required staff count
         selected_nurses = eligible_nurses[:required_staff]
         requirements_met = len(eligible_nurses) >= required_staff
 
         # Log detailed information
-        day_type = "weekend" if date.strftime("%a") in ["Sat", "Sun"] else "weekday"
+        day_type = "weekend" if is_weekend(date) else "weekday"
         logger.info(
             f"Template '{template.name}' on {date} ({day_type}): "
             f"Week {week_number}, Target Group: {target_group}, "
@@ -338,6 +366,56 @@ class ShiftAssignmentManager:
 
         return selected_nurses, requirements_met
 
+    @staticmethod
+    def _users_with_shifts_on(context: SchedulerContext, date: datetime.date) -> set:
+        """Return the ids of users with a shift starting on ``date``."""
+        if context.workspace is not None:
+            return context.workspace.users_with_shifts_on(date)
+        return set(GeneratedShift.objects.starting_on(date).values_list("user_id", flat=True))
+
+    @staticmethod
+    def _order_by_preference(
+        nurses: list[DepartmentMember],
+        context: SchedulerContext,
+        template: ShiftTemplate
+    ) -> list[DepartmentMember]:
+        """Move nurses who prefer ``template`` to the front, keeping the order otherwise."""
+        preferred_nurses = []
+        non_preferred_nurses = []
+
+        for nurse in nurses:
+            preference = context.user_preferences.get(nurse.user.id)
+
+            if (preference and preference.preferred_shift_types.exists() and
+                template in preference.preferred_shift_types.all()):
+                preferred_nurses.append(nurse)
+            else:
+                non_preferred_nurses.append(nurse)
+
+        return preferred_nurses + non_preferred_nurses
+
+    @staticmethod
+    def _has_shift_on(nurse: DepartmentMember, context: SchedulerContext, date: datetime.date) -> bool:
+        """Return whether the nurse already has a shift starting on ``date``."""
+        if context.workspace is not None:
+            return context.workspace.has_shift_on(nurse.user.id, date)
+        return GeneratedShift.objects.filter(user=nurse.user).starting_on(date).exists()
+
+    @staticmethod
+    def _existing_template_count(
+        department: Department,
+        context: SchedulerContext,
+        template: ShiftTemplate,
+        date: datetime.date
+    ) -> int:
+        """Return how many shifts of ``template`` already start on ``date``."""
+        if context.workspace is not None:
+            return context.workspace.template_count_on(template.id, date)
+        return GeneratedShift.objects.filter(
+            department=department,
+            source_template=template,
+        ).starting_on(date).count()
+
     @classmethod
     def create_shifts_for_template(  # noqa: PLR0913
         cls,
@@ -346,19 +424,21 @@ class ShiftAssignmentManager:
         context: SchedulerContext,
         date: datetime.date,
         template: ShiftTemplate,
-        required_staff: int
+        required_staff: int | None = None
     ) -> tuple[list[GeneratedShift], str | None]:
         """
         Create shifts for a specific template with improved error handling.
+
+        When ``required_staff`` is omitted it is read from the context's
+        month calendar.
         """
+        if required_staff is None:
+            required_staff = context.month_calendar.required_staff_for(template, date)
+
         # CRITICAL FIX: Check if we already have shifts for this template and date
         # This prevents duplicate creation
 
-        existing_shifts = GeneratedShift.objects.filter(
-            department=department,
-            source_template=template,
-            start_datetime__date=date
-        ).count()
+        existing_shifts = cls._existing_template_count(department, context, template, date)
 
         if existing_shifts > 0:
             logger.warning(
@@ -382,7 +462,7 @@ class ShiftAssignmentManager:
 
         # Prepare error message if needed
         error_message = None
-        day_type = "weekend" if date.strftime("%a") in ["Sat", "Sun"] else "weekday"
+        day_type = "weekend" if is_weekend(date) else "weekday"
 
         if not requirements_met:
             error_message = (
@@ -403,12 +483,7 @@ class ShiftAssignmentManager:
         for nurse in eligible_nurses:
             # CRITICAL FIX: Double-check nurse doesn't already have a shift on this day
             # This is our final safety check
-            has_shift = GeneratedShift.objects.filter(
-                user=nurse.user,
-                start_datetime__date=date
-            ).exists()
-
-            if has_shift:
+            if cls._has_shift_on(nurse, context, date):
                 logger.warning(
                     f"Skipping shift creation for {nurse.user.first_name} on {date} - "
                     f"already has a shift on this day"
@@ -416,10 +491,12 @@ class ShiftAssignmentManager:
                 continue
 
             shift = cls.create_single_shift(
-                nurse, department, date, template
+                nurse, department, date, template, context.write_buffer
             )
             if shift:
                 created_shifts.append(shift)
+                if context.workspace is not None:
+                    context.workspace.add_shift(shift)
                 cls.update_nurse_state(nurse, context, date, template)
 
         return created_shifts, error_message
@@ -445,7 +522,7 @@ class ShiftAssignmentManager:
         # Implementation can vary based on your notification system
         # Example: Send email, push notification, or create a system alert
 
-        day_type = "weekend" if date.strftime("%a") in ["Sat", "Sun"] else "weekday"
+        day_type = "weekend" if is_weekend(date) else "weekday"
         shortage_amount = required_staff - available_staff
 
         # Example of notification content
@@ -475,7 +552,8 @@ class ShiftAssignmentManager:
         nurse: DepartmentMember,
         department: Department,
         date: datetime.date,
-        template: ShiftTemplate
+        template: ShiftTemplate,
+        write_buffer: ShiftWriteBuffer | None = None
     ) -> GeneratedShift | None:
         """
         Create a single shift for a nurse with timezone awareness.
@@ -484,6 +562,7 @@ class ShiftAssignmentManager:
         :param department: Department
         :param date: Date of shift
         :param template: Shift template
+        :param write_buffer: Optional buffer; the shift is queued instead of saved
         :return: Created GeneratedShift or None
         """
         # Create naive datetime objects first
@@ -504,16 +583,20 @@ class ShiftAssignmentManager:
             f"{template.name} ({template.start_time}-{template.end_time})"
         )
 
+        shift = GeneratedShift(
+            user=nurse.user,
+            department=department,
+            start_datetime=start_dt,
+            end_datetime=end_dt,
+            source_template=template,
+            status=GeneratedShift.Status.SCHEDULED,
+            penalty_score=0.0
+        )
+        if write_buffer is not None:
+            return write_buffer.add(shift)
+
         try:
-            shift = GeneratedShift.objects.create(
-                user=nurse.user,
-                department=department,
-                start_datetime=start_dt,
-                end_datetime=end_dt,
-                source_template=template,
-                status=GeneratedShift.Status.SCHEDULED,
-                penalty_score=0.0
-            )
+            shift.save()
             return shift
         except DatabaseError as e:
             logger.exception(f"Failed to create shift for {nurse.user}: {e}")
@@ -537,6 +620,7 @@ class ShiftAssignmentManager:
         """
         user_id = nurse.user.id
         nurse_state = context.shift_states.get(user_id)
+        tracker = context.state_tracker
 
         # If nurse_state doesn't exist, create it
         if not nurse_state:
@@ -544,14 +628,18 @@ class ShiftAssignmentManager:
             from apps.scheduling.models import UserShiftState
 
             logger.info(f"Creating new shift state for nurse {nurse.user.first_name}")
-            nurse_state = UserShiftState.objects.create(
-                user=nurse.user,
-                department=nurse.department,
-                current_template=template,
-                consecutive_weeks=1,
-                last_shift_end=date,
-                weekend_shift_count=1 if date.strftime("%a") in ["Sat", "Sun"] else 0
-            )
+            state_fields = {
+                "user": nurse.user,
+                "department": nurse.department,
+                "current_template": template,
+                "consecutive_weeks": 1,
+                "last_shift_end": date,
+                "weekend_shift_count": 1 if is_weekend(date) else 0
+            }
+            if tracker is not None:
+                nurse_state = tracker.create(**state_fields)
+            else:
+                nurse_state = UserShiftState.objects.create(**state_fields)
 
             # Add the newly created state to the context
             context.shift_states[user_id] = nurse_state
@@ -566,13 +654,16 @@ class ShiftAssignmentManager:
             nurse_state.last_shift_end = date
 
             # Update weekend shift count
-            if date.strftime("%a") in ["Sat", "Sun"]:
+            if is_weekend(date):
                 nurse_state.weekend_shift_count = getattr(
                     nurse_state, "weekend_shift_count", 0
                 ) + 1
 
             try:
-                nurse_state.save()
+                if tracker is not None:
+                    tracker.mark_dirty(nurse_state)
+                else:
+                    nurse_state.save()
                 logger.info(
                     f"Updated shift state for {nurse.user.first_name}: "
                     f"Template: {template.name}, "
@@ -591,7 +682,9 @@ class ScheduleGenerator:
     """
 
     @classmethod
-    def generate_weekly_schedule(cls, department_id: int, year: int, month: int):  # noqa: C901
+    def generate_weekly_schedule(
+        cls, department_id: int, year: int, month: int, solver: str | None = None
+    ):
         logger.info(f"Generating weekly schedule for department {department_id}, {year}-{month}")
 
         # Load department data as before
@@ -601,13 +694,31 @@ class ScheduleGenerator:
             logger.critical(f"Failed to load department data: {e}")
             return
 
+        workspace = SchedulingWorkspace.load(
+            data["department"],
+            [member.user_id for member in data["active_members"]],
+            data["month_start"],
+            data["month_end"],
+        )
         context = SchedulerContext(
             availabilities=data["availabilities"],
             shift_states=data["shift_states"],
             user_preferences=data["user_preferences"],
-            weekend_policy=data["weekend_policy"]
+            weekend_policy=data["weekend_policy"],
+            workspace=workspace,
+            write_buffer=ShiftWriteBuffer(),
+            state_tracker=ShiftStateTracker(data["shift_states"]),
+            availability_index=data["availability_index"],
+            month_calendar=get_month_calendar(
+                year, month, department_id, data["shift_templates"]
+            )
         )
 
+        solver = solver or settings.SHIFT_SCHEDULER_SOLVER
+        if solver == "flow" and cls._generate_with_flow_solver(data, context):
+            logger.info("Flow solver schedule generation complete.")
+            return
+
         # Build a weekly calendar instead of a daily calendar.
         weekly_calendar = cls._build_weekly_calendar(year, month)
 
@@ -616,7 +727,7 @@ class ScheduleGenerator:
             [t for t in data["shift_templates"] if "morning" in t.name.lower() or "night" in t.name.lower()],
             key=lambda t: t.id
         )
-        if len(primary_templates) < 2:
+        if len(primary_templates) < MIN_REQUIRED_TEMPLATES:
             logger.critical("Need at least two templates (morning and night) for rotation.")
             return
 
@@ -625,45 +736,103 @@ class ScheduleGenerator:
         alternate_template = primary_templates[1]   # e.g., Night
 
         # Divide nurses into two groups based on a consistent criterion (e.g., nurse ID)
+        group1_nurses, group2_nurses = cls._split_rotation_groups(data["active_members"])
+
+        # Shifts are queued in the write buffer and persisted in bulk once the
+        # whole month has been assigned.
+        with transaction.atomic():
+            # Process each week in the monthly calendar
+            # Week index is 1-indexed
+            for week_number, week in enumerate(weekly_calendar, start=1):
+
+                # Decide assignment based on week parity
+                if week_number % 2 == 1:
+                    group1_template = primary_template  # e.g., morning
+                    group2_template = alternate_template  # e.g., night
+                else:
+                    group1_template = alternate_template
+                    group2_template = primary_template
+
+                logger.info(f"Processing week {week_number}: "
+                            f"Group 1 -> {group1_template.name}, "
+                            f"Group 2 -> {group2_template.name}")
+
+                # For each nurse in Group 1, assign the entire week with group1_template
+                for nurse in group1_nurses:
+                    for date in week:
+                        cls._create_shift_for_date(data["department"], nurse, context, date, group1_template)
+                    cls._update_nurse_state(nurse, context, week[-1], group1_template)
+
+                # For each nurse in Group 2, assign the entire week with group2_template
+                for nurse in group2_nurses:
+                    for date in week:
+                        cls._create_shift_for_date(data["department"], nurse, context, date, group2_template)
+                    cls._update_nurse_state(nurse, context, week[-1], group2_template)
+
+            context.write_buffer.flush()
+            context.state_tracker.flush()
+
+        logger.info("Weekly schedule generation complete.")
+
+    @staticmethod
+    def _split_rotation_groups(nurses) -> tuple[list, list]:
+        """Split nurses into rotation groups 1 and 2 (see ``NurseEligibilityChecker.get_nurse_group``)."""
         group1_nurses = []
         group2_nurses = []
-        for nurse in data["active_members"]:
-            uuid_int = int(nurse.user.id.hex, 16)
-            if (uuid_int % 2) == 0:
+        for nurse in nurses:
+            if NurseEligibilityChecker.get_nurse_group(nurse) == 1:
                 group1_nurses.append(nurse)
             else:
                 group2_nurses.append(nurse)
+        return group1_nurses, group2_nurses
 
-        # Process each week in the monthly calendar
-        for week in weekly_calendar:
-            # Get week index (1-indexed)
-            week_number = weekly_calendar.index(week) + 1
-
-            # Decide assignment based on week parity
-            if week_number % 2 == 1:
-                group1_template = primary_template  # e.g., morning
-                group2_template = alternate_template  # e.g., night
-            else:
-                group1_template = alternate_template
-                group2_template = primary_template
-
-            logger.info(f"Processing week {week_number}: "
-                        f"Group 1 -> {group1_template.name}, "
-                        f"Group 2 -> {group2_template.name}")
+    @classmethod
+    def _generate_with_flow_solver(cls, data: dict, context: SchedulerContext) -> bool:
+        """
+        Assign the month with the min-cost flow solver.
 
-            # For each nurse in Group 1, assign the entire week with group1_template
-            for nurse in group1_nurses:
-                for date in week:
-                    cls._create_shift_for_date(data["department"], nurse, context, date, group1_template)
-                cls._update_nurse_state(nurse, context, week[-1], group1_template)
+        :return: False if the solver ran out of time and the greedy rotation should be used
+        """
+        try:
+            assignments = MonthlyRosterSolver(
+                context,
+                data["active_members"],
+                data["shift_templates"],
+                context.month_calendar,
+                settings.SHIFT_SCHEDULER_TIME_BUDGET_SECONDS,
+            ).solve()
+        except SolverTimeoutError as e:
+            logger.warning(f"{e}; falling back to the greedy rotation")
+            return False
 
-            # For each nurse in Group 2, assign the entire week with group2_template
-            for nurse in group2_nurses:
-                for date in week:
-                    cls._create_shift_for_date(data["department"], nurse, context, date, group2_template)
-                cls._update_nurse_state(nurse, context, week[-1], group2_template)
+        with transaction.atomic():
+            for assignment in assignments:
+                # Catch conflicts before they reach the write buffer, as the
+                # greedy path does in _create_shift_for_date
+                start_dt, end_dt = shift_bounds(assignment.date, assignment.template)
+                if context.workspace.overlaps(assignment.nurse.user_id, start_dt, end_dt):
+                    logger.info(
+                        f"Nurse {assignment.nurse.user.first_name} already has an overlapping "
+                        f"shift on {assignment.date}"
+                    )
+                    continue
+                shift = ShiftAssignmentManager.create_single_shift(
+                    assignment.nurse,
+                    data["department"],
+                    assignment.date,
+                    assignment.template,
+                    context.write_buffer,
+                )
+                if shift is None:
+                    continue
+                context.workspace.add_shift(shift)
+                ShiftAssignmentManager.update_nurse_state(
+                    assignment.nurse, context, assignment.date, assignment.template
+                )
 
-        logger.info("Weekly schedule generation complete.")
+            context.write_buffer.flush()
+            context.state_tracker.flush()
+        return True
 
     @staticmethod
     def _build_weekly_calendar(year: int, month: int) -> list[list[datetime.date]]:
@@ -673,25 +842,9 @@ class ScheduleGenerator:
         For example, if you want the week to start on Tuesday and end on Monday.
         Adjust this logic to meet your specific requirements.
         """
-        # Create a list of all dates in the month
-        import calendar
-        days_in_month = calendar.monthrange(year, month)[1]
-        all_dates = [datetime.date(year, month, day) for day in range(1, days_in_month + 1)]
-
         # Partition dates into weeks.
         # For this example, we assume a week starts on Tuesday.
-        weeks = []
-        current_week = []
-        for date in all_dates:
-            # Start a new week if it's Tuesday and we already have dates in the current week.
-            if date.weekday() == 1 and current_week:
-                weeks.append(current_week)
-                current_week = [date]
-            else:
-                current_week.append(date)
-        if current_week:
-            weeks.append(current_week)
-        return weeks
+        return get_month_calendar(year, month).weeks(start_weekday=1)
 
     @classmethod
     def _create_shift_for_date(cls, department, nurse, context, date, template):
@@ -699,8 +852,7 @@ class ScheduleGenerator:
         Create a single shift for a nurse on a given date using the specified template.
         """
         # Check if nurse is available on this date
-        nurse_avail = context.availabilities.get(nurse.user.id, [])
-        if not NurseEligibilityChecker.is_nurse_available(nurse, date, nurse_avail):
+        if not NurseEligibilityChecker.is_available_in_context(nurse, date, context):
             logger.info(f"Nurse {nurse.user.first_name} is not available on {date}")
             return None
 
@@ -712,16 +864,27 @@ class ScheduleGenerator:
         start_dt = timezone.make_aware(naive_start_dt)
         end_dt = timezone.make_aware(naive_end_dt)
 
+        # Skip dates where the nurse already works an overlapping shift
+        if context.workspace is not None and context.workspace.overlaps(nurse.user.id, start_dt, end_dt):
+            logger.info(f"Nurse {nurse.user.first_name} already has an overlapping shift on {date}")
+            return None
+
+        shift = GeneratedShift(
+            user=nurse.user,
+            department=department,
+            start_datetime=start_dt,
+            end_datetime=end_dt,
+            source_template=template,
+            status=GeneratedShift.Status.SCHEDULED,
+            penalty_score=0.0
+        )
         try:
-            shift = GeneratedShift.objects.create(
-                user=nurse.user,
-                department=department,
-                start_datetime=start_dt,
-                end_datetime=end_dt,
-                source_template=template,
-                status=GeneratedShift.Status.SCHEDULED,
-                penalty_score=0.0
-            )
+            if context.write_buffer is not None:
+                context.write_buffer.add(shift)
+            else:
+                shift.save()
+            if context.workspace is not None:
+                context.workspace.add_shift(shift)
             logger.info(f"Created shift for {nurse.user.first_name} on {date} using template {template.name}")
             return shift
         except DatabaseError as e:
@@ -737,16 +900,21 @@ class ScheduleGenerator:
         """
         user_id = nurse.user.id
         nurse_state = context.shift_states.get(user_id)
+        tracker = context.state_tracker
         if not nurse_state:
             from apps.scheduling.models import UserShiftState
-            nurse_state = UserShiftState.objects.create(
-                user=nurse.user,
-                department=nurse.department,
-                current_template=template,
-                consecutive_weeks=1,
-                last_shift_end=last_date,
-                weekend_shift_count=1 if last_date.strftime("%a") in ["Sat", "Sun"] else 0
-            )
+            state_fields = {
+                "user": nurse.user,
+                "department": nurse.department,
+                "current_template": template,
+                "consecutive_weeks": 1,
+                "last_shift_end": last_date,
+                "weekend_shift_count": 1 if is_weekend(last_date) else 0
+            }
+            if tracker is not None:
+                nurse_state = tracker.create(**state_fields)
+            else:
+                nurse_state = UserShiftState.objects.create(**state_fields)
             context.shift_states[user_id] = nurse_state
             logger.info(f"Created new state for {nurse.user.first_name}: Template {template.name}")
         else:
@@ -757,10 +925,13 @@ class ScheduleGenerator:
             else:
                 nurse_state.consecutive_weeks += 1
             nurse_state.last_shift_end = last_date
-            if last_date.strftime("%a") in ["Sat", "Sun"]:
+            if is_weekend(last_date):
                 nurse_state.weekend_shift_count = getattr(nurse_state, "weekend_shift_count", 0) + 1
             try:
-                nurse_state.save()
+                if tracker is not None:
+                    tracker.mark_dirty(nurse_state)
+                else:
+                    nurse_state.save()
                 logger.info(f"Updated state for {nurse.user.first_name}: Template {template.name}, Consecutive Weeks {nurse_state.consecutive_weeks}")
             except DatabaseError as e:
                 logger.exception(f"Failed to update state for {nurse.user.first_name}: {e}")
@@ -768,12 +939,13 @@ class ScheduleGenerator:
 
 
 
-def generate_monthly_schedule(department_id: int, year: int, month: int):
+def generate_monthly_schedule(department_id: int, year: int, month: int, solver: str | None = None):
     """
     AConvenience function to generate a monthly schedule.
 
     :param department_id: Department ID
     :param year: Year of schedule
     :param month: Month of schedule
+    :param solver: "greedy" or "flow"; defaults to ``settings.SHIFT_SCHEDULER_SOLVER``
     """
-    ScheduleGenerator.generate_weekly_schedule(department_id, year, month)
+    ScheduleGenerator.generate_weekly_schedule(department_id, year, month, solver)
@@ -0,0 +1,407 @@
+# shift_generator/solver.py
+
+from __future__ import annotations
+
+import datetime
+import heapq
+import logging
+import time
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from apps.scheduling.models import ShiftTemplate
+    from apps.staff.models import DepartmentMember
+
+    from .calendar import MonthCalendar
+    from .scheduler import SchedulerContext
+
+logger = logging.getLogger(__name__)
+
+# Costs are scaled to integers so the flow works with exact arithmetic
+COST_SCALE = 100
+PREFERENCE_PENALTY = 1.0  # Template is not among the nurse's preferred ones
+ROTATION_PENALTY = 2.0  # Template differs from the nurse's rotation template that week
+FAIRNESS_STEP = 0.25  # Extra cost for every additional shift given to the same nurse
+WEEKEND_FAIRNESS_STEP = 0.5  # Extra cost for every additional weekend shift
+DEFAULT_TIME_BUDGET_SECONDS = 10.0
+INF = float("inf")
+
+
+class SolverTimeoutError(Exception):
+    """Raised when the solver exceeds its time budget."""
+
+
+class Assignment(NamedTuple):
+    nurse: DepartmentMember
+    date: datetime.date
+    template: ShiftTemplate
+
+
+class MinCostFlow:
+    """
+    Min-cost max-flow using the primal-dual method.
+
+    Each phase runs Dijkstra on reduced costs to update node potentials and
+    then pushes a blocking flow (Dinic) through the arcs whose reduced cost
+    is zero, so the number of shortest-path computations is the number of
+    distinct path costs rather than the number of flow units. Costs must be
+    non-negative integers.
+    """
+
+    def __init__(self, node_count: int):
+        self.node_count = node_count
+        self.graph = [[] for _ in range(node_count)]
+        self.to = []
+        self.cap = []
+        self.cost = []
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: int = 0) -> int:
+        """Add an arc and its residual twin; return the arc's index."""
+        index = len(self.to)
+        self.graph[u].append(index)
+        self.to.append(v)
+        self.cap.append(capacity)
+        self.cost.append(cost)
+        self.graph[v].append(index + 1)
+        self.to.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+        return index
+
+    def flow_on(self, edge: int) -> int:
+        return self.cap[edge ^ 1]
+
+    def solve(self, source: int, sink: int, deadline: float | None = None) -> int:
+        """Push the maximum flow at minimum cost; return the flow value."""
+        potential = [0] * self.node_count
+        total = 0
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise SolverTimeoutError("Min-cost flow exceeded its time budget")
+
+            dist = self._dijkstra(source, potential)
+            if dist[sink] == INF:
+                return total
+            for node, value in enumerate(dist):
+                if value != INF:
+                    potential[node] += value
+            total += self._blocking_flow(source, sink, potential)
+
+    def _dijkstra(self, source: int, potential: list[int]) -> list:
+        dist = [INF] * self.node_count
+        dist[source] = 0
+        heap = [(0, source)]
+        to, cap, cost, graph = self.to, self.cap, self.cost, self.graph
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            pu = potential[u]
+            for e in graph[u]:
+                if cap[e] > 0:
+                    v = to[e]
+                    nd = d + cost[e] + pu - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+        return dist
+
+    def _admissible(self, e: int, tail: int, potential: list[int]) -> bool:
+        return self.cap[e] > 0 and self.cost[e] + potential[tail] - potential[self.to[e]] == 0
+
+    def _blocking_flow(self, source: int, sink: int, potential: list[int]) -> int:
+        to, cap, graph = self.to, self.cap, self.graph
+        pushed = 0
+        while True:
+            level = [-1] * self.node_count
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                u = queue.popleft()
+                for e in graph[u]:
+                    v = to[e]
+                    if level[v] < 0 and self._admissible(e, u, potential):
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[sink] < 0:
+                return pushed
+
+            pointer = [0] * self.node_count
+            while True:
+                path = self._find_path(source, sink, level, pointer, potential)
+                if path is None:
+                    break
+                bottleneck = min(cap[e] for e in path)
+                for e in path:
+                    cap[e] -= bottleneck
+                    cap[e ^ 1] += bottleneck
+                pushed += bottleneck
+
+    def _find_path(self, source, sink, level, pointer, potential):
+        """Run an iterative DFS over the level graph of admissible arcs."""
+        path = []
+        node = source
+        while node != sink:
+            edges = self.graph[node]
+            while pointer[node] < len(edges):
+                e = edges[pointer[node]]
+                if level[self.to[e]] == level[node] + 1 and self._admissible(e, node, potential):
+                    break
+                pointer[node] += 1
+            else:
+                # Dead end: prune the node and backtrack
+                level[node] = -1
+                if not path:
+                    return None
+                e = path.pop()
+                node = self.to[e ^ 1]
+                pointer[node] += 1
+                continue
+            path.append(e)
+            node = self.to[e]
+        return path
+
+
+def shift_bounds(date: datetime.date, template: ShiftTemplate) -> tuple[datetime.datetime, datetime.datetime]:
+    """Return the timezone-aware start and end of a template's shift on ``date``."""
+    naive_start = datetime.datetime.combine(date, template.start_time)
+    naive_end = datetime.datetime.combine(date, template.end_time)
+    # Handle overnight shifts
+    if naive_end <= naive_start:
+        naive_end += datetime.timedelta(days=1)
+    return timezone.make_aware(naive_start), timezone.make_aware(naive_end)
+
+
+class MonthlyRosterSolver:
+    """
+    Formulates a department's month as a single min-cost flow.
+
+    Network::
+
+        source -> nurse            (one arc per shift, cost grows with load)
+        nurse  -> weekend hub      (one arc per weekend shift left under the policy)
+        nurse / hub -> nurse-day   (capacity 1: at most one shift per day)
+        nurse-day -> slot          (slot = template x day, cost = soft penalties)
+        slot   -> sink             (capacity = staff still required)
+
+    Hard constraints (availability, existing shifts, one shift per day,
+    weekend policy, monthly hours) are encoded as missing arcs or
+    capacities. Soft ones (preferences, the two-group weekly rotation,
+    workload and weekend fairness) are arc costs scaled by the template's
+    ``penalty_weight``. Minimum rest gaps span days and are not linear, so
+    they are enforced by a repair pass that drops violating assignments and
+    refills those slots greedily.
+    """
+
+    def __init__(
+        self,
+        context: SchedulerContext,
+        nurses: list[DepartmentMember],
+        templates: list[ShiftTemplate],
+        month_calendar: MonthCalendar,
+        time_budget: float = DEFAULT_TIME_BUDGET_SECONDS,
+    ):
+        self.context = context
+        self.nurses = nurses
+        self.templates = sorted(templates, key=lambda t: t.id)
+        self.calendar = month_calendar
+        self.time_budget = time_budget
+
+    def solve(self) -> list[Assignment]:
+        """
+        Build and solve the network.
+
+        :raises SolverTimeoutError: When the time budget is exhausted
+        :return: The month's assignments, ordered by date and start time
+        """
+        deadline = time.monotonic() + self.time_budget
+        if not self.nurses or not self.templates:
+            return []
+
+        flow, arcs = self._build_network()
+        flow.solve(0, 1, deadline)
+
+        assignments = [
+            Assignment(nurse, date, template)
+            for edge, (nurse, date, template) in arcs.items()
+            if flow.flow_on(edge)
+        ]
+        assignments = self._repair(assignments, deadline)
+        logger.info(
+            f"Flow solver produced {len(assignments)} assignments in "
+            f"{self.time_budget - (deadline - time.monotonic()):.2f}s"
+        )
+        return assignments
+
+    def _monthly_cap(self, nurse: DepartmentMember) -> int:
+        average_hours = sum(self._template_hours(t) for t in self.templates) / len(self.templates)
+        return max(1, int(nurse.max_weekly_hours * self.calendar.days / 7 // max(average_hours, 1)))
+
+    @staticmethod
+    def _template_hours(template: ShiftTemplate) -> float:
+        start, end = shift_bounds(datetime.date(2000, 1, 3), template)
+        return (end - start).total_seconds() / 3600
+
+    def _remaining_weekend_shifts(self, nurse: DepartmentMember) -> int:
+        weekend_days = bin(self.calendar.weekend_mask).count("1")
+        policy = self.context.weekend_policy
+        if not policy:
+            return weekend_days
+        state = self.context.shift_states.get(nurse.user.id)
+        used = getattr(state, "weekend_shift_count", 0) or 0
+        return max(0, min(weekend_days, policy.max_weekend_shifts - used))
+
+    def _is_available(self, nurse: DepartmentMember, date: datetime.date) -> bool:
+        from .scheduler import NurseEligibilityChecker
+
+        if not NurseEligibilityChecker.is_available_in_context(nurse, date, self.context):
+            return False
+        workspace = self.context.workspace
+        return workspace is None or not workspace.has_shift_on(nurse.user.id, date)
+
+    def _arc_cost(self, nurse, date, template, preferred_ids) -> int:
+        from .scheduler import NurseEligibilityChecker
+
+        penalty = 0.0
+        if preferred_ids and template.id not in preferred_ids:
+            penalty += PREFERENCE_PENALTY
+        rotation_template = NurseEligibilityChecker.get_eligible_template_for_nurse(
+            nurse, date, self.templates[:2]
+        )
+        if rotation_template and template in self.templates[:2] and rotation_template.id != template.id:
+            penalty += ROTATION_PENALTY
+        return int(round(max(template.penalty_weight, 0.0) * penalty * COST_SCALE))
+
+    def _preferred_ids(self, nurse: DepartmentMember) -> set:
+        preference = self.context.user_preferences.get(nurse.user.id)
+        if not preference:
+            return set()
+        return {template.id for template in preference.preferred_shift_types.all()}
+
+    def _build_network(self):
+        slot_node, nurse_nodes, node_count = self._layout_nodes()
+        flow = MinCostFlow(node_count)
+        self._add_slot_arcs(flow, slot_node)
+
+        arcs = {}
+        for nurse, base, day_nodes in nurse_nodes:
+            if day_nodes:
+                self._add_nurse_arcs(flow, arcs, slot_node, nurse, base, day_nodes)
+        return flow, arcs
+
+    def _layout_nodes(self):
+        """
+        Assign node numbers: 0 source, 1 sink, then one per slot, then per nurse.
+
+        :return: ``({(date, template_id): node}, [(nurse, base, {date: day node})], node_count)``;
+            a nurse's ``base`` is its nurse node and ``base + 1`` its weekend hub
+        """
+        dates = self.calendar.dates
+        slot_node = {}
+        next_node = 2
+        for date in dates:
+            for template in self.templates:
+                slot_node[(date, template.id)] = next_node
+                next_node += 1
+
+        nurse_nodes = []
+        for nurse in self.nurses:
+            base = next_node
+            next_node += 2  # nurse node + weekend hub
+            day_nodes = {}
+            for date in dates:
+                if self._is_available(nurse, date):
+                    day_nodes[date] = next_node
+                    next_node += 1
+            nurse_nodes.append((nurse, base, day_nodes))
+        return slot_node, nurse_nodes, next_node
+
+    def _add_slot_arcs(self, flow: MinCostFlow, slot_node: dict) -> None:
+        """Slot -> sink arcs, with capacity the staff still required on that slot."""
+        workspace = self.context.workspace
+        for date in self.calendar.dates:
+            for template in self.templates:
+                required = self.calendar.required_staff_for(template, date)
+                if workspace is not None:
+                    required -= workspace.template_count_on(template.id, date)
+                if required > 0:
+                    flow.add_edge(slot_node[(date, template.id)], 1, required)
+
+    def _add_nurse_arcs(  # noqa: PLR0913
+        self, flow: MinCostFlow, arcs: dict, slot_node: dict, nurse, base: int, day_nodes: dict
+    ) -> None:
+        """Source -> nurse -> (weekend hub) -> nurse-day -> slot arcs of one nurse."""
+        nurse_node, weekend_hub = base, base + 1
+        for k in range(min(self._monthly_cap(nurse), len(day_nodes))):
+            flow.add_edge(0, nurse_node, 1, int(k * FAIRNESS_STEP * COST_SCALE))
+        for k in range(self._remaining_weekend_shifts(nurse)):
+            flow.add_edge(nurse_node, weekend_hub, 1, int(k * WEEKEND_FAIRNESS_STEP * COST_SCALE))
+
+        preferred_ids = self._preferred_ids(nurse)
+        for date, day_node in day_nodes.items():
+            parent = weekend_hub if self.calendar.is_weekend(date) else nurse_node
+            flow.add_edge(parent, day_node, 1)
+            for template in self.templates:
+                edge = flow.add_edge(
+                    day_node,
+                    slot_node[(date, template.id)],
+                    1,
+                    self._arc_cost(nurse, date, template, preferred_ids),
+                )
+                arcs[edge] = (nurse, date, template)
+
+    def _repair(self, assignments: list[Assignment], deadline: float) -> list[Assignment]:
+        """Drop assignments that break the minimum rest gap and refill their slots."""
+        workspace = self.context.workspace
+        planned = defaultdict(list)  # user_id -> [(start, end)]
+        load = defaultdict(int)
+        kept, dropped = [], []
+
+        def fits(nurse, date, template):
+            start, end = shift_bounds(date, template)
+            gap = template.min_shift_gap
+            user_id = nurse.user.id
+            if workspace is not None and workspace.overlaps(user_id, start - gap, end + gap):
+                return False
+            return not any(
+                other_start < end + gap and start < other_end + gap
+                for other_start, other_end in planned[user_id]
+            )
+
+        for assignment in sorted(assignments, key=lambda a: (a.date, a.template.start_time)):
+            if fits(*assignment):
+                kept.append(assignment)
+                planned[assignment.nurse.user.id].append(shift_bounds(assignment.date, assignment.template))
+                load[assignment.nurse.user.id] += 1
+            else:
+                dropped.append(assignment)
+
+        working_days = {(a.nurse.user.id, a.date) for a in kept}
+        for slot in dropped:
+            if time.monotonic() > deadline:
+                raise SolverTimeoutError("Repair pass exceeded the time budget")
+            candidates = sorted(
+                (
+                    nurse for nurse in self.nurses
+                    if (nurse.user.id, slot.date) not in working_days
+                    and load[nurse.user.id] < self._monthly_cap(nurse)
+                    and self._is_available(nurse, slot.date)
+                    and fits(nurse, slot.date, slot.template)
+                ),
+                key=lambda nurse: load[nurse.user.id],
+            )
+            if not candidates:
+                logger.warning(
+                    f"Flow solver left template '{slot.template.name}' on {slot.date} short by one"
+                )
+                continue
+            nurse = candidates[0]
+            kept.append(Assignment(nurse, slot.date, slot.template))
+            planned[nurse.user.id].append(shift_bounds(slot.date, slot.template))
+            load[nurse.user.id] += 1
+            working_days.add((nurse.user.id, slot.date))
+
+        return sorted(kept, key=lambda a: (a.date, a.template.start_time))
@@ -0,0 +1,164 @@
+# shift_generator/workspace.py
+
+from __future__ import annotations
+
+import bisect
+import datetime
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.scheduling.models import GeneratedShift, ShiftTemplate
+
+if TYPE_CHECKING:
+    import uuid
+
+    from apps.staff.models import Department
+
+# Shifts are at most 24h long, so an interval can only touch its own day and
+# the neighbouring ones.
+OVERLAP_DAY_SPAN = 1
+
+
+class SchedulingWorkspace:
+    """
+    In-memory view of the shifts that matter for one scheduling run.
+
+    The month's existing ``GeneratedShift`` rows (plus one week of padding on
+    each side so week-level checks work across month boundaries) are loaded
+    once and indexed per user and per local day.  Overlap, weekly-consistency
+    and already-assigned questions are then answered without touching the
+    database.  Shifts created during the run must be registered with
+    :meth:`add_shift` so later checks see them.
+    """
+
+    def __init__(
+        self,
+        department: Department,
+        primary_templates: list[ShiftTemplate],
+        window_start: datetime.date,
+        window_end: datetime.date,
+    ):
+        self.department = department
+        self.primary_templates = primary_templates
+        self.window_start = window_start
+        self.window_end = window_end
+        # {user_id: {day: [(start, end, template_id), ...]}} sorted by start
+        self._by_user_day: dict[uuid.UUID, dict[datetime.date, list]] = defaultdict(dict)
+        # {(template_id, day): count} for shifts belonging to this department
+        self._template_day_counts: dict[tuple, int] = defaultdict(int)
+
+    @classmethod
+    def load(
+        cls,
+        department: Department,
+        user_ids: list[uuid.UUID],
+        month_start: datetime.date,
+        month_end: datetime.date,
+    ) -> SchedulingWorkspace:
+        """
+        Build a workspace for a department and month with two queries.
+
+        :param department: Department being scheduled
+        :param user_ids: IDs of the users that may receive shifts
+        :param month_start: First day of the month
+        :param month_end: Last day of the month
+        :return: Populated SchedulingWorkspace
+        """
+        window_start = month_start - datetime.timedelta(days=7)
+        window_end = month_end + datetime.timedelta(days=7)
+
+        primary_templates = list(
+            ShiftTemplate.objects.filter(department=department).order_by("id")[:2]
+        )
+        workspace = cls(department, primary_templates, window_start, window_end)
+
+        rows = GeneratedShift.objects.filter(
+            Q(user_id__in=user_ids) | Q(department=department),
+            start_datetime__date__gte=window_start,
+            start_datetime__date__lte=window_end,
+        ).values_list(
+            "user_id", "department_id", "start_datetime", "end_datetime", "source_template_id"
+        )
+        for user_id, department_id, start_dt, end_dt, template_id in rows:
+            workspace._index(user_id, department_id, start_dt, end_dt, template_id)
+
+        return workspace
+
+    def add_shift(self, shift: GeneratedShift) -> None:
+        """Register a shift created during the run."""
+        self._index(
+            shift.user_id,
+            shift.department_id,
+            shift.start_datetime,
+            shift.end_datetime,
+            shift.source_template_id,
+        )
+
+    def _index(self, user_id, department_id, start_dt, end_dt, template_id) -> None:
+        day = timezone.localtime(start_dt).date()
+        bisect.insort(
+            self._by_user_day[user_id].setdefault(day, []),
+            (start_dt, end_dt, template_id),
+            key=lambda shift: shift[0],
+        )
+        if department_id == self.department.id:
+            self._template_day_counts[(template_id, day)] += 1
+
+    def has_shift_on(self, user_id: uuid.UUID, date: datetime.date, template_id=None) -> bool:
+        """Return True if the user already has a shift starting on ``date``."""
+        shifts = self._by_user_day.get(user_id, {}).get(date, ())
+        if template_id is None:
+            return bool(shifts)
+        return any(shift[2] == template_id for shift in shifts)
+
+    def users_with_shifts_on(self, date: datetime.date) -> set:
+        """Return the IDs of every indexed user with a shift starting on ``date``."""
+        return {
+            user_id for user_id, days in self._by_user_day.items() if days.get(date)
+        }
+
+    def overlaps(
+        self,
+        user_id: uuid.UUID,
+        start_dt: datetime.datetime,
+        end_dt: datetime.datetime,
+    ) -> bool:
+        """Return True if ``[start_dt, end_dt)`` overlaps any shift of the user."""
+        days = self._by_user_day.get(user_id)
+        if not days:
+            return False
+
+        day = timezone.localtime(start_dt).date()
+        for offset in range(-OVERLAP_DAY_SPAN, OVERLAP_DAY_SPAN + 1):
+            shifts = days.get(day + datetime.timedelta(days=offset), ())
+            # Shifts on a day are sorted by start, so stop once they begin after end_dt
+            for shift_start, shift_end, _ in shifts:
+                if shift_start >= end_dt:
+                    break
+                if shift_end > start_dt:
+                    return True
+        return False
+
+    def week_template_id(self, user_id: uuid.UUID, date: datetime.date):
+        """
+        Return the template of the user's first shift in the Monday-Sunday week of ``date``.
+
+        :return: Template ID or None when the user has no shift that week
+        """
+        days = self._by_user_day.get(user_id)
+        if not days:
+            return None
+
+        first_day_of_week = date - datetime.timedelta(days=date.weekday())
+        for offset in range(7):
+            shifts = days.get(first_day_of_week + datetime.timedelta(days=offset))
+            if shifts:
+                return shifts[0][2]
+        return None
+
+    def template_count_on(self, template_id, date: datetime.date) -> int:
+        """Return how many department shifts of ``template_id`` start on ``date``."""
+        return self._template_day_counts.get((template_id, date), 0)
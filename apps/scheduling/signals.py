@@ -1,10 +1,59 @@
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from .models import GeneratedShift
+from .services.busy_intervals import BusyIntervalCache, appointment_bounds
 from .services.schedule_service import SchedulePatternService
 
 
 @receiver([post_save, post_delete], sender=GeneratedShift)
 def invalidate_schedule_cache(sender, instance, **kwargs):
-    SchedulePatternService.invalidate_cache(instance.user_id)
+    SchedulePatternService.invalidate_cache(
+        instance.user_id, timezone.localtime(instance.start_datetime).date()
+    )
+
+
+def _appointment_interval(physician_id, appointment_date, appointment_time, duration_minutes):
+    return (physician_id, *appointment_bounds(appointment_date, appointment_time, duration_minutes))
+
+
+@receiver(pre_save, sender=GeneratedShift)
+def remember_previous_shift_interval(sender, instance, **kwargs):
+    """Keep the pre-update interval so a moved shift also clears its old days."""
+    previous = sender.objects.filter(pk=instance.pk).values_list(
+        "user_id", "start_datetime", "end_datetime"
+    ).first() if not instance._state.adding else None
+    instance._previous_busy_interval = previous
+
+
+@receiver([post_save, post_delete], sender=GeneratedShift)
+def invalidate_shift_busy_intervals(sender, instance, **kwargs):
+    entries = [(instance.user_id, instance.start_datetime, instance.end_datetime)]
+    if getattr(instance, "_previous_busy_interval", None):
+        entries.append(instance._previous_busy_interval)
+    BusyIntervalCache.invalidate(entries)
+
+
+@receiver(pre_save, sender="patients.PatientAppointment")
+def remember_previous_appointment_interval(sender, instance, **kwargs):
+    """Keep the pre-update interval so a rescheduled appointment also clears its old days."""
+    previous = sender.objects.filter(pk=instance.pk).values_list(
+        "physician_id", "appointment_date", "appointment_time", "duration_minutes"
+    ).first() if not instance._state.adding else None
+    instance._previous_busy_interval = _appointment_interval(*previous) if previous else None
+
+
+@receiver([post_save, post_delete], sender="patients.PatientAppointment")
+def invalidate_appointment_busy_intervals(sender, instance, **kwargs):
+    entries = [
+        _appointment_interval(
+            instance.physician_id,
+            instance.appointment_date,
+            instance.appointment_time,
+            instance.duration_minutes,
+        )
+    ]
+    if getattr(instance, "_previous_busy_interval", None):
+        entries.append(instance._previous_busy_interval)
+    BusyIntervalCache.invalidate(entries)
@@ -1,18 +1,64 @@
+from __future__ import annotations
+
+import datetime
+import random
+
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django import db
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import DatabaseError, OperationalError, connection
-from django_tenants.utils import schema_context
+from django.utils import timezone
+from django_redis import get_redis_connection
+from django_tenants.utils import get_public_schema_name, schema_context
 
 from apps.scheduling.models import ShiftSwapRequest
 from apps.scheduling.shift_generator.scheduler import generate_monthly_schedule
 from apps.scheduling.shift_swap.swap_engine import process_swap_request
+from apps.scheduling.utils.shift_generator import (
+    DepartmentGenerationResult,
+    ShiftGenerator,
+    summarize_department_results,
+)
 
 logger = get_task_logger(__name__)
 
 User = get_user_model()
 
+# One key per concurrent tenant run; the value is the schema holding the slot
+TENANT_SLOT_KEY = "medicore:shift_generation:tenant_slot:{index}"
+
+
+def acquire_tenant_slot(schema_name: str) -> int | None:
+    """
+    Claim one of the SHIFT_GENERATION_TENANT_CONCURRENCY generation slots.
+
+    Slots live in Redis so the limit holds across all workers. Each expires
+    after SHIFT_GENERATION_SLOT_TIMEOUT_SECONDS, so a run whose chord
+    callback never fires cannot hold its slot forever.
+
+    :return: The slot index, or None when every slot is taken
+    """
+    redis = get_redis_connection("default")
+    for index in range(settings.SHIFT_GENERATION_TENANT_CONCURRENCY):
+        if redis.set(
+            TENANT_SLOT_KEY.format(index=index),
+            schema_name,
+            nx=True,
+            ex=settings.SHIFT_GENERATION_SLOT_TIMEOUT_SECONDS,
+        ):
+            return index
+    return None
+
+
+def release_tenant_slot(index: int, schema_name: str) -> None:
+    """Free a slot, unless it expired and another tenant has claimed it since."""
+    redis = get_redis_connection("default")
+    key = TENANT_SLOT_KEY.format(index=index)
+    if redis.get(key) == schema_name.encode():
+        redis.delete(key)
+
 @shared_task(bind=True, max_retries=3)
 def generate_initial_shifts(self, department_id, year, month, schema_name):
     with schema_context(schema_name):
@@ -22,6 +68,128 @@ def generate_initial_shifts(self, department_id, year, month, schema_name):
             # Retry logic etc.
             logger.exception(f"Error generating shifts: {e}")
 
+@shared_task(bind=True, max_retries=3)
+def generate_department_shifts_task(
+    self, department_id, schema_name, initial_setup=False, generation_end_date=None
+):
+    """
+    Generate shifts for one department; the fan-out unit of ShiftGenerator.
+
+    A transient ``OperationalError`` is retried with backoff; once retries
+    run out, or on any other database error, the failure is reported in the
+    result so the chord callback still runs.
+    """
+    end_date = datetime.date.fromisoformat(generation_end_date) if generation_end_date else None
+    with schema_context(schema_name):
+        try:
+            result = ShiftGenerator().generate_for_department(
+                department_id, initial_setup, end_date
+            )
+        except (DatabaseError, OperationalError) as e:
+            if isinstance(e, OperationalError) and self.request.retries < self.max_retries:
+                logger.warning(f"Retrying shift generation for department {department_id}: {e}")
+                raise self.retry(exc=e, countdown=2 ** self.request.retries * 30) from e
+            logger.exception(f"Error generating shifts for department {department_id}: {e}")
+            result = DepartmentGenerationResult(
+                department_id=str(department_id),
+                generated=0,
+                duration_seconds=0.0,
+                error=str(e)
+            )
+    return result._asdict()
+
+@shared_task
+def summarize_department_shifts_task(results, schema_name=None, slot=None):
+    """Chord callback of ``ShiftGenerator.dispatch_department_shifts``; frees the tenant's slot."""
+    try:
+        summary = summarize_department_results(results)
+    finally:
+        if slot is not None:
+            release_tenant_slot(slot, schema_name)
+    summary["schema_name"] = schema_name
+    logger.info(
+        f"Tenant {schema_name}: generated {summary['total_generated']} shifts across "
+        f"{len(summary['departments'])} departments, {len(summary['failures'])} failed, "
+        f"slowest department {summary['slowest_seconds']:.3f}s"
+    )
+    return summary
+
+@shared_task
+def generate_daily_shifts():
+    """
+    Nightly entry point: enqueue one schema-scoped generation task per active tenant.
+
+    Every tenant task is enqueued on its own with a single random countdown,
+    so starts are spread over SHIFT_GENERATION_MAX_JITTER_SECONDS and a
+    failing tenant (or a failed enqueue) affects no other tenant. Tenant
+    tasks then wait for one of SHIFT_GENERATION_TENANT_CONCURRENCY slots, and
+    each fans out to one task per department.
+    """
+    from tenants.models import Client
+
+    schema_names = list(
+        Client.objects.filter(status="active")
+        .exclude(schema_name=get_public_schema_name())
+        .order_by("schema_name")
+        .values_list("schema_name", flat=True)
+    )
+    if not schema_names:
+        logger.info("No active tenants to generate shifts for")
+        return 0
+
+    max_jitter = settings.SHIFT_GENERATION_MAX_JITTER_SECONDS
+    enqueued = 0
+    for schema_name in schema_names:
+        try:
+            generate_tenant_daily_shifts.apply_async(
+                (schema_name,), countdown=random.uniform(0, max_jitter)  # noqa: S311
+            )
+        except Exception as e:
+            logger.exception(f"Failed to enqueue daily shift generation for tenant {schema_name}: {e}")
+            continue
+        enqueued += 1
+
+    logger.info(f"Enqueued daily shift generation for {enqueued} of {len(schema_names)} tenants")
+    return enqueued
+
+@shared_task(bind=True)
+def generate_tenant_daily_shifts(self, schema_name):
+    """
+    Fan the tenant's rolling shift window out to one task per department.
+
+    At most SHIFT_GENERATION_TENANT_CONCURRENCY tenants run at once: without
+    a free slot the task retries every SHIFT_GENERATION_SLOT_RETRY_SECONDS.
+    The slot is held until ``summarize_department_shifts_task`` has reported
+    the per-department results and timings.
+    """
+    slot = acquire_tenant_slot(schema_name)
+    if slot is None:
+        raise self.retry(
+            countdown=settings.SHIFT_GENERATION_SLOT_RETRY_SECONDS,
+            max_retries=settings.SHIFT_GENERATION_SLOT_MAX_WAITS,
+        )
+
+    end_date = timezone.now().date() + datetime.timedelta(
+        days=settings.SHIFT_GENERATION_WINDOW_DAYS
+    )
+    result = None
+    try:
+        with schema_context(schema_name):
+            result = ShiftGenerator().dispatch_department_shifts(
+                schema_name, generation_end_date=end_date, slot=slot
+            )
+    except (DatabaseError, OperationalError) as e:
+        logger.exception(f"Daily shift generation failed for tenant {schema_name}: {e}")
+        return {"schema_name": schema_name, "dispatched": False, "error": str(e)}
+    finally:
+        # The chord callback releases the slot once dispatched
+        if result is None:
+            release_tenant_slot(slot, schema_name)
+
+    if result is None:
+        logger.info(f"Tenant {schema_name}: no active shift assignments")
+    return {"schema_name": schema_name, "dispatched": result is not None}
+
 @shared_task(bind=True, max_retries=3)
 def process_swap_request_task(swap_request_id, tenant_schema):
     with schema_context(tenant_schema):
@@ -1,3 +1,720 @@
-from django.test import TestCase
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import pytest
+from dateutil import rrule
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.renderers import JSONRenderer
+
+from apps.patients.models import Patient, PatientAppointment
+from apps.scheduling.models import (
+    GeneratedShift,
+    NurseAvailability,
+    ShiftTemplate,
+    UserShiftPreference,
+    UserShiftState,
+)
+from apps.scheduling.services.department_board import DepartmentBoardService
+from apps.scheduling.services.schedule_service import (
+    AppointmentService,
+    AppointmentTimeConflictError,
+    AppointmentTimeService,
+    RecurringAppointmentService,
+    SchedulePatternService,
+    SlotGrid,
+)
+from apps.scheduling.shift_generator.calendar import get_month_calendar
+from apps.scheduling.shift_generator.data_loader import load_department_data
+from apps.scheduling.shift_generator.scheduler import (
+    NurseEligibilityChecker,
+    ScheduleGenerator,
+    SchedulerContext,
+)
+from apps.scheduling.shift_generator.workspace import SchedulingWorkspace
+from apps.scheduling.utils.recurrence import RRULE_FREQ, WEEKDAY_INDEX, RecurrenceEngine
+from apps.staff.models import Department, DepartmentMember
+from apps.staff.models.staff_profile import DoctorProfile
+from core.models import MyUser
+
+logger = logging.getLogger(__name__)
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+MONTH_START = date(2030, 1, 1)
+NURSES = 12
+SLOT_MINUTES = 5
+WEEKS_PER_YEAR = 52
+PATTERN_WEEKS = 8
+SCALE_MONTH_START = date(2030, 4, 1)  # 30 days
+SCALE_NURSES = 200
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+BOARD_DOCTORS = 60
+RECURRENCE_YEARS = 2
+SEARCH_DOCTORS = 50
+SEARCH_DAYS = 30
+SEARCH_LIMIT = 10
+
+
+class DepartmentBoardETagTests(SimpleTestCase):
+    etag = '"0123abcd"'
+
+    def test_matches_exact_tag_in_list(self):
+        assert DepartmentBoardService.etag_matches(self.etag, '"ffff", "0123abcd"')
+
+    def test_matches_weak_tag(self):
+        assert DepartmentBoardService.etag_matches(self.etag, 'W/"0123abcd"')
+
+    def test_matches_wildcard(self):
+        assert DepartmentBoardService.etag_matches(self.etag, "*")
+
+    def test_rejects_substring(self):
+        assert not DepartmentBoardService.etag_matches(self.etag, '"0123abcd-old"')
+        assert not DepartmentBoardService.etag_matches(self.etag, '"x0123abcd"')
+
+    def test_rejects_malformed_header(self):
+        assert not DepartmentBoardService.etag_matches(self.etag, '"0123abcd')
+
+
+def recurring_template(template_id, recurrence, valid_from, **parameters):
+    return SimpleNamespace(
+        id=template_id,
+        recurrence=recurrence,
+        recurrence_parameters=parameters,
+        valid_from=valid_from,
+        valid_until=None,
+    )
+
+
+def rrule_dates(template, start, end):
+    """Expand ``template`` over ``[start, end]`` with a plain ``dateutil.rrule``."""
+    params = template.recurrence_parameters
+    rule = rrule.rrule(
+        RRULE_FREQ[template.recurrence],
+        dtstart=datetime.combine(template.valid_from, clock.min),
+        interval=params.get("interval", 1),
+        byweekday=[WEEKDAY_INDEX[day] for day in params["days"]] if params.get("days") else None,
+    )
+    return [
+        occurrence.date()
+        for occurrence in rule.between(datetime.combine(start, clock.min), datetime.combine(end, clock.min), inc=True)
+    ]
+
+
+class RecurrenceEngineTests(SimpleTestCase):
+    """DayMask expansion against dateutil.rrule, for results and for speed."""
+
+    start = MONTH_START
+    end = date(MONTH_START.year + RECURRENCE_YEARS, 1, 1) - timedelta(days=1)
+    templates = [
+        recurring_template(1, "DAILY", date(2029, 12, 30)),
+        recurring_template(2, "DAILY", date(2029, 12, 30), interval=3),
+        recurring_template(3, "DAILY", date(2029, 12, 30), days=["MON", "FRI"]),
+        recurring_template(4, "WEEKLY", date(2029, 12, 30)),
+        recurring_template(5, "WEEKLY", date(2029, 12, 30), interval=2, days=["TUE", "SAT"]),
+        recurring_template(6, "MONTHLY", date(2029, 10, 31)),
+        recurring_template(7, "MONTHLY", date(2029, 12, 30), interval=2, days=["WED"]),
+        recurring_template(8, "YEARLY", date(2028, 2, 29)),
+    ]
+
+    def test_masks_match_rrule(self):
+        engine = RecurrenceEngine()
+        for template in self.templates:
+            with self.subTest(recurrence=template.recurrence, parameters=template.recurrence_parameters):
+                assert engine.dates_between(template, self.start, self.end) == rrule_dates(
+                    template, self.start, self.end
+                )
+
+    def test_partial_windows_match_rrule(self):
+        engine = RecurrenceEngine()
+        window_start = date(2030, 2, 20)
+        window_end = date(2030, 4, 3)
+        for template in self.templates:
+            with self.subTest(recurrence=template.recurrence, parameters=template.recurrence_parameters):
+                assert engine.dates_between(template, window_start, window_end) == rrule_dates(
+                    template, window_start, window_end
+                )
+
+    def test_rrule_fallback_is_faster_than_rrule_per_lookup(self):
+        # MONTHLY and YEARLY go through _expand_with_rrule once per month;
+        # a generation run then asks for every nurse's weeks
+        templates = [template for template in self.templates if template.recurrence in ("MONTHLY", "YEARLY")]
+        weeks = [self.start + timedelta(weeks=week) for week in range(WEEKS_PER_YEAR * RECURRENCE_YEARS)]
+
+        started = time.perf_counter()
+        engine = RecurrenceEngine()
+        engine_dates = [
+            engine.dates_between(template, week, week + timedelta(days=6))
+            for _ in range(NURSES)
+            for template in templates
+            for week in weeks
+        ]
+        engine_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference_dates = [
+            rrule_dates(template, week, week + timedelta(days=6))
+            for _ in range(NURSES)
+            for template in templates
+            for week in weeks
+        ]
+        rrule_elapsed = time.perf_counter() - started
+
+        assert engine_dates == reference_dates
+        assert engine_elapsed < rrule_elapsed
+        logger.info(f"recurrence lookups: engine {engine_elapsed:.3f}s, rrule {rrule_elapsed:.3f}s")
+
+
+class SchedulingTestCase(TenantTestCase):
+    """A department with a morning/night template pair and a pool of nurses."""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Scheduling Test Hospital"
+        tenant.paid_until = timezone.localdate() + timedelta(days=30)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Cardiology", code="CARD")
+        self.templates = [
+            self.create_template("Morning", clock(7, 0), clock(15, 0), "MORNING"),
+            self.create_template("Night", clock(19, 0), clock(7, 0), "NIGHT"),
+        ]
+        self.nurses = [self.create_nurse(index) for index in range(NURSES)]
+
+    def create_template(self, name, start_time, end_time, rotation_group):
+        return ShiftTemplate.objects.create(
+            department=self.department,
+            name=name,
+            start_time=start_time,
+            end_time=end_time,
+            recurrence_parameters={"days": ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]},
+            valid_from=MONTH_START - timedelta(days=365),
+            rotation_group=rotation_group,
+            max_staff_weekday=3,
+            max_staff_weekend=2,
+        )
+
+    def create_nurse(self, index):
+        user = MyUser.objects.create_user(f"nurse{index}@example.com", "password", first_name=f"Nurse {index}")
+        return DepartmentMember.objects.create(
+            department=self.department,
+            user=user,
+            role="NURSE",
+            start_date=MONTH_START - timedelta(days=365),
+            end_date=MONTH_START + timedelta(days=365),
+            time_allocation=100,
+            emergency_contact="+15550000000",
+        )
+
+    def create_doctor(self, index):
+        user = MyUser.objects.create_user(
+            f"doctor{index}@example.com", "password", first_name="Doctor", last_name=f"{index:02d}"
+        )
+        return DepartmentMember.objects.create(
+            department=self.department,
+            user=user,
+            role="DOCTOR",
+            start_date=MONTH_START - timedelta(days=365),
+            end_date=MONTH_START + timedelta(days=365),
+            time_allocation=100,
+            emergency_contact="+15550000000",
+        )
+
+
+class ShiftSolverBenchmark(SchedulingTestCase):
+    """Flow solver against the greedy two-group rotation on the same month."""
+
+    def setUp(self):
+        super().setUp()
+        # A third of the ward is on leave for the first ten days
+        for nurse in self.nurses[::3]:
+            NurseAvailability.objects.create(
+                user=nurse.user,
+                start_date=MONTH_START,
+                end_date=MONTH_START + timedelta(days=9),
+                reason="Vacation",
+                availability_status="unavailable",
+            )
+
+    def run_solver(self, solver):
+        """Generate the month, then roll it back; return (covered staff, shifts, seconds)."""
+        with transaction.atomic():
+            started = time.perf_counter()
+            ScheduleGenerator.generate_weekly_schedule(
+                self.department.id, MONTH_START.year, MONTH_START.month, solver=solver
+            )
+            elapsed = time.perf_counter() - started
+
+            shifts = Counter(
+                (template_id, timezone.localtime(start).date())
+                for template_id, start in GeneratedShift.objects.filter(
+                    department=self.department
+                ).values_list("source_template_id", "start_datetime")
+            )
+            transaction.set_rollback(True)
+
+        month_calendar = get_month_calendar(
+            MONTH_START.year, MONTH_START.month, self.department.id, self.templates
+        )
+        covered = sum(
+            min(shifts[(template.id, day)], month_calendar.required_staff_for(template, day))
+            for template in self.templates
+            for day in month_calendar.dates
+        )
+        return covered, sum(shifts.values()), elapsed
+
+    def test_flow_solver_covers_at_least_as_much_as_greedy(self):
+        greedy_covered, greedy_shifts, greedy_elapsed = self.run_solver("greedy")
+        flow_covered, flow_shifts, flow_elapsed = self.run_solver("flow")
+
+        assert flow_covered >= greedy_covered
+        # The greedy rotation books every available nurse; the solver stops at demand
+        assert flow_shifts <= greedy_shifts
+        assert flow_elapsed < settings.SHIFT_SCHEDULER_TIME_BUDGET_SECONDS
+        logger.info(
+            f"greedy: {greedy_covered} covered, {greedy_shifts} shifts, {greedy_elapsed:.3f}s; "
+            f"flow: {flow_covered} covered, {flow_shifts} shifts, {flow_elapsed:.3f}s"
+        )
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ShiftSolverScaleBenchmark(SchedulingTestCase):
+    """The flow solver on a full ward: 200 nurses, 30 days and three templates."""
+
+    def setUp(self):
+        super().setUp()
+        self.templates.append(self.create_template("Evening", clock(15, 0), clock(23, 0), "EVENING"))
+        ShiftTemplate.objects.filter(department=self.department).update(
+            max_staff_weekday=20, max_staff_weekend=15
+        )
+        self.nurses += [self.create_nurse(index) for index in range(NURSES, SCALE_NURSES)]
+
+    def test_flow_solver_meets_time_budget_without_fallback(self):
+        with (
+            transaction.atomic(),
+            mock.patch.object(
+                ScheduleGenerator, "_build_weekly_calendar", wraps=ScheduleGenerator._build_weekly_calendar
+            ) as greedy_fallback,
+        ):
+            started = time.perf_counter()
+            ScheduleGenerator.generate_weekly_schedule(
+                self.department.id, SCALE_MONTH_START.year, SCALE_MONTH_START.month, solver="flow"
+            )
+            elapsed = time.perf_counter() - started
+            shifts = GeneratedShift.objects.filter(department=self.department).count()
+            transaction.set_rollback(True)
+
+        greedy_fallback.assert_not_called()
+        assert shifts > 0
+        assert elapsed < settings.SHIFT_SCHEDULER_TIME_BUDGET_SECONDS
+        logger.info(f"flow: {SCALE_NURSES} nurses, {shifts} shifts in {elapsed:.3f}s")
+
+
+class DepartmentDataQueryTests(SchedulingTestCase):
+    """Loading a department's scheduling data costs the same queries for any headcount."""
+
+    # department, members, templates, availabilities, states, preferences,
+    # preferred templates, weekend policy
+    LOAD_QUERIES = 8
+
+    def setUp(self):
+        super().setUp()
+        self.seed_rotation_data(self.nurses)
+
+    def seed_rotation_data(self, nurses):
+        for nurse in nurses:
+            UserShiftState.objects.create(
+                user=nurse.user, department=self.department, current_template=self.templates[0]
+            )
+            preference = UserShiftPreference.objects.create(user=nurse.user, department=self.department)
+            preference.preferred_shift_types.add(self.templates[1])
+            NurseAvailability.objects.create(
+                user=nurse.user,
+                start_date=MONTH_START,
+                end_date=MONTH_START + timedelta(days=2),
+                reason="Training",
+            )
+
+    def load(self):
+        with self.assertNumQueries(self.LOAD_QUERIES):
+            data = load_department_data(self.department.id, MONTH_START)
+
+        # Related rows come back with the data
+        with self.assertNumQueries(0):
+            for member in data["active_members"]:
+                assert data["shift_states"][member.user_id].current_template == self.templates[0]
+                assert list(data["user_preferences"][member.user_id].preferred_shift_types.all()) == [
+                    self.templates[1]
+                ]
+                assert len(data["availabilities"][member.user_id]) == 1
+        return data
+
+    def test_query_count_does_not_grow_with_members(self):
+        assert len(self.load()["active_members"]) == NURSES
+
+        self.seed_rotation_data([self.create_nurse(index) for index in range(NURSES, 3 * NURSES)])
+        assert len(self.load()["active_members"]) == 3 * NURSES
+
+
+class SchedulingWorkspaceQueryTests(SchedulingTestCase):
+    """The workspace loads a month in two queries and answers checks from memory."""
+
+    def setUp(self):
+        super().setUp()
+        morning = self.templates[0]
+        self.first_week = [MONTH_START + timedelta(days=offset) for offset in range(7)]
+        GeneratedShift.objects.bulk_create(
+            GeneratedShift(
+                user=nurse.user,
+                department=self.department,
+                start_datetime=timezone.make_aware(datetime.combine(day, morning.start_time)),
+                end_datetime=timezone.make_aware(datetime.combine(day, morning.end_time)),
+                source_template=morning,
+            )
+            for nurse in self.nurses
+            for day in self.first_week
+        )
+
+    def test_month_checks_are_query_free(self):
+        month_end = date(MONTH_START.year, MONTH_START.month, 31)
+        with self.assertNumQueries(2):  # primary templates, shifts
+            workspace = SchedulingWorkspace.load(
+                self.department, [nurse.user_id for nurse in self.nurses], MONTH_START, month_end
+            )
+
+        morning, night = self.templates
+        with self.assertNumQueries(0):
+            for nurse in self.nurses:
+                for day in self.first_week:
+                    assert workspace.has_shift_on(nurse.user_id, day, morning.id)
+                    assert workspace.overlaps(
+                        nurse.user_id,
+                        timezone.make_aware(datetime.combine(day, clock(14, 0))),
+                        timezone.make_aware(datetime.combine(day, clock(16, 0))),
+                    )
+                    assert workspace.week_template_id(nurse.user_id, day) == morning.id
+                assert not workspace.has_shift_on(nurse.user_id, month_end)
+            for day in self.first_week:
+                assert workspace.template_count_on(morning.id, day) == NURSES
+                assert workspace.template_count_on(night.id, day) == 0
+
+    def week_templates(self, context):
+        return [
+            NurseEligibilityChecker.get_week_template_id(nurse, day, context)
+            for nurse in self.nurses
+            for day in self.first_week
+        ]
+
+    def test_workspace_is_faster_than_a_query_per_check(self):
+        month_end = date(MONTH_START.year, MONTH_START.month, 31)
+        database_context = SchedulerContext(
+            availabilities={}, shift_states={}, user_preferences={}, weekend_policy=None
+        )
+        with self.assertNumQueries(NURSES * len(self.first_week)):
+            started = time.perf_counter()
+            database_answers = self.week_templates(database_context)
+            database_elapsed = time.perf_counter() - started
+
+        # The workspace pays for its own load and still wins
+        with self.assertNumQueries(2):
+            started = time.perf_counter()
+            workspace = SchedulingWorkspace.load(
+                self.department, [nurse.user_id for nurse in self.nurses], MONTH_START, month_end
+            )
+            workspace_answers = self.week_templates(database_context._replace(workspace=workspace))
+            workspace_elapsed = time.perf_counter() - started
+
+        assert workspace_answers == database_answers == [self.templates[0].id] * len(database_answers)
+        assert workspace_elapsed < database_elapsed
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SlotGridQueryTests(SchedulingTestCase):
+    """A physician's full-day grid is built in a constant number of queries and sliced in none."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.physician = self.nurses[0].user
+        self.day = MONTH_START
+        day_start = timezone.make_aware(datetime.combine(self.day, clock.min))
+        GeneratedShift.objects.create(
+            user=self.physician,
+            department=self.department,
+            start_datetime=day_start,
+            end_datetime=day_start + timedelta(days=1),
+            source_template=self.templates[0],
+        )
+        patient = Patient.objects.create(pin="TST-0002-0001")
+        for appointment_time in (clock(9, 0), clock(14, 30)):
+            PatientAppointment.objects.create(
+                patient=patient,
+                physician=self.physician,
+                appointment_date=self.day,
+                appointment_time=appointment_time,
+                duration_minutes=30,
+                reason="Check-up",
+                category="General",
+            )
+
+    def test_full_day_grid_queries(self):
+        # Busy-interval cache miss (shifts, appointments) plus leave
+        with self.assertNumQueries(3):
+            grid = SlotGrid.for_day(self.physician.id, self.day)
+
+        with self.assertNumQueries(0):
+            slots = grid.slots(SLOT_MINUTES)
+            free = grid.slots(SLOT_MINUTES, available_only=True)
+
+        assert len(slots) == 24 * 60 // SLOT_MINUTES
+        assert len(slots) - len(free) == 2 * 30 // SLOT_MINUTES
+
+        # Busy intervals now come from the cache; only leave is read
+        with self.assertNumQueries(1):
+            SlotGrid.for_day(self.physician.id, self.day)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PASSWORD_HASHERS=FAST_HASHERS)
+class DepartmentSlotSearchQueryTests(SchedulingTestCase):
+    """The department slot search costs the same queries for 50 doctors over 30 days as for one."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.doctors = [self.create_doctor(index) for index in range(SEARCH_DOCTORS)]
+        days = [MONTH_START + timedelta(days=offset) for offset in range(SEARCH_DAYS)]
+        # Staggered starts so every doctor's slots interleave with the others'
+        GeneratedShift.objects.bulk_create(
+            GeneratedShift(
+                user=doctor.user,
+                department=self.department,
+                start_datetime=timezone.make_aware(datetime.combine(day, clock(7, 0)))
+                + timedelta(minutes=7 * (index % 10)),
+                end_datetime=timezone.make_aware(datetime.combine(day, clock(15, 0))),
+                source_template=self.templates[0],
+            )
+            for index, doctor in enumerate(self.doctors)
+            for day in days
+        )
+        # The earliest doctors are booked at the start of the first day
+        patient = Patient.objects.create(pin="TST-0006-0001")
+        PatientAppointment.objects.bulk_create(
+            PatientAppointment(
+                patient=patient,
+                physician=doctor.user,
+                appointment_date=MONTH_START,
+                appointment_time=clock(7, 0),
+                duration_minutes=60,
+                reason="Check-up",
+                category="General",
+            )
+            for doctor in self.doctors[::10]
+        )
+
+    def search(self, limit):
+        return AppointmentTimeService.search_department_slots(
+            str(self.department.id), MONTH_START, days=SEARCH_DAYS, limit=limit
+        )
+
+    def test_search_is_ordered_and_stops_at_limit(self):
+        with self.assertNumQueries(4):  # doctors, shifts, appointments, leave
+            slots = self.search(SEARCH_LIMIT)
+
+        assert len(slots) == SEARCH_LIMIT
+        starts = [slot["start_time"] for slot in slots]
+        assert starts == sorted(starts)
+
+        booked = {str(doctor.user_id) for doctor in self.doctors[::10]}
+        first_hour = timezone.make_aware(datetime.combine(MONTH_START, clock(8, 0)))
+        assert not any(slot["physician_id"] in booked and slot["start_time"] < first_hour for slot in slots)
+
+        # The truncated stream is the head of the complete one
+        every_slot = self.search(SEARCH_DOCTORS * SEARCH_DAYS * 24)
+        assert len(every_slot) > SEARCH_LIMIT
+        assert slots == every_slot[:SEARCH_LIMIT]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecurringSeriesQueryTests(SchedulingTestCase):
+    """Validating and booking a recurring series costs the same queries for any length."""
+
+    def setUp(self):
+        super().setUp()
+        self.physician = self.nurses[0].user
+        DoctorProfile.objects.create(user=self.physician)
+        # The physician works the Tuesday of every week the series covers
+        self.shifts = GeneratedShift.objects.bulk_create(
+            GeneratedShift(
+                user=self.physician,
+                department=self.department,
+                start_datetime=timezone.make_aware(datetime.combine(day, clock(8, 0))),
+                end_datetime=timezone.make_aware(datetime.combine(day, clock(16, 0))),
+                source_template=self.templates[0],
+            )
+            for day in (MONTH_START + timedelta(weeks=week) for week in range(WEEKS_PER_YEAR))
+        )
+        self.patient = Patient.objects.create(pin="TST-0003-0001")
+
+    def book_series(self, appointment_time, occurrences, department=None):
+        cache.clear()
+        serializer = SimpleNamespace(validated_data={
+            "physician": self.physician,
+            "department": department or self.department,
+            "appointment_date": MONTH_START,
+            "appointment_time": appointment_time,
+            "duration_minutes": 30,
+            "recurrence_pattern": "Weekly",
+            "reason": "Follow-up",
+            "category": "General",
+        })
+        return RecurringAppointmentService.create_recurring_appointments(
+            serializer, self.physician, self.patient.id, occurrences=occurrences
+        )
+
+    def assert_series_rejected(self, message, **kwargs):
+        with pytest.raises(AppointmentTimeConflictError, match=message):
+            self.book_series(clock(9, 0), WEEKS_PER_YEAR, **kwargs)
+        assert not PatientAppointment.objects.filter(physician=self.physician).exists()
+
+    def test_year_long_series_costs_the_same_as_a_short_one(self):
+        with CaptureQueriesContext(connection) as short_series:
+            self.book_series(clock(9, 0), 4)
+
+        with self.assertNumQueries(len(short_series)):
+            self.book_series(clock(10, 0), WEEKS_PER_YEAR)
+
+        assert PatientAppointment.objects.filter(
+            physician=self.physician, appointment_time=clock(10, 0), is_recurring=True
+        ).count() == WEEKS_PER_YEAR
+
+    def test_each_occurrence_is_checked_against_its_own_week(self):
+        self.shifts[30].delete()
+        self.assert_series_rejected("not allow on Tuesday")
+
+    def test_physician_must_be_assigned_to_the_department(self):
+        other_department = Department.objects.create(name="Oncology", code="ONC")
+        self.assert_series_rejected("not assigned", department=other_department)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SchedulePatternsQueryTests(SchedulingTestCase):
+    """Patterns for many physicians and weeks are built from one shift query."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        morning = self.templates[0]
+        # Every physician works the Tuesday of each week
+        GeneratedShift.objects.bulk_create(
+            GeneratedShift(
+                user=nurse.user,
+                department=self.department,
+                start_datetime=timezone.make_aware(datetime.combine(day, morning.start_time)),
+                end_datetime=timezone.make_aware(datetime.combine(day, morning.end_time)),
+                source_template=morning,
+            )
+            for nurse in self.nurses
+            for day in (MONTH_START + timedelta(weeks=week) for week in range(PATTERN_WEEKS))
+        )
+
+    def get_patterns(self):
+        return SchedulePatternService.get_schedule_patterns(
+            [nurse.user_id for nurse in self.nurses],
+            MONTH_START,
+            MONTH_START + timedelta(weeks=PATTERN_WEEKS - 1),
+        )
+
+    def test_patterns_cost_one_query_cold_and_none_warm(self):
+        with self.assertNumQueries(1):
+            patterns = self.get_patterns()
+
+        assert len(patterns) == NURSES * PATTERN_WEEKS
+        for pattern in patterns.values():
+            assert pattern["tuesday"]["start"] == "07:00"
+            assert pattern["tuesday"]["end"] == "15:00"
+            assert pattern["monday"] is None
+
+        with self.assertNumQueries(0):
+            assert self.get_patterns() == patterns
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PASSWORD_HASHERS=FAST_HASHERS)
+class DepartmentBoardQueryTests(SchedulingTestCase):
+    """A 60-doctor week board costs three queries whatever the ward size; rendering it costs none."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.week = [MONTH_START + timedelta(days=offset) for offset in range(7)]
+        self.doctors = [self.create_doctor(index) for index in range(BOARD_DOCTORS)]
+        morning = self.templates[0]
+        GeneratedShift.objects.bulk_create(
+            GeneratedShift(
+                user=doctor.user,
+                department=self.department,
+                start_datetime=timezone.make_aware(datetime.combine(day, morning.start_time)),
+                end_datetime=timezone.make_aware(datetime.combine(day, morning.end_time)),
+                source_template=morning,
+            )
+            for doctor in self.doctors
+            for day in self.week
+        )
+        patient = Patient.objects.create(pin="TST-0005-0001")
+        PatientAppointment.objects.bulk_create(
+            PatientAppointment(
+                patient=patient,
+                physician=doctor.user,
+                appointment_date=day,
+                appointment_time=appointment_time,
+                duration_minutes=30,
+                reason="Check-up",
+                category="General",
+            )
+            for doctor in self.doctors
+            for day in self.week
+            for appointment_time in (clock(9, 0), clock(11, 0))
+        )
+
+    def test_week_board_costs_three_queries(self):
+        with self.assertNumQueries(3):  # doctors, shifts, appointments
+            started = time.perf_counter()
+            board = DepartmentBoardService.build(str(self.department.id), MONTH_START, len(self.week))
+            build_elapsed = time.perf_counter() - started
+
+        with self.assertNumQueries(0):
+            started = time.perf_counter()
+            payload = JSONRenderer().render(board)
+            DepartmentBoardService.etag(board)
+            render_elapsed = time.perf_counter() - started
+
+        assert len(board["physicians"]) == BOARD_DOCTORS
+        for physician in board["physicians"]:
+            assert len(physician["days"]) == len(self.week)
+            for day in physician["days"].values():
+                assert len(day["shifts"]) == 1
+                assert len(day["appointments"]) == 2  # noqa: PLR2004
+        logger.info(
+            f"board: {BOARD_DOCTORS} doctors x {len(self.week)} days, {len(payload)} bytes, "
+            f"built in {build_elapsed:.3f}s, rendered in {render_elapsed:.3f}s"
+        )
+
+    def test_department_schedule_keeps_pattern_working_hours(self):
+        with self.assertNumQueries(3):  # doctors, patterns, appointments
+            schedule = AppointmentService.get_department_schedule(str(self.department.id), MONTH_START)
+
+        assert len(schedule) == BOARD_DOCTORS
+        for entry in schedule.values():
+            assert entry["working_hours"]["start"] == "07:00"
+            assert entry["working_hours"]["end"] == "15:00"
+            assert [appointment.appointment_time for appointment in entry["appointments"]] == [
+                clock(9, 0), clock(11, 0)
+            ]
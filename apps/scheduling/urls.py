@@ -2,6 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    AppointmentAvailabilityViewSet,
+    DepartmentBoardViewSet,
     NurseAvailabilityViewSet,
     ShiftGenerationViewSet,
     ShiftTemplateViewSet,
@@ -13,6 +15,10 @@ router.register(r"shift-templates", ShiftTemplateViewSet)
 router.register(r"generate-shifts", ShiftGenerationViewSet, basename="shifts")
 router.register(r"nurse-availability", NurseAvailabilityViewSet, basename="nurse-availability")
 router.register(r"shift-preferences", UserShiftPreferenceViewSet, basename="user-shift-preference")
+router.register(r"department-board", DepartmentBoardViewSet, basename="department-board")
+router.register(
+    r"appointment-availability", AppointmentAvailabilityViewSet, basename="appointment-availability"
+)
 
 
 urlpatterns = [
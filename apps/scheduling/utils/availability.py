@@ -0,0 +1,120 @@
+# scheduling/utils/availability.py
+from __future__ import annotations
+
+import bisect
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+from apps.scheduling.models import NurseAvailability
+
+from .recurrence import DayMask
+
+if TYPE_CHECKING:
+    import uuid
+
+BLOCKING_STATUSES = {"unavailable"}
+
+
+def is_blocking(availability) -> bool:
+    """Return True if an availability record makes the user unavailable."""
+    return availability.is_blackout or availability.availability_status in BLOCKING_STATUSES
+
+
+def _merge(intervals: list[tuple[date, date]]) -> tuple[list[date], list[date]]:
+    """Sort and merge inclusive date intervals into parallel start/end arrays."""
+    starts, ends = [], []
+    for start, end in sorted(intervals):
+        if starts and start <= ends[-1] + timedelta(days=1):
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class AvailabilityIndex:
+    """
+    Per-user index of the days a user cannot work, built from ``NurseAvailability``.
+
+    Records that are blackouts or marked ``unavailable`` are merged into
+    sorted, non-overlapping interval arrays per user; ``preferred_off``
+    records that are not blackouts are kept separately as a soft signal.
+    Point and range lookups are a binary search over those arrays.
+    Users without records are always available.
+    """
+
+    def __init__(self, records=()):
+        blocked = defaultdict(list)
+        preferred_off = defaultdict(list)
+        for record in records:
+            interval = (record.start_date, record.end_date)
+            if is_blocking(record):
+                blocked[record.user_id].append(interval)
+            elif record.availability_status == "preferred_off":
+                preferred_off[record.user_id].append(interval)
+
+        self._blocked = {user_id: _merge(items) for user_id, items in blocked.items()}
+        self._preferred_off = {user_id: _merge(items) for user_id, items in preferred_off.items()}
+
+    @classmethod
+    def for_users(cls, user_ids, start: date, end: date) -> AvailabilityIndex:
+        """Build an index for ``user_ids`` covering ``[start, end]`` with one query."""
+        return cls(
+            NurseAvailability.objects.filter(
+                user_id__in=list(user_ids),
+                start_date__lte=end,
+                end_date__gte=start,
+            ).only("user_id", "start_date", "end_date", "is_blackout", "availability_status")
+        )
+
+    @staticmethod
+    def _intersects(arrays, start: date, end: date) -> bool:
+        if not arrays:
+            return False
+        starts, ends = arrays
+        # Last merged interval starting on or before `end`
+        position = bisect.bisect_right(starts, end) - 1
+        return position >= 0 and ends[position] >= start
+
+    def is_available(self, user_id: uuid.UUID, day: date) -> bool:
+        """Return True if the user is free on ``day``."""
+        return not self._intersects(self._blocked.get(user_id), day, day)
+
+    def is_available_range(self, user_id: uuid.UUID, start: date, end: date) -> bool:
+        """Return True if the user is free on every day of ``[start, end]``."""
+        return not self._intersects(self._blocked.get(user_id), start, end)
+
+    def is_preferred_off(self, user_id: uuid.UUID, day: date) -> bool:
+        """Return True if the user asked not to work on ``day`` (soft constraint)."""
+        return self._intersects(self._preferred_off.get(user_id), day, day)
+
+    def available_mask(self, user_id: uuid.UUID, start: date, end: date) -> DayMask:
+        """Return the days of ``[start, end]`` the user is free as a DayMask."""
+        days = (end - start).days + 1
+        free = DayMask.from_range(start, days, start, end)
+        arrays = self._blocked.get(user_id)
+        if not arrays:
+            return free
+
+        starts, ends = arrays
+        first = max(bisect.bisect_right(starts, start) - 1, 0)
+        for position in range(first, bisect.bisect_right(starts, end)):
+            free = free - DayMask.from_range(start, days, starts[position], ends[position])
+        return free
+
+    def month_matrix(self, user_ids, year: int, month: int) -> dict:
+        """
+        Return a whole-month availability matrix.
+
+        :return: ``{user_id: [bool per day of month]}``
+        """
+        month_start = date(year, month, 1)
+        month_end = date(year, month, calendar.monthrange(year, month)[1])
+        days = month_end.day
+        matrix = {}
+        for user_id in user_ids:
+            bits = self.available_mask(user_id, month_start, month_end).bits
+            matrix[user_id] = [bool(bits >> offset & 1) for offset in range(days)]
+        return matrix
@@ -2,8 +2,7 @@
 
 from django.contrib.auth import get_user_model
 
-from apps.scheduling.models import UserAvailability
-
+from .availability import AvailabilityIndex
 from .constraints import ConstraintChecker
 
 User = get_user_model()
@@ -17,19 +16,27 @@ class SwapMatcher:
             qualifications=self.original_shift.template,
             is_active=True
         ).exclude(pk=self.swap.requesting_user.pk)
+        candidates = list(base_query)
+
+        # One availability query for every candidate instead of one per user
+        self._availability = AvailabilityIndex.for_users(
+            [user.pk for user in candidates],
+            self.original_shift.start_datetime.date(),
+            self.original_shift.end_datetime.date()
+        )
 
         return [
-            user for user in base_query
+            user for user in candidates
             if self._is_available(user) and
             self._passes_constraints(user)
         ]
 
     def _is_available(self, user):
-        return not UserAvailability.objects.filter(
-            user=user,
-            start_date__lte=self.original_shift.start_datetime,
-            end_date__gte=self.original_shift.end_datetime
-        ).exists()
+        return self._availability.is_available_range(
+            user.pk,
+            self.original_shift.start_datetime.date(),
+            self.original_shift.end_datetime.date()
+        )
 
     def _passes_constraints(self, user):
         return ConstraintChecker(
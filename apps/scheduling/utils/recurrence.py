@@ -0,0 +1,190 @@
+# scheduling/utils/recurrence.py
+from __future__ import annotations
+
+import calendar
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from dateutil import rrule
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_INDEX = {"MON": 0, "TUE": 1, "WED": 2, "THU": 3, "FRI": 4, "SAT": 5, "SUN": 6}
+RRULE_FREQ = {
+    "DAILY": rrule.DAILY,
+    "WEEKLY": rrule.WEEKLY,
+    "MONTHLY": rrule.MONTHLY,
+    "YEARLY": rrule.YEARLY,
+}
+
+
+@dataclass(frozen=True)
+class DayMask:
+    """
+    A set of days inside a fixed window, stored as an integer bitmask.
+
+    Bit ``i`` is set when ``start + i days`` is in the set. Masks over the
+    same window combine with ``&``, ``|`` and ``-`` in a single integer op.
+    """
+
+    start: date
+    days: int
+    bits: int = 0
+
+    @classmethod
+    def from_range(cls, start: date, days: int, range_start: date, range_end: date) -> DayMask:
+        """Mask with every day of ``[range_start, range_end]`` that falls in the window."""
+        first = max((range_start - start).days, 0)
+        last = min((range_end - start).days, days - 1)
+        if last < first:
+            return cls(start, days)
+        return cls(start, days, ((1 << (last - first + 1)) - 1) << first)
+
+    @classmethod
+    def from_dates(cls, start: date, days: int, dates) -> DayMask:
+        bits = 0
+        for day in dates:
+            offset = (day - start).days
+            if 0 <= offset < days:
+                bits |= 1 << offset
+        return cls(start, days, bits)
+
+    def _check(self, other: DayMask):
+        if (self.start, self.days) != (other.start, other.days):
+            raise ValueError("DayMask operations require the same window")
+
+    def __and__(self, other: DayMask) -> DayMask:
+        self._check(other)
+        return DayMask(self.start, self.days, self.bits & other.bits)
+
+    def __or__(self, other: DayMask) -> DayMask:
+        self._check(other)
+        return DayMask(self.start, self.days, self.bits | other.bits)
+
+    def __sub__(self, other: DayMask) -> DayMask:
+        self._check(other)
+        return DayMask(self.start, self.days, self.bits & ~other.bits)
+
+    def __contains__(self, day: date) -> bool:
+        offset = (day - self.start).days
+        return 0 <= offset < self.days and bool(self.bits >> offset & 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        bits, offset = self.bits, 0
+        while bits:
+            if bits & 1:
+                yield self.start + timedelta(days=offset)
+            bits >>= 1
+            offset += 1
+
+
+class RecurrenceEngine:
+    """
+    Expands ``ShiftTemplate`` recurrences into per-month day bitmasks.
+
+    Each (template, month) is expanded once and cached for the lifetime of
+    the engine, so repeated lookups for different users and week blocks of
+    a generation run are bit operations. DAILY and WEEKLY rules are
+    evaluated arithmetically; MONTHLY and YEARLY fall back to a single
+    ``rrule`` expansion per month.
+
+    Rules are anchored at the template's ``valid_from`` so that intervals
+    greater than one keep a stable phase whatever window is queried.
+    """
+
+    def __init__(self):
+        self._month_bits: dict[tuple, int] = {}
+
+    def mask(self, template, start: date, end: date) -> DayMask:
+        """Return the template's occurrences in ``[start, end]`` as a DayMask."""
+        days = (end - start).days + 1
+        if days <= 0:
+            return DayMask(start, 0)
+
+        bits = 0
+        year, month = start.year, start.month
+        while date(year, month, 1) <= end:
+            month_bits = self.month_bits(template, year, month)
+            offset = (date(year, month, 1) - start).days
+            bits |= month_bits << offset if offset >= 0 else month_bits >> -offset
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)  # noqa: PLR2004
+
+        return DayMask(start, days, bits & ((1 << days) - 1))
+
+    def dates_between(self, template, start: date, end: date) -> list[date]:
+        """Return the template's occurrence dates in ``[start, end]``."""
+        return list(self.mask(template, start, end))
+
+    def month_bits(self, template, year: int, month: int) -> int:
+        """Return the cached bitmask (bit 0 = day 1) for one template and month."""
+        key = (template.id, year, month)
+        bits = self._month_bits.get(key)
+        if bits is None:
+            try:
+                bits = self._expand_month(template, year, month)
+            except (KeyError, ValueError, TypeError) as e:
+                logger.exception(f"Recurrence failed for template {template.id}: {e!s}")
+                bits = 0
+            self._month_bits[key] = bits
+        return bits
+
+    def _expand_month(self, template, year: int, month: int) -> int:
+        params = template.recurrence_parameters or {}
+        interval = max(int(params.get("interval", 1)), 1)
+        anchor = template.valid_from
+        month_start = date(year, month, 1)
+        month_end = date(year, month, calendar.monthrange(year, month)[1])
+
+        first = max(month_start, anchor)
+        last = min(month_end, template.valid_until) if template.valid_until else month_end
+        if last < first:
+            return 0
+
+        weekdays = {WEEKDAY_INDEX[day.upper()] for day in params.get("days", [])}
+
+        if template.recurrence == "DAILY":
+            def matches(day):
+                return (day - anchor).days % interval == 0 and (
+                    not weekdays or day.weekday() in weekdays
+                )
+        elif template.recurrence == "WEEKLY":
+            weekdays = weekdays or {anchor.weekday()}
+            anchor_monday = anchor - timedelta(days=anchor.weekday())
+
+            def matches(day):
+                return day.weekday() in weekdays and (
+                    (day - anchor_monday).days // 7 % interval == 0
+                )
+        else:
+            return self._expand_with_rrule(template, interval, first, last, month_start)
+
+        bits = 0
+        day = first
+        while day <= last:
+            if matches(day):
+                bits |= 1 << (day.day - 1)
+            day += timedelta(days=1)
+        return bits
+
+    def _expand_with_rrule(self, template, interval, first, last, month_start) -> int:
+        params = {
+            "dtstart": datetime.combine(template.valid_from, datetime.min.time()),
+            "freq": RRULE_FREQ[template.recurrence],
+            "interval": interval,
+        }
+        if template.recurrence_parameters.get("days"):
+            params["byweekday"] = [
+                WEEKDAY_INDEX[day.upper()] for day in template.recurrence_parameters["days"]
+            ]
+        occurrences = rrule.rrule(**params).between(
+            datetime.combine(first, datetime.min.time()),
+            datetime.combine(last, datetime.min.time()),
+            inc=True,
+        )
+        return DayMask.from_dates(
+            month_start, 31, (occurrence.date() for occurrence in occurrences)
+        ).bits
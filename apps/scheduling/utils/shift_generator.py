@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import calendar
 import logging
+import time
 import typing as t
 from datetime import date as d
 from datetime import datetime, timedelta
@@ -14,7 +15,7 @@ if t.TYPE_CHECKING:
 
 from dateutil import rrule
 from django.core.cache import cache
-from django.db import transaction
+from django.db import OperationalError, transaction
 from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.dateparse import parse_date
@@ -26,6 +27,8 @@ from apps.scheduling.models import (
     UserShiftState,
 )
 
+from .recurrence import RecurrenceEngine
+
 logger = logging.getLogger(__name__)
 WORK_WEEK_LAST_DAY = 5  # Friday (0=Monday, 4=Friday, 5=Saturday, 6=Sunday)
 
@@ -35,20 +38,58 @@ class GenerationContext(NamedTuple):
     new_shift_tracker: dict
     batch_days: int = 7
     ignore_now: bool = False
+
+class DepartmentGenerationResult(NamedTuple):
+    department_id: str
+    generated: int
+    duration_seconds: float
+    error: str | None = None
+
+def summarize_department_results(results) -> dict:
+    """
+    Aggregate per-department generation results into a single report.
+
+    Accepts DepartmentGenerationResult tuples or their ``_asdict()`` form
+    (as returned by Celery workers).
+    """
+    rows = [
+        result._asdict() if isinstance(result, DepartmentGenerationResult) else result
+        for result in results
+    ]
+    return {
+        "total_generated": sum(row["generated"] for row in rows),
+        "departments": {row["department_id"]: row["generated"] for row in rows},
+        "failures": {row["department_id"]: row["error"] for row in rows if row.get("error")},
+        "slowest_seconds": max((row["duration_seconds"] for row in rows), default=0.0),
+    }
+
 class ShiftGenerator:
     def __init__(self, lookahead_weeks=4):
         self.lookahead = lookahead_weeks * 7
         self.generated_count = 0
+        # Per-run cache of expanded template recurrences
+        self.recurrence = RecurrenceEngine()
 
-    @transaction.atomic
     def generate_department_shifts(self, initial_setup=False, generation_end_date=None):
         """
-        Generate shifts for all departments.
+        Generate shifts for all departments, one transaction per department.
+
+        A failing department is rolled back and reported without affecting
+        the others.
 
         Args:
             initial_setup: If True, generates the remaining or full month of the shifts.
             generation_end_date: Optional end date for generation window.
 
+        """
+        summary = self.generate_all_departments(initial_setup, generation_end_date)
+        return summary["total_generated"]
+
+    def generate_all_departments(self, initial_setup=False, generation_end_date=None) -> dict:
+        """
+        Generate shifts for every department serially and return the aggregate report.
+
+        See ``summarize_department_results`` for the report layout.
         """
         # Get all active department member shifts
         active_assignments = DepartmentMemberShift.objects.active_assignments()
@@ -56,21 +97,118 @@ class ShiftGenerator:
         # Group assignments by department and user
         department_assignments = self._group_assignments(active_assignments)
 
-        total_generated = 0
+        results = [
+            self._run_department(dept_id, user_assignments, initial_setup, generation_end_date)
+            for dept_id, user_assignments in department_assignments.items()
+        ]
+        return summarize_department_results(results)
+
+    def generate_for_department(
+        self,
+        department_id,
+        initial_setup=False,
+        generation_end_date=None
+    ) -> DepartmentGenerationResult:
+        """
+        Generate shifts for a single department in its own transaction.
+
+        This is the unit of work executed by each fan-out worker. Transient
+        ``OperationalError``s (lost connections, deadlocks) are re-raised so
+        the worker can retry the department; other failures are reported in
+        the result.
+        """
+        active_assignments = DepartmentMemberShift.objects.active_assignments().filter(
+            department_member__department_id=department_id
+        )
+        # Filtered to one department, so the grouping has at most one entry
+        grouped = self._group_assignments(active_assignments)
+        user_assignments = next(iter(grouped.values()), {})
+        return self._run_department(
+            department_id,
+            user_assignments,
+            initial_setup,
+            generation_end_date,
+            retryable=(OperationalError,),
+        )
+
+    def dispatch_department_shifts(self, schema_name, initial_setup=False, generation_end_date=None, *, slot=None):
+        """
+        Fan generation out to one Celery task per department.
+
+        Each department runs on its own worker and transaction, so the whole
+        run takes roughly as long as the slowest department. The returned
+        chord result resolves to the output of ``summarize_department_results``;
+        ``None`` when the tenant has no active assignments. Used by the
+        nightly ``generate_tenant_daily_shifts`` task.
+
+        Args:
+            schema_name: Tenant schema the departments belong to.
+            initial_setup: If True, generates the remaining or full month of the shifts.
+            generation_end_date: Optional end date for generation window.
+            slot: Tenant concurrency slot held by the caller; the chord
+                callback releases it once every department finished.
+
+        """
+        from celery import chord
+
+        from apps.scheduling.tasks import (
+            generate_department_shifts_task,
+            summarize_department_shifts_task,
+        )
+
+        department_ids = (
+            DepartmentMemberShift.objects.active_assignments()
+            .values_list("department_member__department_id", flat=True)
+            .distinct()
+        )
+        end_date = generation_end_date.isoformat() if generation_end_date else None
+        header = [
+            generate_department_shifts_task.s(
+                str(department_id), schema_name, initial_setup, end_date
+            )
+            for department_id in department_ids
+        ]
+        if not header:
+            return None
+        return chord(header)(summarize_department_shifts_task.s(schema_name=schema_name, slot=slot))
+
+    def _run_department(
+        self,
+        department_id,
+        user_assignments: dict,
+        initial_setup: bool,  # noqa: FBT001
+        generation_end_date: d | None,
+        *,
+        retryable: tuple[type[Exception], ...] = ()
+    ) -> DepartmentGenerationResult:
+        """Run one department inside its own transaction and time it; ``retryable`` errors propagate."""
+        started = time.monotonic()
         try:
-            for dept_id, user_assignments in department_assignments.items():
-                total_generated += self._process_department_assignments(
-                    dept_id,
+            with transaction.atomic():
+                generated = self._process_department_assignments(
+                    department_id,
                     user_assignments,
                     initial_setup,
                     generation_end_date
                 )
+        except retryable:
+            raise
         except Exception as e:
             logger.exception(
-                "Failed to generate shifts for department %s: %s", dept_id, str(e)
+                "Failed to generate shifts for department %s: %s", department_id, str(e)
+            )
+            return DepartmentGenerationResult(
+                department_id=str(department_id),
+                generated=0,
+                duration_seconds=time.monotonic() - started,
+                error=str(e)
             )
 
-        return total_generated
+        return DepartmentGenerationResult(
+            department_id=str(department_id),
+            generated=generated,
+            duration_seconds=time.monotonic() - started
+        )
 
     def _group_assignments(self, assignments) -> dict[uuid.UUID, dict[uuid.UUID, list]]:
         """
@@ -107,56 +245,74 @@ class ShiftGenerator:
             existing_state_user_ids = set()  # Not used in daily generation
 
         user_ids = list(user_assignments.keys())
-        try:
-            for user_id in user_ids:
-                # If initial_setup and a rotation state already exists for this user, skip them.
-                if initial_setup and user_id in existing_state_user_ids:
-                    continue
-
-                assignments = user_assignments[user_id]
-                # Sort assignments by template start time to establish rotation order.
-                sorted_assignments = sorted(
-                    assignments,
-                    key=lambda x: x.shift_template.start_time
-                )
+        for user_id in user_ids:
+            # If initial_setup and a rotation state already exists for this user, skip them.
+            if initial_setup and user_id in existing_state_user_ids:
+                continue
 
-                if initial_setup:
-                    # For initial setup, create a new rotation state only for those without one.
-                    rotation_state = self._create_initial_rotation_state(
-                        user_id,
-                        department_id,
-                        sorted_assignments
-                    )
-                else:
-                    # For daily generation, get or create the state.
-                    rotation_state = self._get_rotation_state(
-                        user_id,
-                        department_id,
-                        sorted_assignments
+            # Each user runs in a savepoint, so one bad assignment only drops
+            # that user's shifts; the capacity tracker is restored with it.
+            tracker_snapshot = {
+                template_id: dict(days) for template_id, days in department_new_shifts.items()
+            }
+            context = GenerationContext(
+                initial_setup=initial_setup,
+                generation_end_date=generation_end_date,
+                new_shift_tracker=department_new_shifts
+            )
+            try:
+                with transaction.atomic():
+                    total_generated += self._process_user_assignments(
+                        user_id, department_id, user_assignments[user_id], context
                     )
-
-                # Generate shifts for this user.
-                context = GenerationContext(
-                    initial_setup=initial_setup,
-                    generation_end_date= generation_end_date,
-                    new_shift_tracker=department_new_shifts
-                )
-                shifts_generated = self._generate_user_shifts(
-                    sorted_assignments,
-                    rotation_state,
-                    context
+            except Exception as e:
+                department_new_shifts.clear()
+                department_new_shifts.update(tracker_snapshot)
+                logger.exception(
+                    f"Failed to generate shifts for user {user_id} in "
+                    f"department {department_id}: {e!s}"
                 )
-                total_generated += shifts_generated
-
-        except Exception as e:
-            logger.exception(
-                f"Failed to generate shifts for user {user_id} in "
-                f"department {department_id}: {e!s}"
-            )
 
         return total_generated
 
 
+    def _process_user_assignments(
+        self,
+        user_id: uuid.UUID,
+        department_id: uuid.UUID,
+        assignments: list,
+        context: GenerationContext
+    ) -> int:
+        """
+        Generate one user's shifts, continuing their rotation in the department.
+        """
+        # Sort assignments by template start time to establish rotation order.
+        sorted_assignments = sorted(
+            assignments,
+            key=lambda x: x.shift_template.start_time
+        )
+
+        if context.initial_setup:
+            # For initial setup, create a new rotation state only for those without one.
+            rotation_state = self._create_initial_rotation_state(
+                user_id,
+                department_id,
+                sorted_assignments
+            )
+        else:
+            # For daily generation, get or create the state.
+            rotation_state = self._get_rotation_state(
+                user_id,
+                department_id,
+                sorted_assignments
+            )
+
+        return self._generate_user_shifts(
+            sorted_assignments,
+            rotation_state,
+            context
+        )
+
     def _create_initial_rotation_state(
         self,
         user_id: uuid.UUID,
@@ -365,8 +521,7 @@ class ShiftGenerator:
         existing = GeneratedShift.objects.filter(
             source_template=template,
             department=template.department,
-            start_datetime__date=date
-        ).count()
+        ).starting_on(date).count()
 
         new_count = new_shift_tracker.get(template.id, {}).get(date, 0)
         return (existing + new_count) < template.max_staff
@@ -456,10 +611,18 @@ class ShiftGenerator:
             return []
 
     def get_recurrence_dates(self, template, start_dt, end_dt):
-        """Generate datetime objects for the recurrence rule."""
+        """
+        Generate datetime objects for the template's occurrences in [start_dt, end_dt].
+
+        Dates come from the run's RecurrenceEngine, which expands each template
+        once per month instead of building an rrule for every call.
+        """
         try:
-            rule = self.build_rrule(template, start_dt)
-            return list(rule.between(start_dt, end_dt, inc=True))
+            occurrences = (
+                start_dt.replace(year=day.year, month=day.month, day=day.day)
+                for day in self.recurrence.dates_between(template, start_dt.date(), end_dt.date())
+            )
+            return [occurrence for occurrence in occurrences if start_dt <= occurrence <= end_dt]
         except Exception as e:
             logger.exception(f"Recurrence failed: {e!s}")
             return []
@@ -549,7 +712,7 @@ class ShiftGenerator:
                 total_hours += total_seconds / 3600
 
         except AttributeError as e:
-            print(f"Error calculating hours: {e!s}")
+            logger.exception(f"Error calculating hours: {e!s}")
             return 0
 
         return total_hours
@@ -1,13 +1,19 @@
 from datetime import timedelta
 
+from django.db import transaction
 from django.db.models import Sum
 from django.utils import timezone
 
 from apps.scheduling.models import GeneratedShift, UserShiftHistory
+from apps.scheduling.services.busy_intervals import BusyIntervalCache
+from apps.scheduling.services.schedule_service import SchedulePatternService
+from apps.scheduling.shift_generator.calendar import is_weekend
 
-WEEKEND_START = 5
-def get_max_staff(template, date):
-    return template.max_staff_weekend if date.weekday() >= WEEKEND_START else template.max_staff_weekday
+
+def get_max_staff(template, date, month_calendar=None):
+    if month_calendar is not None:
+        return month_calendar.required_staff_for(template, date)
+    return template.max_staff_weekend if is_weekend(date) else template.max_staff_weekday
 
 def check_fatigue(user, new_shift_start):
     last_shift = GeneratedShift.objects.filter(
@@ -55,20 +61,27 @@ def fatigue_risk(user):
     return False
 
 
-def create_emergency_shift(doctor, start, end):
-    GeneratedShift.objects.create(
-        user=doctor,
-        start_datetime=start,
-        end_datetime=end,
-        status="EMERGENCY",
-        is_override=True
-    )
-    # Automatically cancel conflicting shifts
-    GeneratedShift.objects.filter(
-        user=doctor,
-        start_datetime__lt=end,
-        end_datetime__gt=start
-    ).update(status="CANCELLED")
+def create_emergency_shift(doctor, department, start, end, reason=""):
+    with transaction.atomic():
+        # Cancel conflicting shifts first: active shifts of a user may not overlap
+        conflicts = GeneratedShift.objects.filter(user=doctor).in_effect().overlapping(start, end)
+        cancelled = list(conflicts.values_list("user_id", "start_datetime", "end_datetime"))
+        conflicts.update(status=GeneratedShift.Status.CANCELLED)
+        # update() sends no signals
+        BusyIntervalCache.invalidate(cancelled)
+        SchedulePatternService.invalidate_weeks(
+            (user_id, timezone.localtime(shift_start).date()) for user_id, shift_start, _ in cancelled
+        )
+
+        return GeneratedShift.objects.create(
+            user=doctor,
+            department=department,
+            start_datetime=start,
+            end_datetime=end,
+            status=GeneratedShift.Status.EMERGENCY,
+            is_emergency_override=True,
+            override_reason=reason
+        )
 
 
 
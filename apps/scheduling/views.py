@@ -1,15 +1,19 @@
 # views.py
-from datetime import timezone
+from datetime import timedelta, timezone
 
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.utils import timezone as django_timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.scheduling.services.department_board import DepartmentBoardService
+from apps.scheduling.services.schedule_service import AppointmentTimeService
 from apps.scheduling.utils.filters import ShiftTemplateFilter
 from apps.scheduling.utils.shift_generator import ShiftGenerator
+from base_permission.view_permission import RolePermission
 from base_view.base_view import BaseViewSet
 
 from .models import (
@@ -19,6 +23,9 @@ from .models import (
     UserShiftPreference,
 )
 from .serializers import (
+    AvailabilitySearchSerializer,
+    AvailableSlotSerializer,
+    DepartmentBoardSerializer,
     NurseAvailabilitySerializer,
     ShiftGenerationSerializer,
     ShiftSwapRequestSerializer,
@@ -76,6 +83,63 @@ class ShiftGenerationViewSet(viewsets.ViewSet):
             {"message": "Initial shifts generation task started"},
             status=status.HTTP_202_ACCEPTED
         )
+
+class AppointmentAvailabilityViewSet(viewsets.ViewSet):
+    permission_classes = [RolePermission]
+    permission_resource = "patientappointment"
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Earliest free appointment slots with any doctor of a department.
+
+        GET /appointment-availability/search/?department_id=<uuid>&days=14&duration=30&limit=10
+        """
+        serializer = AvailabilitySearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        slots = AppointmentTimeService.search_department_slots(
+            department_id=str(params["department_id"]),
+            start_date=params.get("start_date") or django_timezone.localdate(),
+            days=params["days"],
+            duration=params["duration"],
+            limit=params["limit"],
+        )
+        return Response(AvailableSlotSerializer(slots, many=True).data)
+
+
+class DepartmentBoardViewSet(viewsets.ViewSet):
+    # The board lists patients and visit reasons
+    permission_classes = [RolePermission]
+    permission_resource = "patientappointment"
+
+    def list(self, request):
+        """
+        Day or week board of a department's doctors, shifts and appointments.
+
+        GET /department-board/?department_id=<uuid>&date=2025-03-03&view=week
+
+        Responses carry an ETag; a matching If-None-Match returns 304.
+        """
+        serializer = DepartmentBoardSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        start_date = params.get("date") or django_timezone.localdate()
+        days = 1
+        if params["view"] == "week":
+            start_date -= timedelta(days=start_date.weekday())
+            days = 7
+
+        board = DepartmentBoardService.build(str(params["department_id"]), start_date, days)
+        etag = DepartmentBoardService.etag(board)
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and DepartmentBoardService.etag_matches(etag, if_none_match):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(board, headers={"ETag": etag})
+
+
 class ShiftSwapRequestViewSet(BaseViewSet):
     queryset = ShiftSwapRequest.objects.all()
     serializer_class = ShiftSwapRequestSerializer
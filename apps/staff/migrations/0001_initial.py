@@ -1,9 +1,10 @@
 # Generated by Django 5.1.4 on 2025-02-14 11:01
 
-import django.core.validators
-import django.db.models.deletion
 import uuid
 from decimal import Decimal
+
+import django.core.validators
+import django.db.models.deletion
 from django.conf import settings
 from django.db import migrations, models
 
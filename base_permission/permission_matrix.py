@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from types import MappingProxyType
+
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from hospital.models import Role
+
+logger = logging.getLogger(__name__)
+
+VIEW = 1
+ADD = 2
+CHANGE = 4
+DELETE = 8
+
+ACTION_BITS = {
+    "view": VIEW,
+    "add": ADD,
+    "change": CHANGE,
+    "delete": DELETE,
+}
+
+# Role and auth.Permission live in the shared schema, so the version stamp
+# is kept outside the tenant-scoped cache keys: an edit made from any tenant
+# reaches every process serving any tenant.
+VERSION_KEY = "medicore:role_permission_version:{role_code}"
+# Stamp of a matrix compiled while Redis was unreachable; never equals a real one
+UNKNOWN_VERSION = -1
+
+
+def normalize_resource(basename: str) -> str:
+    """Turn a router basename such as ``patient-appointment`` into ``patientappointment``."""
+    return "".join(basename.replace("-", " ").split())
+
+
+def permission_mask(actions) -> int:
+    mask = 0
+    for action in actions:
+        mask |= ACTION_BITS.get(action, 0)
+    return mask
+
+
+class PermissionMatrix:
+    """
+    Compiled ``{resource: action bitmask}`` per role, checked without queries.
+
+    A matrix is built once per role from the role's ``auth.Permission`` rows
+    (one query), falling back to ``role_permissions`` (a ``ROLE_PERMISSIONS``
+    style dict; pass ``{}`` for database permissions only) for resources the
+    role has no rows for, and kept in a process-local LRU. Each entry
+    remembers the role's version stamp in Redis and re-reads it at most
+    every ``VERSION_CHECK_INTERVAL`` seconds;
+    ``invalidate`` bumps the stamp when a role's permissions change, see
+    ``hospital.signals``. While Redis is unreachable the compiled matrix
+    keeps being served and the stamp is retried at the next interval.
+    """
+
+    MAX_ROLES = 64
+    VERSION_CHECK_INTERVAL = 5  # seconds
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, role_permissions: dict):
+        self.fallback = {
+            role_code: {
+                resource: permission_mask(actions)
+                for resource, actions in role_data.get("permissions", {}).items()
+            }
+            for role_code, role_data in role_permissions.items()
+        }
+        self._entries = OrderedDict()  # role_code -> (matrix, version, checked_at)
+        self._lock = threading.Lock()
+        PermissionMatrix._instances.add(self)
+
+    def __contains__(self, role_code) -> bool:
+        return role_code in self.fallback
+
+    def has_permission(self, role_code: str, resource: str, action: str) -> bool:
+        bit = ACTION_BITS.get(action)
+        if not bit:
+            return False
+        return bool(self.for_role(role_code).get(resource, 0) & bit)
+
+    def for_role(self, role_code: str) -> MappingProxyType:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(role_code)
+            if entry is not None:
+                self._entries.move_to_end(role_code)
+                if now - entry[2] < self.VERSION_CHECK_INTERVAL:
+                    return entry[0]
+
+        version = self._version(role_code)
+        if entry is not None and version in (entry[1], UNKNOWN_VERSION):
+            # Unchanged, or unknown: keep the compiled matrix and its stamp
+            matrix, version = entry[0], entry[1]
+        else:
+            matrix = self.compile(role_code)
+
+        with self._lock:
+            self._entries[role_code] = (matrix, version, now)
+            self._entries.move_to_end(role_code)
+            while len(self._entries) > self.MAX_ROLES:
+                self._entries.popitem(last=False)
+        return matrix
+
+    def compile(self, role_code: str) -> MappingProxyType:
+        """Build a role's matrix from the database, bypassing the local cache."""
+        if not Role.objects.filter(code=role_code).exists():
+            raise ValueError(f"No StaffRole found with code: normalize_role: {role_code}")
+
+        granted = {}
+        for model_name, codename in Role.permissions.through.objects.filter(
+            role__code=role_code
+        ).values_list("permission__content_type__model", "permission__codename"):
+            resource = model_name.replace(" ", "_").lower()
+            granted[resource] = granted.get(resource, 0) | ACTION_BITS.get(codename.split("_")[0], 0)
+
+        # Resources without database permissions fall back to the static role table
+        matrix = dict(self.fallback.get(role_code, {}))
+        matrix.update({resource: mask for resource, mask in granted.items() if mask})
+        return MappingProxyType(matrix)
+
+    @staticmethod
+    def _version(role_code: str) -> int:
+        try:
+            value = get_redis_connection("default").get(VERSION_KEY.format(role_code=role_code))
+        except RedisError as e:
+            logger.warning(f"Permission version check for role {role_code} failed, keeping the compiled matrix: {e}")
+            return UNKNOWN_VERSION
+        return int(value or 0)
+
+    @classmethod
+    def invalidate(cls, role_code: str) -> None:
+        """Bump the role's version stamp once the current transaction commits."""
+
+        def bump():
+            try:
+                get_redis_connection("default").incr(VERSION_KEY.format(role_code=role_code))
+            except RedisError as e:
+                # Other processes pick the change up once their stamp moves again
+                logger.warning(f"Permission version bump for role {role_code} failed: {e}")
+            for instance in list(cls._instances):
+                with instance._lock:
+                    instance._entries.pop(role_code, None)
+
+        transaction.on_commit(bump)
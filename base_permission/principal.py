@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from functools import cached_property
+from types import MappingProxyType
+
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from hospital.models import HospitalMembership
+
+from .permission_matrix import ACTION_BITS, PermissionMatrix
+
+EMPTY_PERMISSIONS = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user's membership and role, resolved once per request.
+
+    Built by ``RobustCookieJWTAuthentication`` (or lazily by ``get_principal``)
+    and shared by permission classes, serializers and validators so that a
+    request, however many nested serializers it instantiates, looks up the
+    membership and role only once.
+    """
+
+    user_id: str
+    membership_id: str | None = None
+    tenant_id: int | None = None
+    role_code: str | None = None
+    role_name: str | None = None
+    is_tenant_admin: bool = False
+    has_tenant_access: bool = False
+    tenant_permissions: frozenset = frozenset()
+
+    @classmethod
+    def resolve(cls, user, schema_name: str | None = None) -> Principal:
+        """
+        Load the user's membership and role in one query.
+
+        The membership of the current tenant wins; otherwise the first one,
+        matching the previous ``hospital_memberships_user.first()`` behaviour.
+        Tenant access and the tenant's group permissions come along with it.
+        """
+        schema_name = schema_name or connection.schema_name
+        membership = HospitalMembership.objects.filter(user_id=user.id).annotate(
+            is_current_tenant=ExpressionWrapper(Q(tenant__schema_name=schema_name), output_field=BooleanField())
+        ).order_by("-is_current_tenant", "pk").values(
+            "id", "tenant_id", "role__code", "role__name", "is_tenant_admin", "is_current_tenant"
+        ).first()
+
+        if membership is None:
+            return cls(user_id=str(user.id))
+        return cls(
+            user_id=str(user.id),
+            membership_id=str(membership["id"]),
+            tenant_id=membership["tenant_id"],
+            role_code=(membership["role__code"] or "").strip() or None,
+            role_name=membership["role__name"],
+            is_tenant_admin=membership["is_tenant_admin"],
+            has_tenant_access=membership["is_current_tenant"],
+            tenant_permissions=frozenset(user.get_tenant_permissions(schema_name))
+            if membership["is_current_tenant"] else frozenset(),
+        )
+
+    def to_cache(self) -> dict:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    @classmethod
+    def from_cache(cls, data: dict) -> Principal:
+        return cls(**data)
+
+    @property
+    def has_membership(self) -> bool:
+        return self.membership_id is not None
+
+    def permissions(self, matrix: PermissionMatrix) -> MappingProxyType:
+        """
+        Compiled ``{resource: action bitmask}`` of the role in ``matrix``, memoized per request.
+
+        Whether the role has to be known to the matrix's static table is up
+        to the caller; the matrix raises ``ValueError`` for unknown roles.
+        """
+        if not self.role_code:
+            return EMPTY_PERMISSIONS
+        if id(matrix) not in self._compiled:
+            self._compiled[id(matrix)] = matrix.for_role(self.role_code)
+        return self._compiled[id(matrix)]
+
+    @cached_property
+    def _compiled(self) -> dict:
+        return {}
+
+    def can(self, matrix: PermissionMatrix, resource: str, action: str) -> bool:
+        bit = ACTION_BITS.get(action)
+        return bool(bit and self.permissions(matrix).get(resource, 0) & bit)
+
+
+def get_principal(request) -> Principal | None:
+    """
+    Return the request's principal, resolving and attaching it on first use.
+
+    ``None`` for anonymous requests.
+    """
+    if request is None:
+        return None
+    principal = getattr(request, "principal", None)
+    if principal is not None:
+        return principal
+
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    principal = Principal.resolve(user)
+    request.principal = principal
+    return principal
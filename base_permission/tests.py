@@ -0,0 +1,127 @@
+import time
+from datetime import timedelta
+from types import MappingProxyType, SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.models import MyUser
+from hospital.models import HospitalMembership, Role
+
+from .permission_matrix import UNKNOWN_VERSION, PermissionMatrix
+from .view_permission import (
+    ROLE_PERMISSION_MATRIX,
+    ROLE_PERMISSIONS,
+    PermissionCheckedSerializerMixin,
+    RolePermission,
+)
+
+CHECKS = 1000
+CURRENT_VERSION = 3
+# First DRF action mapped to each permission by RolePermission.ACTION_TO_PERMISSION
+VIEW_ACTIONS = {"view": "list", "add": "create", "change": "update", "delete": "destroy"}
+
+
+class PermissionMatrixRefreshTests(SimpleTestCase):
+    role_code = "DOCTOR"
+
+    def setUp(self):
+        self.matrix = PermissionMatrix({})
+        self.compiled = MappingProxyType({"patientappointment": 1})
+
+    def redis(self, **kwargs):
+        return mock.patch(
+            "base_permission.permission_matrix.get_redis_connection", return_value=mock.Mock(**kwargs)
+        )
+
+    def test_redis_error_keeps_compiled_matrix(self):
+        self.matrix._entries[self.role_code] = (self.compiled, CURRENT_VERSION, 0.0)
+        with self.redis(**{"get.side_effect": RedisConnectionError("down")}), \
+                mock.patch.object(self.matrix, "compile") as compile_role, \
+                self.assertLogs("base_permission.permission_matrix", "WARNING"):
+            assert self.matrix.for_role(self.role_code) is self.compiled
+
+        compile_role.assert_not_called()
+        assert self.matrix._entries[self.role_code][1] == CURRENT_VERSION
+
+    def test_redis_error_on_first_use_compiles_unstamped_matrix(self):
+        with self.redis(**{"get.side_effect": RedisConnectionError("down")}), \
+                mock.patch.object(self.matrix, "compile", return_value=self.compiled) as compile_role, \
+                self.assertLogs("base_permission.permission_matrix", "WARNING"):
+            self.matrix.for_role(self.role_code)
+
+        compile_role.assert_called_once()
+        assert self.matrix._entries[self.role_code][1] == UNKNOWN_VERSION
+
+    def test_redis_error_on_bump_still_drops_local_entry(self):
+        self.matrix._entries[self.role_code] = (self.compiled, CURRENT_VERSION, 0.0)
+        with self.redis(**{"incr.side_effect": RedisConnectionError("down")}), \
+                mock.patch("base_permission.permission_matrix.transaction.on_commit", lambda bump: bump()), \
+                self.assertLogs("base_permission.permission_matrix", "WARNING"):
+            PermissionMatrix.invalidate(self.role_code)
+
+        assert self.role_code not in self.matrix._entries
+
+
+class RolePermissionBenchmark(TenantTestCase):
+    """Permission checks against the compiled matrix versus compiling from the database."""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Permission Test Hospital"
+        tenant.paid_until = timezone.localdate() + timedelta(days=30)
+
+    def setUp(self):
+        self.role = Role.objects.create(name="Doctor", code="DOCTOR")
+        self.role.permissions.add(Permission.objects.get(codename="view_patientappointment"))
+        self.user = MyUser.objects.create_user("doctor@example.com", "password")
+        HospitalMembership.objects.create(user=self.user, tenant=self.tenant, role=self.role)
+
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def request_for_role(self, role_code):
+        """Build a request by a new member of ``role_code``, creating the role if needed."""
+        role, _ = Role.objects.get_or_create(
+            code=role_code, defaults={"name": ROLE_PERMISSIONS[role_code]["name"]}
+        )
+        user = MyUser.objects.create_user(f"{role_code.lower()}-bench@example.com", "password")
+        HospitalMembership.objects.create(user=user, tenant=self.tenant, role=role)
+        request = RequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_matrix_checks_are_query_free_and_faster_than_compiling(self):
+        permission = RolePermission()
+        for role_code, role_data in ROLE_PERMISSIONS.items():
+            with self.subTest(role=role_code):
+                request = self.request_for_role(role_code)
+                resource, actions = next(iter(role_data["permissions"].items()))
+                view = SimpleNamespace(basename=resource, action=VIEW_ACTIONS[actions[0]])
+                # First check resolves the principal and compiles the role
+                assert permission.has_permission(request, view)
+
+                with self.assertNumQueries(0):
+                    started = time.perf_counter()
+                    for _ in range(CHECKS):
+                        assert permission.has_permission(request, view)
+                    matrix_elapsed = time.perf_counter() - started
+
+                started = time.perf_counter()
+                for _ in range(CHECKS // 10):
+                    ROLE_PERMISSION_MATRIX.compile(role_code)
+                compile_elapsed = (time.perf_counter() - started) * 10
+
+                assert matrix_elapsed < compile_elapsed
+
+    def test_serializer_check_honours_database_permissions_only(self):
+        serializer = PermissionCheckedSerializerMixin()
+        serializer.context = {"request": self.request}
+
+        assert serializer.check_permission("view", "patientappointment")
+        # DOCTOR may add appointments in ROLE_PERMISSIONS, but the role has no such row
+        assert not serializer.check_permission("add", "patientappointment")
@@ -1,12 +1,11 @@
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission
 
-from apps.staff.helper import (
-    convert_queryset_to_role_permissions,
-)
 from hospital.models import Role
 
+from .permission_matrix import PermissionMatrix, normalize_resource
+from .principal import get_principal
+
 ROLE_PERMISSIONS = {
             "SUPERUSER": {
                 "name": "Superuser",
@@ -133,6 +132,9 @@ ROLE_PERMISSIONS = {
         }
 
 
+USER_CREATE_PERMISSION_MATRIX = PermissionMatrix(ROLE_PERMISSIONS)
+
+
 class UserCreatePermission(BasePermission):
     """
     Custom permission to check user roles and their permissions.
@@ -144,51 +146,16 @@ class UserCreatePermission(BasePermission):
     def has_permission(self, request, view):
         # Extract and normalize the user role
         try:
-            user_role = request.user.hospital_memberships_user.first().role
-            if not user_role:
-                return False
-
-            user_role = str(user_role).strip()
-
-            if user_role not in ROLE_PERMISSIONS:
+            principal = get_principal(request)
+            if principal is None or not principal.has_membership:
+                raise AttributeError("No hospital membership")
+            if not principal.role_code or principal.role_code not in USER_CREATE_PERMISSION_MATRIX:
                 return False
 
             if not hasattr(view, "basename"):
                 return False
 
-            resource = view.basename
-            resource_ = resource.replace("-", " ")
-            normalized_resource = "".join(word for word in resource_.split())
-
-            permission = "add"
-            cache_key = f"user_role_permissions_create{user_role}"
-            # Check cache first
-            permissions = cache.get(cache_key)
-            try:
-                role = Role.objects.get(code=user_role)
-            except Role.DoesNotExist as err:
-                raise ValueError(
-                    f"No StaffRole found with code: normalize_role: {user_role}"
-                ) from err
-            if permissions is None:
-                permissions_queryset = role.permissions.all()
-                # Convert to desired structure
-                permissions_dict = convert_queryset_to_role_permissions(
-                    permissions_queryset
-                )
-                # Cache the permissions for 1 hour
-                cache.set(cache_key, permissions_dict, timeout=3600)
-                permissions = permissions_dict
-
-            # Check if the user's role has the required permission
-            model_permissions = permissions.get(normalized_resource, [])
-            if not model_permissions:
-                allowed_permissions = ROLE_PERMISSIONS.get(user_role, {}).get(
-                    "permissions", {}
-                )
-                model_permissions = allowed_permissions.get(normalized_resource, [])
-
-            return permission in model_permissions
+            return principal.can(USER_CREATE_PERMISSION_MATRIX, normalize_resource(view.basename), "add")
         except AttributeError:
             raise PermissionDenied("Ananymous User does not have a valid hospital membership role.")
         except (ValueError, Role.DoesNotExist) as e:
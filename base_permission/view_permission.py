@@ -1,13 +1,11 @@
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission
 
-from apps.staff.helper import (
-    convert_queryset_to_role_permissions,
-    normalize_permissions_dict,
-)
 from hospital.models import Role
 
+from .permission_matrix import PermissionMatrix, normalize_resource
+from .principal import get_principal
+
 ROLE_PERMISSIONS = {
             "SUPERUSER": {
                 "name": "Superuser",
@@ -139,88 +137,58 @@ ROLE_PERMISSIONS = {
             }
         }
 
+ROLE_PERMISSION_MATRIX = PermissionMatrix(ROLE_PERMISSIONS)
+# Serializer checks only honour the role's database permissions
+ROLE_DB_PERMISSION_MATRIX = PermissionMatrix({})
+
+
 class RolePermission(BasePermission):
     """
     Custom permission to check user roles and their permissions.
+
+    The resource is the view's router basename, or ``permission_resource``
+    when the view guards another model's data (e.g. ``patientappointment``).
     """
 
+    # Map DRF actions to permissions
+    ACTION_TO_PERMISSION = {
+        "list": "view",
+        "retrieve": "view",
+        "create": "add",
+        "update": "change",
+        "partial_update": "change",
+        "destroy": "delete",
+        "search": "view",
+        "update_emergency_contact": "add",
+        # Add any custom actions here
+        "cancel": "change",
+        "reschedule": "change",
+        "update_status": "change",
+        "available_slots": "view",
+        "check_availability": "add",
+        "create_recurring": "add"
+    }
+
     def __init__(self):
         super().__init__()
 
     def has_permission(self, request, view):
         # Extract and normalize the user role
         try:
-            user_role = request.user.hospital_memberships_user.first().role
-            if not user_role:
+            principal = get_principal(request)
+            if principal is None or not principal.has_membership:
+                raise AttributeError("No hospital membership")
+            if not principal.role_code or principal.role_code not in ROLE_PERMISSION_MATRIX:
                 return False
-
-            user_role = str(user_role).strip()
-
-            if user_role not in ROLE_PERMISSIONS:
-                print(f"User role not found: {user_role}")
-                return False
-            act = hasattr(view, "basename")
             if not hasattr(view, "basename") or not hasattr(view, "action"):
-                print(f"View does not have basename or action: {act}")
                 return False
 
-            resource = view.basename
-            resource_ = resource.replace("-", " ")
-            normalized_resource = "".join(word for word in resource_.split())
-            action = view.action
-            print(f"Resource: {normalized_resource}, Action: {action}")
-
-            # Map DRF actions to permissions
-            action_to_permission = {
-                "list": "view",
-                "retrieve": "view",
-                "create": "add",
-                "update": "change",
-                "partial_update": "change",
-                "destroy": "delete",
-                "search": "view",
-                "update_emergency_contact": "add",
-                # Add any custom actions here
-                "cancel": "change",
-                "reschedule": "change",
-                "update_status": "change",
-                "available_slots": "view",
-                "check_availability": "add",
-                "create_recurring": "add"
-            }
-            permission = action_to_permission.get(action)
-
+            permission = self.ACTION_TO_PERMISSION.get(view.action)
             if not permission:
                 return False
-            cache_key = f"user_role_permissions_{user_role}"
-            # Check cache first
-            permissions = cache.get(cache_key)
-            try:
-                role = Role.objects.get(code=user_role)
-            except Role.DoesNotExist as err:
-                raise ValueError(
-                    f"No StaffRole found with code: normalize_role: {user_role}"
-                ) from err
-            if permissions is None:
-                permissions_queryset = role.permissions.all()
-                # Convert to desired structure
-                permissions_dict = convert_queryset_to_role_permissions(
-                    permissions_queryset
-                )
-                # Cache the permissions for 1 hour
-                cache.set(cache_key, permissions_dict, timeout=3600)
-                permissions = permissions_dict
-
-            # Check if the user's role has the required permission
-            model_permissions = permissions.get(normalized_resource, [])
-            cache.clear()  # Clear cache delete later
-            if not model_permissions:
-                allowed_permissions = ROLE_PERMISSIONS.get(user_role, {}).get(
-                    "permissions", {}
-                )
-                model_permissions = allowed_permissions.get(normalized_resource, [])
 
-            return permission in model_permissions
+            resource = getattr(view, "permission_resource", None) or normalize_resource(view.basename)
+            return principal.can(ROLE_PERMISSION_MATRIX, resource, permission)
         except AttributeError:
             raise PermissionDenied("Authentication credentials were not provided.")
         except (ValueError, Role.DoesNotExist) as e:
@@ -233,39 +201,10 @@ class PermissionCheckedSerializerMixin:
         if not request or not request.user:
             return False
         try:
-            user_role = request.user.hospital_memberships_user.first().role
-            normalize_role = str(user_role).strip().upper().replace(" ", "_")
-
-
-            cache_key = f"user_role_permissions_{user_role}"
-            permissions = cache.get(cache_key)
-
-            try:
-                role = Role.objects.get(code=normalize_role)
-                print(f"Found role: {role}")
-            except Role.DoesNotExist as err:
-                print(f"Role not found: {normalize_role}")
-                raise ValueError(
-                    f"No StaffRole found with code: normalize_role: {normalize_role}"
-                ) from err
-
-            if permissions is None:
-                permissions_queryset = role.permissions.all()
-                permissions_dict = convert_queryset_to_role_permissions(
-                    permissions_queryset
-                )
-                cache.set(cache_key, permissions_dict, timeout=36)
-                permissions = permissions_dict
-
-            if hasattr(request.user, "user_permissions"):
-                model_permissions = permissions.get(model_name, [])
-            else:
-                user_permissions = ROLE_PERMISSIONS.get(normalize_role, {})
-                permissions_dict = normalize_permissions_dict(user_permissions)
-                model_permissions = permissions_dict.get(model_name, [])
-
-            result = permission_type in model_permissions
-            return result
+            principal = get_principal(request)
+            if principal is None or not principal.has_membership:
+                raise AttributeError("No hospital membership")
+            return principal.can(ROLE_DB_PERMISSION_MATRIX, model_name, permission_type)
         except AttributeError:
             raise PermissionDenied("Authentication credentials were not provided.")
         except (ValueError, Role.DoesNotExist) as e:
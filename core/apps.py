@@ -6,3 +6,6 @@ from django.db import connection
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        import core.signals
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, NamedTuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_namespaces = {}
+
+
+class CachedValue(NamedTuple):
+    """Envelope stored in the cache; ``delta`` is how long the value took to compute."""
+
+    value: Any
+    expires_at: float | None
+    delta: float
+
+
+class CacheNamespace:
+    """
+    Get-or-compute caching with stampede protection and per-namespace metrics.
+
+    - Single flight: on a miss only the worker that wins ``cache.add`` on
+      ``<key>:lock`` computes; the others poll for its result for up to
+      ``wait_timeout`` seconds before computing themselves.
+    - Probabilistic early refresh (XFetch): a hit is treated as a miss with
+      a probability that grows as the entry nears expiry and with how long
+      it took to compute, so one worker refreshes a popular key before it
+      expires while the rest keep being served the current value.
+    - ``get_many_or_compute`` reads a batch with a single ``get_many`` and
+      computes all misses in one call.
+
+    Keys are used as given, so existing ``cache.delete``/``delete_many``
+    invalidation keeps working. Values are wrapped in ``CachedValue``;
+    anything else found under a key counts as a miss, so ``None`` can be
+    cached.
+    """
+
+    LOCK_SUFFIX = ":lock"
+    POLL_INTERVAL = 0.01  # seconds, doubled up to MAX_POLL_INTERVAL
+    MAX_POLL_INTERVAL = 0.1
+
+    def __init__(self, name: str, timeout: int | None = 300, lock_timeout: int = 30,
+                 wait_timeout: float = 5.0, beta: float = 1.0):
+        self.name = name
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.beta = beta
+        self._metrics = Counter()
+        self._metrics_lock = threading.Lock()
+        _namespaces[name] = self
+
+    def _count(self, metric: str, amount: int = 1) -> None:
+        with self._metrics_lock:
+            self._metrics[metric] += amount
+
+    def stats(self) -> dict:
+        """Process-local counters: hits, misses, early_refreshes, lock_waits, computes."""
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _is_fresh(self, entry: CachedValue) -> bool:
+        if entry.expires_at is None:
+            return True
+        # -log(u) for u in (0, 1] is an exponential draw; larger deltas refresh earlier
+        early_by = -entry.delta * self.beta * math.log(1.0 - random.random())  # noqa: S311 - jitter, not security
+        return time.time() + early_by < entry.expires_at
+
+    def _wrap(self, value, timeout, delta) -> CachedValue:
+        return CachedValue(value, time.time() + timeout if timeout is not None else None, delta)
+
+    def get(self, key: str, default=None):
+        entry = cache.get(key)
+        if isinstance(entry, CachedValue):
+            self._count("hits")
+            return entry.value
+        self._count("misses")
+        return default
+
+    def set(self, key: str, value, timeout: int | None = None, delta: float = 0.0) -> None:
+        timeout = self.timeout if timeout is None else timeout
+        cache.set(key, self._wrap(value, timeout, delta), timeout)
+
+    def set_many(self, mapping: dict, timeout: int | None = None, delta: float = 0.0) -> None:
+        timeout = self.timeout if timeout is None else timeout
+        cache.set_many({key: self._wrap(value, timeout, delta) for key, value in mapping.items()}, timeout)
+
+    def delete(self, key: str) -> None:
+        cache.delete(key)
+
+    def delete_many(self, keys) -> None:
+        cache.delete_many(list(keys))
+
+    def _compute_and_store(self, key: str, compute: Callable[[], Any], timeout, *, locked: bool):
+        self._count("computes")
+        started = time.monotonic()
+        try:
+            value = compute()
+            self.set(key, value, timeout, time.monotonic() - started)
+            return value
+        finally:
+            if locked:
+                cache.delete(key + self.LOCK_SUFFIX)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], timeout: int | None = None):
+        """Return the cached value of ``key``, computing and storing it at most once across workers."""
+        entry = cache.get(key)
+        if isinstance(entry, CachedValue):
+            if self._is_fresh(entry):
+                self._count("hits")
+                return entry.value
+            if not cache.add(key + self.LOCK_SUFFIX, uuid.uuid4().hex, self.lock_timeout):
+                # Someone else is already refreshing; the current value is still valid
+                self._count("hits")
+                return entry.value
+            self._count("early_refreshes")
+            return self._compute_and_store(key, compute, timeout, locked=True)
+
+        self._count("misses")
+        if cache.add(key + self.LOCK_SUFFIX, uuid.uuid4().hex, self.lock_timeout):
+            return self._compute_and_store(key, compute, timeout, locked=True)
+
+        # Another worker holds the lock: wait for its result
+        self._count("lock_waits")
+        deadline = time.monotonic() + self.wait_timeout
+        pause = self.POLL_INTERVAL
+        while time.monotonic() < deadline:
+            time.sleep(pause)
+            pause = min(pause * 2, self.MAX_POLL_INTERVAL)
+            entry = cache.get(key)
+            if isinstance(entry, CachedValue):
+                return entry.value
+
+        logger.warning(f"Cache {self.name}: gave up waiting for {key}, computing it here")
+        return self._compute_and_store(key, compute, timeout, locked=False)
+
+    def get_many_or_compute(self, keys, compute_missing: Callable[[list], dict], timeout: int | None = None) -> dict:
+        """
+        Return ``{key: value}`` for ``keys`` with one ``get_many``.
+
+        ``compute_missing(missing_keys)`` must return a value for each missing
+        key; the results are written back with one ``set_many``.
+        """
+        keys = list(keys)
+        result = {
+            key: entry.value
+            for key, entry in cache.get_many(keys).items()
+            if isinstance(entry, CachedValue)
+        }
+        self._count("hits", len(result))
+
+        missing = [key for key in keys if key not in result]
+        if missing:
+            self._count("misses", len(missing))
+            self._count("computes")
+            started = time.monotonic()
+            fresh = compute_missing(missing)
+            self.set_many(fresh, timeout, time.monotonic() - started)
+            result.update(fresh)
+        return result
+
+
+def cache_stats() -> dict:
+    """Metrics of every namespace in this process, by namespace name."""
+    return {name: namespace.stats() for name, namespace in _namespaces.items()}
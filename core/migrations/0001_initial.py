@@ -1,6 +1,7 @@
 # Generated by Django 5.1.4 on 2025-01-24 23:03
 
 import uuid
+
 from django.db import migrations, models
 
 
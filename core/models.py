@@ -3,13 +3,29 @@ import uuid
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
+    Permission,
     PermissionsMixin,
 )
-from django.core.cache import cache
-from django.db import connection, models
+from django.db import connection, models, transaction
+from django.utils.functional import cached_property
+from django_redis import get_redis_connection
 
+from core.cache import CacheNamespace
 from hospital.models.hospital_members import HospitalMembership
 
+# Per-user tenant access, role and permissions; cleared by MyUser.clear_permission_cache
+USER_ACCESS_CACHE = CacheNamespace("user_access", timeout=300)
+
+# Per-user stamp embedded in every cache key of the user. Bumping it orphans
+# all of them at once (they expire on their own timeouts); it is kept outside
+# the tenant-scoped keys so that one bump reaches every schema.
+USER_CACHE_VERSION_KEY = "medicore:user_cache_version:{user_id}"
+
+
+def user_cache_version(user_id) -> int:
+    value = get_redis_connection("default").get(USER_CACHE_VERSION_KEY.format(user_id=user_id))
+    return int(value or 0)
+
 
 class MyUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -68,71 +84,57 @@ class MyUser(AbstractBaseUser, PermissionsMixin):
         ]
 
     def clear_permission_cache(self):
-        """Clear all cached permissions for this user."""
-        keys = [
-            f"user_perms_{self.id}_*",
-            f"tenant_access_{self.id}_*",
-            f"tenant_role_{self.id}_*",
-        ]
-        for key in keys:
-            cache.delete_pattern(key)
+        """
+        Invalidate all cached permissions and authentication principals for this user.
 
-    def has_tenant_access(self, schema_name):
-        """Check if user has access to a specific tenant (with caching)."""
-        cache_key = f"tenant_access_{self.id}_{schema_name}"
-        cached_result = cache.get(cache_key)
+        Bumps the user's cache version once the current transaction commits,
+        so every key built with the old version is ignored from then on.
+        """
+        key = USER_CACHE_VERSION_KEY.format(user_id=self.id)
 
-        if cached_result is not None:
-            return cached_result
+        def bump():
+            get_redis_connection("default").incr(key)
+            self.__dict__.pop("cache_version", None)
 
-        has_access = self.hospital_memberships_user.filter(
-            tenant__schema_name=schema_name
-        ).exists()
-        print(has_access)
+        transaction.on_commit(bump)
 
-        cache.set(cache_key, has_access, 300)  # Cache for 5 minutes
-        return has_access
+    @cached_property
+    def cache_version(self) -> int:
+        """Return the user's cache version, read once per instance."""
+        return user_cache_version(self.id)
+
+    def has_tenant_access(self, schema_name):
+        """Check if user has access to a specific tenant (with caching)."""
+        return USER_ACCESS_CACHE.get_or_compute(
+            f"tenant_access_{self.id}_v{self.cache_version}_{schema_name}",
+            lambda: self.hospital_memberships_user.filter(tenant__schema_name=schema_name).exists(),
+        )
 
     def get_tenant_role(self, schema_name):
         """Get user's role in a specific tenant (with caching)."""
-        cache_key = f"tenant_role_{self.id}_{schema_name}"
-        cached_role = cache.get(cache_key)
 
-        if cached_role is not None:
-            return cached_role
+        def load_role():
+            try:
+                return self.hospital_memberships_user.select_related("role").get(
+                    tenant__schema_name=schema_name
+                ).role
+            except HospitalMembership.DoesNotExist:
+                return None
 
-        try:
-            membership = self.hospital_memberships_user.get(
-                tenant__schema_name=schema_name
-            )
-            cache.set(cache_key, membership.role, 300)
-            return membership.role
-        except HospitalMembership.DoesNotExist:
-            return None
+        return USER_ACCESS_CACHE.get_or_compute(f"tenant_role_{self.id}_v{self.cache_version}_{schema_name}", load_role)
 
     def get_tenant_permissions(self, schema_name):
         """Get all permissions for a specific tenant."""
-        cache_key = f"tenant_perms_{self.id}_{schema_name}"
-        cached_perms = cache.get(cache_key)
-
-        if cached_perms is not None:
-            return cached_perms
-
-        try:
-            membership = self.hospital_memberships_user.get(
-                tenant__schema_name=schema_name
-            )
-            perms = set()
-
-            # Get permissions from groups
-            for group in membership.role.groups.all():
-                perms.update(group.permissions.values_list("codename", flat=True))
-
-            cache.set(cache_key, perms, 300)
-            return perms
-
-        except HospitalMembership.DoesNotExist:
-            return set()
+        # Permissions of every group of the user's role(s) in the tenant, in one query
+        return USER_ACCESS_CACHE.get_or_compute(
+            f"tenant_perms_{self.id}_v{self.cache_version}_{schema_name}",
+            lambda: set(
+                Permission.objects.filter(
+                    group__role__hospital_memberships_role__user_id=self.id,
+                    group__role__hospital_memberships_role__tenant__schema_name=schema_name,
+                ).values_list("codename", flat=True).distinct()
+            ),
+        )
 
     def has_perm(self, perm, obj=None):
         """Override default permission check with tenant context."""
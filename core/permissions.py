@@ -1,6 +1,6 @@
 # core/permissions.py
-from rest_framework.permissions import BasePermission
 from rest_framework import permissions
+from rest_framework.permissions import BasePermission
 
 # class IsAdmin(BasePermission):
 #     def has_permission(self, request, view):
@@ -1,7 +1,8 @@
 from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from core.models import HospitalMembership
+from core.models import HospitalMembership, MyUser
+from hospital.models import Role
 
 
 @receiver([post_save, post_delete], sender=HospitalMembership)
@@ -9,7 +10,18 @@ def clear_membership_cache(sender, instance, **kwargs):
     if instance.user:
         instance.user.clear_permission_cache()
 
-@receiver(m2m_changed, sender=HospitalMembership.groups.through)
-def invlidate_group_cache(sender, instance, action, **kwargs):
-    if instance.user and action in ["post_add", "post_clear", "post_remove"]:
-        instance.user.clear_permission_cache()
+@receiver(m2m_changed, sender=Role.groups.through)
+def invlidate_group_cache(sender, instance, action, reverse, **kwargs):
+    # Memberships have no groups of their own; a role's groups feed its members' permissions
+    if reverse or action not in ["post_add", "post_clear", "post_remove"]:
+        return
+    for user in MyUser.objects.filter(hospital_memberships_user__role=instance).distinct():
+        user.clear_permission_cache()
+
+
+@receiver(post_save, sender=MyUser)
+def invalidate_user_principal(sender, instance, created, update_fields=None, **kwargs):
+    # Active flag or superuser status may have changed; last_login alone does not matter
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    instance.clear_permission_cache()
@@ -1,3 +1,128 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from hospital.models import HospitalMembership, Role
+from medicore.authentication import RobustCookieJWTAuthentication
+
+from .cache import CacheNamespace
+from .models import MyUser
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+BURST_REQUESTS = 500
+AUTH_REQUESTS = 200
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheNamespaceStampedeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.namespace = CacheNamespace("test_stampede", timeout=60, wait_timeout=10.0)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        results = []
+        barrier = threading.Barrier(BURST_REQUESTS)
+
+        def compute():
+            calls.append(1)
+            # Stay cold until every other request has missed and is waiting
+            deadline = time.monotonic() + 5.0
+            while (
+                self.namespace.stats().get("lock_waits", 0) < BURST_REQUESTS - 1
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+            return "value"
+
+        def worker():
+            barrier.wait()
+            results.append(self.namespace.get_or_compute("stampede:key", compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(BURST_REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * BURST_REQUESTS
+        stats = self.namespace.stats()
+        assert stats["computes"] == 1
+        assert stats["lock_waits"] == BURST_REQUESTS - 1
+
+    def test_none_is_cached(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+
+        assert self.namespace.get_or_compute("stampede:none", compute) is None
+        assert self.namespace.get_or_compute("stampede:none", compute) is None
+        assert len(calls) == 1
+
+    def test_get_many_computes_only_missing_keys_in_one_call(self):
+        self.namespace.set("stampede:a", 1)
+        batches = []
+
+        def compute_missing(keys):
+            batches.append(keys)
+            return {key: key.upper() for key in keys}
+
+        result = self.namespace.get_many_or_compute(["stampede:a", "stampede:b", "stampede:c"], compute_missing)
+
+        assert result == {"stampede:a": 1, "stampede:b": "STAMPEDE:B", "stampede:c": "STAMPEDE:C"}
+        assert batches == [["stampede:b", "stampede:c"]]
+
+
+class PrincipalCacheLatencyBenchmark(TenantTestCase):
+    """Warm authentication against a cold one, and invalidation through the user's cache version."""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = "Auth Test Hospital"
+        tenant.paid_until = timezone.localdate() + timedelta(days=30)
+
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user("nurse@example.com", "password")
+        role = Role.objects.create(name="Nurse", code="NURSE")
+        HospitalMembership.objects.create(user=self.user, tenant=self.tenant, role=role)
+        self.authentication = RobustCookieJWTAuthentication()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self):
+        request = RequestFactory().get("/")
+        request.COOKIES[settings.JWT_AUTH_COOKIE] = self.token
+        user, _ = self.authentication.authenticate(request)
+        return user, request
+
+    def test_warm_authentication_is_query_free_and_faster_than_cold(self):
+        started = time.perf_counter()
+        user, request = self.authenticate()
+        cold_elapsed = time.perf_counter() - started
+        assert user.pk == self.user.pk
+        assert request.principal.role_code == "NURSE"
+
+        with self.assertNumQueries(0):
+            started = time.perf_counter()
+            for _ in range(AUTH_REQUESTS):
+                self.authenticate()
+            warm_elapsed = (time.perf_counter() - started) / AUTH_REQUESTS
+
+        assert warm_elapsed < cold_elapsed
+
+    def test_clear_permission_cache_drops_cached_principal(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.clear_permission_cache()
+
+        with self.assertNumQueries(3):  # user, membership and tenant permissions again
+            self.authenticate()
@@ -1,7 +1,8 @@
 # Generated by Django 5.1.4 on 2025-01-24 23:03
 
-import django.db.models.deletion
 import uuid
+
+import django.db.models.deletion
 from django.conf import settings
 from django.db import migrations, models
 
@@ -2,12 +2,16 @@ import uuid
 
 from django.apps import apps
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import models, transaction
 
+from core.cache import CacheNamespace
+
 from .hospital_members import HospitalMembership
 
+# Cleared by hospital.signals.clear_staff_cache
+HOSPITAL_STAFF_CACHE = CacheNamespace("hospital_staff", timeout=300)
+
 
 class HospitalProfile(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -120,12 +124,12 @@ class HospitalProfile(models.Model):
 
         This includes the admin user and additional staff
         """
-        cache_key = f"hospital_{self.id}_members"
-        staff = cache.get(cache_key)
-        if not staff:
-            staff_memberships = self.hospital_memberships.select_related("user").all()
-            staff = [{"user": m.user, "role": m.role} for m in staff_memberships]
-            cache.set(cache_key, staff, timeout=300)
-        return staff
+        return HOSPITAL_STAFF_CACHE.get_or_compute(
+            f"hospital_{self.id}_members",
+            lambda: [
+                {"user": m.user, "role": m.role}
+                for m in self.hospital_memberships_profile.select_related("user", "role").all()
+            ],
+        )
 
 
@@ -4,13 +4,14 @@ from django.apps import apps
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django_tenants.utils import schema_context
 
 from apps.patients.models.core import Patient
 from apps.staff.models import DoctorProfile
-from hospital.models import HospitalMembership
+from base_permission.permission_matrix import PermissionMatrix
+from hospital.models import HospitalMembership, Role
 
 logger = logging.getLogger(__name__)
 
@@ -72,3 +73,23 @@ def create_staff_profile(sender, instance, created, **kwargs):
 @receiver([post_save, post_delete], sender=HospitalMembership)
 def clear_staff_cache(sender, instance, **kwargs):
     cache.delete(f"hospital_{instance.hospital_profile.id}_members")
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_role_permission_matrix(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        PermissionMatrix.invalidate(instance.code)
+    elif pk_set:
+        # Edited from the Permission side: every affected role
+        for role_code in Role.objects.filter(pk__in=pk_set).values_list("code", flat=True):
+            PermissionMatrix.invalidate(role_code)
+    else:
+        for role_code in Role.objects.values_list("code", flat=True):
+            PermissionMatrix.invalidate(role_code)
+
+
+@receiver([post_save, post_delete], sender=Role)
+def invalidate_role_matrix_on_role_change(sender, instance, **kwargs):
+    PermissionMatrix.invalidate(instance.code)
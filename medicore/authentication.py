@@ -1,15 +1,24 @@
 import logging
+import time
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
-from django.db import connection
+from django.db import DEFAULT_DB_ALIAS, connection
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from base_permission.principal import Principal
+from core.cache import CacheNamespace
+from core.models import user_cache_version
 
 logger = logging.getLogger(__name__)
 
+PRINCIPAL_CACHE = CacheNamespace("auth_principal")
+
 class RobustCookieJWTAuthentication(JWTAuthentication):
+    PRINCIPAL_CACHE_TIMEOUT = 60  # seconds
+
     def get_user_from_model(self, validated_token, user_model):
         """AHelper method to get user from a specific model."""
         try:
@@ -39,6 +48,57 @@ class RobustCookieJWTAuthentication(JWTAuthentication):
             raise TokenError("User not found in public schema")
         return user
 
+    def _principal_cache_key(self, validated_token, schema_name, version):
+        user_id = validated_token[settings.SIMPLE_JWT["USER_ID_CLAIM"]]
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if not jti:
+            return None
+        # The version is bumped by MyUser.clear_permission_cache
+        return f"user_perms_{user_id}_v{version}_{schema_name}_{jti}"
+
+    def _principal_cache_timeout(self, validated_token):
+        expires_in = int(validated_token.get("exp", 0) - time.time())
+        return max(0, min(self.PRINCIPAL_CACHE_TIMEOUT, expires_in))
+
+    def _user_from_cache(self, user_fields, version):
+        """Rebuild the user without a query; the password hash is never cached and stays deferred."""
+        user_model = get_user_model()
+        field_names = [field.attname for field in user_model._meta.concrete_fields if field.attname in user_fields]
+        user = user_model.from_db(DEFAULT_DB_ALIAS, field_names, [user_fields[name] for name in field_names])
+        # Already read for the key; spares the user's own cache lookups another read
+        user.__dict__["cache_version"] = version
+        return user
+
+    def _resolve_principal(self, validated_token, schema_name):
+        """
+        Return ``(user, principal)`` for the token, from the cache when warm.
+
+        A warm entry costs one cache read and no queries; concurrent requests
+        with a cold token resolve it once. It lives for
+        ``PRINCIPAL_CACHE_TIMEOUT`` seconds at most (never past the token's
+        expiry) and is dropped by ``MyUser.clear_permission_cache``.
+        """
+        version = user_cache_version(validated_token[settings.SIMPLE_JWT["USER_ID_CLAIM"]])
+        cache_key = self._principal_cache_key(validated_token, schema_name, version)
+        timeout = self._principal_cache_timeout(validated_token)
+        if not (cache_key and timeout):
+            user = self._get_public_schema_user(validated_token)
+            return user, Principal.resolve(user, schema_name)
+
+        def load():
+            user = self._get_public_schema_user(validated_token)
+            return {
+                "user": {
+                    field.attname: getattr(user, field.attname)
+                    for field in user._meta.concrete_fields
+                    if field.attname != "password"
+                },
+                "principal": Principal.resolve(user, schema_name).to_cache(),
+            }
+
+        cached = PRINCIPAL_CACHE.get_or_compute(cache_key, load, timeout)
+        return self._user_from_cache(cached["user"], version), Principal.from_cache(cached["principal"])
+
     def authenticate(self, request):
         try:
             raw_token = request.COOKIES.get(settings.JWT_AUTH_COOKIE)
@@ -50,14 +110,13 @@ class RobustCookieJWTAuthentication(JWTAuthentication):
             schema_name = connection.schema_name
 
             if schema_name:
-                user = self._get_public_schema_user(validated_token)
-                cache_key = f"tenant_access_{user.id}_{schema_name}"
-                has_access = cache.get(cache_key)
-
-                # print(user.get_tenant_permissions(schema_name))
-                if has_access is None:
-                    has_access = user.has_tenant_access(schema_name)
-                    request.get_tenant_permissions = user.get_tenant_permissions(schema_name)
+                user, principal = self._resolve_principal(validated_token, schema_name)
+                if not user.is_active:
+                    raise TokenError("User is inactive")
+
+                # Membership, role and permissions shared by the rest of the request
+                request.principal = principal
+                request.get_tenant_permissions = set(principal.tenant_permissions)
             return user, validated_token
 
         except (TokenError, InvalidToken) as e:
@@ -1,13 +1,24 @@
 import logging
 
 from django.conf import settings
-from django.core.cache import cache
 from django.db import connection
+from django_tenants.middleware.main import TenantMainMiddleware
 
-from tenants.models import Client
+from tenants.routing import TenantRoutingTable
 
 logger = logging.getLogger(__name__)
 
+
+class TenantRoutingMiddleware(TenantMainMiddleware):
+    """``TenantMainMiddleware`` resolving the hostname from the process-local routing table."""
+
+    def get_tenant(self, domain_model, hostname):
+        route = TenantRoutingTable.route(hostname)
+        if route is None:
+            raise domain_model.DoesNotExist(f"No tenant for hostname {hostname}")
+        return route.tenant()
+
+
 class SubdomainTenantMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -18,27 +29,10 @@ class SubdomainTenantMiddleware:
         schema_name = connection.schema_name
 
         if self.main_domain in host:
-            subdomain = host.lower()
-
-            # Check cache first
-            cached_domains = cache.get("active_subdomains_dict") or {}
-
-            if schema_name in cached_domains:
-                subdomain = cached_domains[schema_name]
-            else:
-                try:
-                    schema = Client.objects.get(schema_name=schema_name)
-                    client = schema.domains.get(domain=subdomain)
-
-                    self._update_cache(client)
-                except Client.DoesNotExist:
-                    request.tenant = None
+            # Local lookup; the routing table refreshes itself when tenants or domains change
+            if not TenantRoutingTable.routes_for_schema(schema_name):
+                request.tenant = None
         else:
             request.tenant = None
 
         return self.get_response(request)
-
-    def _update_cache(self, client):
-        cached_domains = cache.get("active_subdomains_dict") or {}
-        cached_domains[client.tenant.schema_name] = client.domain
-        cache.set("active_subdomains_dict", cached_domains, timeout=3600)
@@ -62,7 +62,7 @@ SHARED_APPS = [
 INSTALLED_APPS = list(set(SHARED_APPS) | set(TENANT_APPS))
 
 MIDDLEWARE = [
-    "django_tenants.middleware.main.TenantMainMiddleware",
+    "medicore.middleware.TenantRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -302,6 +302,22 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 
 
+# Nightly shift generation fan-out across tenants
+SHIFT_GENERATION_WINDOW_DAYS = env.int("SHIFT_GENERATION_WINDOW_DAYS", default=14)
+# Random start delay per tenant so workers and the database are not hit at once
+SHIFT_GENERATION_MAX_JITTER_SECONDS = env.int("SHIFT_GENERATION_MAX_JITTER_SECONDS", default=120)
+# Maximum number of tenants generated at the same time
+SHIFT_GENERATION_TENANT_CONCURRENCY = env.int("SHIFT_GENERATION_TENANT_CONCURRENCY", default=8)
+# A held slot expires after this long, in case its run never reports back
+SHIFT_GENERATION_SLOT_TIMEOUT_SECONDS = env.int("SHIFT_GENERATION_SLOT_TIMEOUT_SECONDS", default=1800)
+# How often, and how many times, a tenant waits for a free slot
+SHIFT_GENERATION_SLOT_RETRY_SECONDS = env.int("SHIFT_GENERATION_SLOT_RETRY_SECONDS", default=60)
+SHIFT_GENERATION_SLOT_MAX_WAITS = env.int("SHIFT_GENERATION_SLOT_MAX_WAITS", default=120)
+# Monthly roster backend: "greedy" (weekly two-group rotation) or "flow" (min-cost flow)
+SHIFT_SCHEDULER_SOLVER = env("SHIFT_SCHEDULER_SOLVER", default="greedy")
+# Seconds the flow solver may run before falling back to the greedy rotation
+SHIFT_SCHEDULER_TIME_BUDGET_SECONDS = env.float("SHIFT_SCHEDULER_TIME_BUDGET_SECONDS", default=10.0)
+
 # Celery Beat settings
 CELERY_BEAT_SCHEDULE = {
     # Daily: Maintain 14-day window
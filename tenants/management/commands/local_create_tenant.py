@@ -1,10 +1,11 @@
 # tenants/management/commands/create_tenant.py
 
 import uuid
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 from django_tenants.utils import schema_context
 
 from hospital.models import HospitalProfile
@@ -55,7 +56,7 @@ class Command(BaseCommand):
         tenant = Client(
             schema_name=schema_name,
             name=options["name"],
-            paid_until=datetime.now() + timedelta(days=30),
+            paid_until=timezone.localdate() + timedelta(days=30),
             on_trial=options["subscription_plan"] == "trial",
         )
 
@@ -1,8 +1,9 @@
 # Generated by Django 5.1.4 on 2025-01-24 23:03
 
+import uuid
+
 import django.db.models.deletion
 import django_tenants.postgresql_backend.base
-import uuid
 from django.db import migrations, models
 
 
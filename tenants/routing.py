@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from .models import Client, Domain
+
+if TYPE_CHECKING:
+    from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# Tenants and domains live in the public schema, so the version stamp is kept
+# outside the tenant-scoped cache keys.
+VERSION_KEY = "medicore:tenant_routing_version"
+# Stamp of a table loaded while Redis was unreachable; never equals a real one
+UNKNOWN_VERSION = -1
+
+
+class TenantRoute(NamedTuple):
+    domain: str
+    schema_name: str
+    tenant_id: str
+    name: str
+    status: str
+    paid_until: date
+    on_trial: bool
+    is_primary: bool
+
+    def tenant(self) -> Client:
+        """Build a fresh ``Client`` from the route, without a query; other fields load on access."""
+        values = {
+            "id": self.tenant_id,
+            "schema_name": self.schema_name,
+            "name": self.name,
+            "paid_until": self.paid_until,
+            "on_trial": self.on_trial,
+            "status": self.status,
+        }
+        # from_db expects values in concrete field order
+        field_names = [field.attname for field in Client._meta.concrete_fields if field.attname in values]
+        return Client.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class TenantRoutingTable:
+    """
+    Process-local ``domain -> tenant`` routing table.
+
+    The whole table is loaded with one query and swapped in atomically.
+    Each process re-reads the version stamp in Redis at most every
+    ``VERSION_CHECK_INTERVAL`` seconds and reloads only when it moved;
+    saving or deleting a ``Client`` or ``Domain`` bumps it, see
+    ``tenants.signals``. Lookups are plain dict reads.
+    """
+
+    VERSION_CHECK_INTERVAL = 5  # seconds
+
+    _by_domain = {}
+    _by_schema = {}
+    _version = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def route(cls, domain: str) -> TenantRoute | None:
+        cls._refresh()
+        return cls._by_domain.get(domain.lower())
+
+    @classmethod
+    def routes_for_schema(cls, schema_name: str) -> tuple[TenantRoute, ...]:
+        cls._refresh()
+        return cls._by_schema.get(schema_name, ())
+
+    @classmethod
+    def _refresh(cls) -> None:
+        now = time.monotonic()
+        if cls._version is not None and now - cls._checked_at < cls.VERSION_CHECK_INTERVAL:
+            return
+        with cls._lock:
+            if cls._version is not None and now - cls._checked_at < cls.VERSION_CHECK_INTERVAL:
+                return
+            try:
+                version = int(get_redis_connection("default").get(VERSION_KEY) or 0)
+            except RedisError as e:
+                # Keep serving the current table (or load one without a stamp,
+                # so the next successful check reloads it) and retry later
+                logger.warning(f"Tenant routing version check failed, keeping the current table: {e}")
+                if cls._version is None:
+                    cls._load()
+                    cls._version = UNKNOWN_VERSION
+                cls._checked_at = now
+                return
+            if version != cls._version:
+                cls._load()
+                cls._version = version
+            cls._checked_at = now
+
+    @classmethod
+    def _load(cls) -> None:
+        by_domain = {}
+        by_schema = {}
+        for row in Domain.objects.values_list(
+            "domain",
+            "tenant__schema_name",
+            "tenant_id",
+            "tenant__name",
+            "tenant__status",
+            "tenant__paid_until",
+            "tenant__on_trial",
+            "is_primary",
+        ).order_by("-is_primary", "domain"):
+            route = TenantRoute(row[0].lower(), *row[1:])
+            by_domain[route.domain] = route
+            by_schema.setdefault(route.schema_name, []).append(route)
+
+        # Replace both maps at once; readers never see a half-built table
+        cls._by_domain, cls._by_schema = by_domain, {
+            schema_name: tuple(routes) for schema_name, routes in by_schema.items()
+        }
+        logger.info(f"Tenant routing table loaded with {len(by_domain)} domains")
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Bump the version stamp once the current transaction commits."""
+
+        def bump():
+            try:
+                get_redis_connection("default").incr(VERSION_KEY)
+            except RedisError as e:
+                # Other processes pick the change up once the stamp moves again
+                logger.warning(f"Tenant routing version bump failed: {e}")
+            cls._checked_at = 0.0
+
+        transaction.on_commit(bump)
@@ -1,10 +1,10 @@
-from django.core.cache import cache
 from django.core.management import call_command
 from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Client
+from .models import Client, Domain
+from .routing import TenantRoutingTable
 
 
 @receiver(post_save, sender=Client)
@@ -14,7 +14,8 @@ def setup_tenant_schema(sender, instance, created, **kwargs):
             lambda: call_command("create_index", schema=instance.schema_name)
         )
 @receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=Domain)
 def invalidate_domain_cache(sender, **kwargs):
-    # Invalidate entire cache on any Client change
-    cache.delete("active_subdomains_dict")
+    # Any tenant or domain change reloads the routing table in every process
+    TenantRoutingTable.invalidate()
 
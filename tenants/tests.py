@@ -1,3 +1,57 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from .routing import UNKNOWN_VERSION, TenantRoutingTable
+
+CURRENT_VERSION = 3
+
+
+class TenantRoutingRefreshTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            TenantRoutingTable, _by_domain={}, _by_schema={}, _version=None, _checked_at=0.0
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def redis(self, **kwargs):
+        return mock.patch("tenants.routing.get_redis_connection", return_value=mock.Mock(**kwargs))
+
+    def test_redis_error_keeps_current_table(self):
+        TenantRoutingTable._version = CURRENT_VERSION
+        with self.redis(**{"get.side_effect": RedisConnectionError("down")}), \
+                mock.patch.object(TenantRoutingTable, "_load") as load, \
+                self.assertLogs("tenants.routing", "WARNING"):
+            TenantRoutingTable._refresh()
+
+        load.assert_not_called()
+        assert TenantRoutingTable._version == CURRENT_VERSION
+
+    def test_redis_error_on_first_use_loads_unstamped_table(self):
+        with self.redis(**{"get.side_effect": RedisConnectionError("down")}), \
+                mock.patch.object(TenantRoutingTable, "_load") as load, \
+                self.assertLogs("tenants.routing", "WARNING"):
+            TenantRoutingTable._refresh()
+
+        load.assert_called_once()
+        assert TenantRoutingTable._version == UNKNOWN_VERSION
+
+    def test_recovered_redis_reloads_unstamped_table(self):
+        TenantRoutingTable._version = UNKNOWN_VERSION
+        with self.redis(**{"get.return_value": b"0"}), \
+                mock.patch.object(TenantRoutingTable, "_load") as load:
+            TenantRoutingTable._refresh()
+
+        load.assert_called_once()
+        assert TenantRoutingTable._version == 0
+
+    def test_redis_error_on_bump_still_rechecks_locally(self):
+        TenantRoutingTable._checked_at = 100.0
+        with self.redis(**{"incr.side_effect": RedisConnectionError("down")}), \
+                mock.patch("tenants.routing.transaction.on_commit", lambda bump: bump()), \
+                self.assertLogs("tenants.routing", "WARNING"):
+            TenantRoutingTable.invalidate()
+
+        assert TenantRoutingTable._checked_at == 0.0